@@ -1,30 +1,210 @@
 """
 JWT authentication for CmsUser (api.users table).
-Access tokens carry user_id; we resolve to CmsUser and attach a wrapper as request.user.
+Access tokens carry user_id; we resolve it to the user's id and role and attach
+a CmsUserAuth as request.user.
+
+Resolving the user is cached so most requests skip the `users` lookup:
+- a per-process LRU cache with a TTL (CMS_AUTH_USER_CACHE_TTL / _SIZE),
+- optionally Django's shared cache as a second level (CMS_AUTH_USER_SHARED_CACHE).
+Entries hold only AUTH_FIELDS (never the password hash or contact details) and
+are dropped when a CmsUser is saved or deleted (see api.signals); other
+processes' local caches expire after the TTL.
+
+Permission checks (api.permissions) need the user's `role` and the store and
+staff member ids of their StaffMember rows. Both come from these cached
+lookups, never from the token: memberships are cached per user like the user
+itself and dropped when a StaffMember row changes, so a demotion or a store
+transfer applies to tokens already issued. The token's email/username/role
+claims are only for the client's display; `/auth/refresh/` (`jwt_refresh` in
+api.views) issues them afresh from the database.
 """
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import CmsUser
+from .models import CmsUser, StaffMember
+
+USER_CLAIMS = ("email", "username", "role")
+AUTH_FIELDS = ("id", "role")
+SHARED_CACHE_KEY = "cms-auth-identity:{}"
+MEMBERSHIPS_CACHE_KEY = "cms-auth-memberships:{}"
 
 
 class CmsUserAuth:
-    """Minimal user object for request.user when authenticated via JWT (CmsUser)."""
-    def __init__(self, cms_user: CmsUser):
-        self.cms_user = cms_user
-        self.id = cms_user.id
-        self.pk = cms_user.id
+    """
+    Minimal user object for request.user when authenticated via JWT (CmsUser).
+    `role` is the stored user's; `store_ids` and `staff_ids` are looked up (cached) on first use.
+    """
+    def __init__(self, user_id, role, token=None):
+        self.id = user_id
+        self.pk = user_id
         self.is_authenticated = True
+        self.token = token or {}
+        self.role = role
+
+    @functools.cached_property
+    def memberships(self):
+        stores, staff = get_cached_memberships(self.id)
+        return frozenset(stores), frozenset(staff)
+
+    @property
+    def store_ids(self):
+        return self.memberships[0]
+
+    @property
+    def staff_ids(self):
+        return self.memberships[1]
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU mapping whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+user_cache = TTLCache(
+    ttl=getattr(settings, "CMS_AUTH_USER_CACHE_TTL", 60),
+    max_size=getattr(settings, "CMS_AUTH_USER_CACHE_SIZE", 1024),
+)
+
+
+membership_cache = TTLCache(
+    ttl=getattr(settings, "CMS_AUTH_USER_CACHE_TTL", 60),
+    max_size=getattr(settings, "CMS_AUTH_USER_CACHE_SIZE", 1024),
+)
+
+
+def _shared_cache():
+    alias = getattr(settings, "CMS_AUTH_USER_SHARED_CACHE", None)
+    return caches[alias] if alias else None
+
+
+def user_identity(user_id):
+    """The AUTH_FIELDS of CmsUser `user_id` as a dict; one query. Raises CmsUser.DoesNotExist."""
+    identity = CmsUser.objects.filter(pk=user_id).values(*AUTH_FIELDS).first()
+    if identity is None:
+        raise CmsUser.DoesNotExist(f"CmsUser {user_id} does not exist.")
+    return identity
+
+
+def get_cached_identity(user_id):
+    """`user_identity`, from cache when possible. Raises CmsUser.DoesNotExist."""
+    key = str(user_id)
+    identity = user_cache.get(key)
+    if identity is not None:
+        return identity
+    shared = _shared_cache()
+    if shared is not None:
+        identity = shared.get(SHARED_CACHE_KEY.format(key))
+    if identity is None:
+        identity = user_identity(user_id)
+        if shared is not None:
+            shared.set(SHARED_CACHE_KEY.format(key), identity, user_cache.ttl)
+    user_cache.set(key, identity)
+    return identity
+
+
+def user_memberships(user_id):
+    """(store ids, staff member ids) of the user's StaffMember rows, as sorted strings; one query."""
+    rows = StaffMember.objects.filter(user_id=user_id).values_list("pk", "store_id")
+    stores, staff = set(), []
+    for pk, store_id in rows:
+        stores.add(str(store_id))
+        staff.append(str(pk))
+    return sorted(stores), sorted(staff)
+
+
+def get_cached_memberships(user_id):
+    """`user_memberships`, cached like users until a StaffMember row of the user changes."""
+    key = str(user_id)
+    memberships = membership_cache.get(key)
+    if memberships is not None:
+        return memberships
+    shared = _shared_cache()
+    if shared is not None:
+        memberships = shared.get(MEMBERSHIPS_CACHE_KEY.format(key))
+    if memberships is None:
+        memberships = user_memberships(user_id)
+        if shared is not None:
+            shared.set(MEMBERSHIPS_CACHE_KEY.format(key), memberships, membership_cache.ttl)
+    membership_cache.set(key, memberships)
+    return memberships
+
+
+def invalidate_cached_user(user_id):
+    """Forget the cached identity of `user_id` in this process and the shared cache."""
+    key = str(user_id)
+    user_cache.delete(key)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.delete(SHARED_CACHE_KEY.format(key))
+
+
+def invalidate_cached_memberships(user_id):
+    """Forget the cached memberships of `user_id` in this process and the shared cache."""
+    key = str(user_id)
+    membership_cache.delete(key)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.delete(MEMBERSHIPS_CACHE_KEY.format(key))
+
+
+def tokens_for_user(cms_user: CmsUser) -> RefreshToken:
+    """Issue a refresh token (and, via `.access_token`, an access token) carrying the user claims."""
+    refresh = RefreshToken.for_user(CmsUserAuth(cms_user.id, cms_user.role))
+    for claim in USER_CLAIMS:
+        refresh[claim] = getattr(cms_user, claim) or ""
+    return refresh
 
 
 class CmsUserJWTAuthentication(JWTAuthentication):
-    """Resolve JWT payload user_id to CmsUser and return CmsUserAuth wrapper."""
+    """Resolve JWT payload user_id to the user's cached identity and return a CmsUserAuth."""
     def get_user(self, validated_token):
+        user_id = validated_token.get("user_id")
+        if user_id is None:
+            raise InvalidToken("Token has no user_id")
         try:
-            user_id = validated_token.get("user_id")
-            if user_id is None:
-                raise InvalidToken("Token has no user_id")
-            cms_user = CmsUser.objects.get(pk=user_id)
+            identity = get_cached_identity(user_id)
         except CmsUser.DoesNotExist:
             raise InvalidToken("User not found")
-        return CmsUserAuth(cms_user)
+        return CmsUserAuth(identity["id"], identity["role"], validated_token)
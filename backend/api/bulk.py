@@ -0,0 +1,190 @@
+"""
+Batch create/update/delete for ViewSets.
+
+`BulkWriteMixin` adds a `/<resource>/bulk/` action:
+- POST   [ {...}, ... ]              create rows
+- PATCH  [ {"id": ..., ...}, ... ]   partially update rows
+- DELETE { "ids": [...] }            delete rows
+
+Foreign keys are resolved for the whole batch with one query per field
+(`PrefetchedPrimaryKeyRelatedField`), rows are written with
+`bulk_create` / `bulk_update` inside a single transaction, and any invalid
+row rejects the batch with a 400 listing the errors by row index (deletes
+go through `perform_bulk_destroy`, which a view may override to skip the
+per-row delete signals the same way). Every row
+goes through the serializer's own validation, so its store checks
+(api.serializers.ScopedWriteMixin) apply per row; updates and deletes only
+find rows in the view's scoped queryset.
+"""
+import copy
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that looks the pk up in `context["related_instances"]`
+    (model -> {pk: instance}) when the caller has prefetched it, instead of
+    querying once per row.
+    """
+
+    def to_internal_value(self, data):
+        prefetched = self.context.get("related_instances", {}).get(self.get_queryset().model)
+        if prefetched is None:
+            return super().to_internal_value(data)
+        try:
+            pk = uuid.UUID(str(data))
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        instance = prefetched.get(pk)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
+
+
+class BulkWriteMixin:
+    """Adds the `bulk` action to a ModelViewSet whose serializer uses PrefetchedPrimaryKeyRelatedField."""
+
+    def get_bulk_max_size(self):
+        return getattr(settings, "API_MAX_BULK_SIZE", 1000)
+
+    def prefetch_related_instances(self, rows):
+        """Return model -> {pk: instance} for every writable FK field referenced in `rows`."""
+        related = {}
+        for name, field in self.get_serializer().fields.items():
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.read_only:
+                continue
+            pks = set()
+            for row in rows:
+                try:
+                    pks.add(uuid.UUID(str(row[name])))
+                except (KeyError, TypeError, ValueError):
+                    continue
+            queryset = field.get_queryset()
+            related[queryset.model] = queryset.in_bulk(pks) if pks else {}
+        return related
+
+    def after_bulk_write(self, created=(), updated=(), previous=None, deleted=()):
+        """
+        Hook for keeping derived data in sync after bulk_create/bulk_update, which
+        bypass model signals; runs inside the batch transaction. `previous` maps
+        pk -> copy of each updated row as it was before the batch. `deleted` is
+        passed by a `perform_bulk_destroy` that bypasses signals too; the default
+        one goes through QuerySet.delete(), which fires them.
+        """
+
+    def perform_bulk_destroy(self, queryset):
+        """Delete the rows of `queryset` (the requested rows in scope); return how many."""
+        _, per_model = queryset.delete()
+        return per_model.get(queryset.model._meta.label, 0)
+
+    def _bulk_rows(self, request):
+        rows = request.data
+        if not isinstance(rows, list):
+            return None, Response({"detail": "Expected a list of objects."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > self.get_bulk_max_size():
+            return None, Response(
+                {"detail": f"At most {self.get_bulk_max_size()} rows per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not all(isinstance(row, dict) for row in rows):
+            return None, Response({"detail": "Expected a list of objects."}, status=status.HTTP_400_BAD_REQUEST)
+        return rows, None
+
+    @action(detail=False, methods=["post", "patch", "delete"])
+    def bulk(self, request):
+        if request.method == "POST":
+            return self.bulk_create(request)
+        if request.method == "PATCH":
+            return self.bulk_update(request)
+        return self.bulk_destroy(request)
+
+    def bulk_create(self, request):
+        rows, error = self._bulk_rows(request)
+        if error:
+            return error
+        context = {**self.get_serializer_context(), "related_instances": self.prefetch_related_instances(rows)}
+        serializer_class = self.get_serializer_class()
+        model = self.get_queryset().model
+        instances, errors = [], []
+        for index, row in enumerate(rows):
+            serializer = serializer_class(data=row, context=context)
+            if serializer.is_valid():
+                instances.append(model(**serializer.validated_data))
+            else:
+                errors.append({"index": index, "errors": serializer.errors})
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            model.objects.bulk_create(instances)
+            self.after_bulk_write(created=instances)
+        data = serializer_class(instances, many=True, context=context).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request):
+        rows, error = self._bulk_rows(request)
+        if error:
+            return error
+        context = {**self.get_serializer_context(), "related_instances": self.prefetch_related_instances(rows)}
+        serializer_class = self.get_serializer_class()
+        pk_name = self.get_queryset().model._meta.pk.name
+        pks = []
+        for row in rows:
+            try:
+                pks.append(uuid.UUID(str(row.get(pk_name))))
+            except (TypeError, ValueError):
+                pks.append(None)
+        with transaction.atomic():
+            existing = self.get_queryset().select_for_update().in_bulk([pk for pk in pks if pk is not None])
+            instances, previous, fields, errors = [], {}, set(), []
+            for index, (row, pk) in enumerate(zip(rows, pks)):
+                instance = existing.get(pk)
+                if instance is None:
+                    errors.append({"index": index, "errors": {pk_name: ["Not found."]}})
+                    continue
+                serializer = serializer_class(instance, data=row, partial=True, context=context)
+                if not serializer.is_valid():
+                    errors.append({"index": index, "errors": serializer.errors})
+                    continue
+                previous[instance.pk] = copy.copy(instance)
+                for attr, value in serializer.validated_data.items():
+                    setattr(instance, attr, value)
+                    fields.add(attr)
+                instances.append(instance)
+            if errors:
+                transaction.set_rollback(True)
+                return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+            if fields:
+                # bulk_update does not run pre_save, so auto_now columns are set here.
+                now = timezone.now()
+                for field in self.get_queryset().model._meta.concrete_fields:
+                    if getattr(field, "auto_now", False):
+                        fields.add(field.name)
+                        for instance in instances:
+                            setattr(instance, field.attname, now)
+                self.get_queryset().model.objects.bulk_update(instances, sorted(fields))
+            self.after_bulk_write(updated=instances, previous=previous)
+        return Response(serializer_class(instances, many=True, context=context).data)
+
+    def bulk_destroy(self, request):
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+        if not isinstance(ids, list):
+            return Response({"detail": "Expected {\"ids\": [...]}."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.get_bulk_max_size():
+            return Response(
+                {"detail": f"At most {self.get_bulk_max_size()} rows per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            pks = [uuid.UUID(str(pk)) for pk in ids]
+        except ValueError:
+            return Response({"ids": ["Must be a list of UUIDs."]}, status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            deleted = self.perform_bulk_destroy(self.get_queryset().filter(pk__in=pks))
+        return Response({"deleted": deleted})
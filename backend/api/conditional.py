@@ -0,0 +1,141 @@
+"""
+Conditional requests driven by `updated_at`.
+
+`ConditionalGetMixin` gives `list` and `retrieve` an ETag and a
+Last-Modified header. A row's validators come from a single cheap query
+(its `updated_at`) before it is fetched or serialized. A list's come from
+the page actually served: the (pk, `updated_at`) of its rows, its next and
+previous links and the query string (filters and cursor), so a list request
+never aggregates over the whole table. A matching `If-None-Match` (or,
+without one, an `If-Modified-Since` no older than Last-Modified) returns 304.
+
+On PUT/PATCH, an `If-Match` header makes the update conditional: the row is
+locked, and unless the header matches the row's current ETag the request
+fails with 412, so two clients editing the same row cannot silently
+overwrite each other. ETags cover the query string, so use the ETag of the
+plain `GET /<resource>/{id}/` for If-Match.
+"""
+import functools
+import hashlib
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+CONDITIONAL_ACTIONS = ("list", "retrieve")
+
+
+def _etag(*parts):
+    digest = hashlib.md5(":".join(str(part) for part in parts).encode(), usedforsecurity=False)
+    return f'"{digest.hexdigest()}"'
+
+
+def _parse_etags(header):
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+def not_modified(request, etag, last_modified):
+    """True if the request's validators show the client already has this representation."""
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        tags = _parse_etags(if_none_match)
+        return "*" in tags or etag in tags
+    if_modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    if if_modified_since is not None and last_modified is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+class ConditionalGetMixin:
+    """ViewSet mixin for models with `updated_at`; see the module docstring."""
+
+    updated_field = "updated_at"
+
+    def _object_lookup(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+    def get_object_validators(self, lock=False):
+        """(ETag, Last-Modified) of the requested row, or None if it does not exist."""
+        queryset = self.filter_queryset(self.get_queryset())
+        if lock:
+            queryset = queryset.select_for_update()
+        try:
+            row = queryset.filter(**self._object_lookup()).values_list("pk", self.updated_field).first()
+        except (TypeError, ValueError, DjangoValidationError):
+            return None
+        if row is None:
+            return None
+        pk, updated = row
+        model = queryset.model
+        return _etag(model._meta.label_lower, pk, updated.isoformat(), self.request.META.get("QUERY_STRING", "")), updated
+
+    def get_list_validators(self, page, links=()):
+        """(ETag, Last-Modified) of a served list page; `links` are its next/previous URLs."""
+        model = self.get_queryset().model
+        rows, last = [], None
+        for row in page:
+            if isinstance(row, dict):  # the .values() rows of api.fast_serializers
+                pk, updated = row[model._meta.pk.attname], row[self.updated_field]
+            else:
+                pk, updated = row.pk, getattr(row, self.updated_field)
+            rows.append(f"{pk}@{updated.isoformat()}")
+            last = updated if last is None else max(last, updated)
+        etag = _etag(model._meta.label_lower, self.request.META.get("QUERY_STRING", ""), *links, *rows)
+        return etag, last
+
+    def add_validators(self, response, validators):
+        etag, last_modified = validators
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+    def conditional_response(self, request, validators, render):
+        if validators is None:
+            return render()
+        if not_modified(request, *validators):
+            return self.add_validators(Response(status=status.HTTP_304_NOT_MODIFIED), validators)
+        response = render()
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        return self.add_validators(response, validators)
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        page = getattr(self.paginator, "page", None)
+        if self.action not in CONDITIONAL_ACTIONS or response.status_code != status.HTTP_200_OK or page is None:
+            return response
+        links = [response.data.get("next") or "", response.data.get("previous") or ""]
+        validators = self.get_list_validators(page, links)
+        if not_modified(request, *validators):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        return self.add_validators(response, validators)
+
+    def retrieve(self, request, *args, **kwargs):
+        render = functools.partial(super().retrieve, request, *args, **kwargs)
+        if self.action not in CONDITIONAL_ACTIONS:
+            return render()
+        return self.conditional_response(request, self.get_object_validators(), render)
+
+    def update(self, request, *args, **kwargs):
+        if_match = request.headers.get("If-Match")
+        if not if_match:
+            return super().update(request, *args, **kwargs)
+        with transaction.atomic():
+            validators = self.get_object_validators(lock=True)
+            if validators is None:
+                return super().update(request, *args, **kwargs)
+            tags = _parse_etags(if_match)
+            if "*" not in tags and validators[0] not in tags:
+                return Response(
+                    {"detail": "The resource has changed since it was fetched (If-Match failed)."},
+                    status=status.HTTP_412_PRECONDITION_FAILED,
+                )
+            response = super().update(request, *args, **kwargs)
+        validators = self.get_object_validators()
+        if validators is not None and response.status_code == status.HTTP_200_OK:
+            self.add_validators(response, validators)
+        return response
@@ -0,0 +1,105 @@
+"""
+Denormalized per-customer visit statistics.
+
+`Customer.total_spend`, `visit_count`, `last_visit_date` and `unpaid_balance`
+mirror the customer's `VisitRecord` rows. They are adjusted with F()
+expressions on every visit write (see api.signals) and can be rebuilt from
+scratch with `recompute_customer_stats` when they drift.
+"""
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, F, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Customer, VisitRecord
+
+ZERO = Value(Decimal("0"), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def _last_visit_subquery():
+    return Subquery(
+        VisitRecord.objects.filter(customer=OuterRef("pk"))
+        .order_by()
+        .values("customer")
+        .annotate(last=Max("visit_date"))
+        .values("last")[:1]
+    )
+
+
+def visit_state(visit):
+    """Return the stats-relevant values of an in-memory visit."""
+    return {
+        "customer_id": visit.customer_id,
+        "visit_date": visit.visit_date,
+        "spending": visit.spending,
+        "unpaid_amount": visit.unpaid_amount,
+    }
+
+
+def stored_visit_state(visit_id, using=None):
+    """Return the stats-relevant columns of a stored visit, or None if it does not exist."""
+    return (
+        VisitRecord.objects.using(using).filter(pk=visit_id)
+        .values("customer_id", "customer__store_id", "cast__store_id", "visit_date", "spending", "unpaid_amount")
+        .first()
+    )
+
+
+def add_visit(state, using=None):
+    """Count a newly stored visit towards its customer."""
+    Customer.objects.using(using).filter(pk=state["customer_id"]).update(
+        total_spend=F("total_spend") + state["spending"],
+        unpaid_balance=F("unpaid_balance") + state["unpaid_amount"],
+        visit_count=F("visit_count") + 1,
+        last_visit_date=Greatest(Coalesce("last_visit_date", Value(state["visit_date"])), Value(state["visit_date"])),
+        updated_at=timezone.now(),
+    )
+
+
+def remove_visit(state, using=None):
+    """Take a visit that is no longer stored out of its customer's stats."""
+    Customer.objects.using(using).filter(pk=state["customer_id"]).update(
+        total_spend=F("total_spend") - state["spending"],
+        unpaid_balance=F("unpaid_balance") - state["unpaid_amount"],
+        visit_count=F("visit_count") - 1,
+        last_visit_date=_last_visit_subquery(),
+        updated_at=timezone.now(),
+    )
+
+
+def change_visit(old, new, using=None):
+    """Apply the difference between a visit's previous and current stored values."""
+    if old["customer_id"] != new["customer_id"]:
+        remove_visit(old, using=using)
+        add_visit(new, using=using)
+        return
+    updates = {}
+    if new["spending"] != old["spending"]:
+        updates["total_spend"] = F("total_spend") + (new["spending"] - old["spending"])
+    if new["unpaid_amount"] != old["unpaid_amount"]:
+        updates["unpaid_balance"] = F("unpaid_balance") + (new["unpaid_amount"] - old["unpaid_amount"])
+    if new["visit_date"] != old["visit_date"]:
+        updates["last_visit_date"] = _last_visit_subquery()
+    if updates:
+        Customer.objects.using(using).filter(pk=new["customer_id"]).update(**updates, updated_at=timezone.now())
+
+
+def recompute_customer_stats(queryset=None):
+    """
+    Rebuild the stats of every customer in `queryset` (default: all) from
+    their visits with one UPDATE. Returns the number of customers updated.
+    """
+    if queryset is None:
+        queryset = Customer.objects.all()
+    visits = VisitRecord.objects.filter(customer=OuterRef("pk")).order_by().values("customer")
+    return queryset.update(
+        total_spend=Coalesce(Subquery(visits.annotate(v=Sum("spending")).values("v")[:1]), ZERO),
+        unpaid_balance=Coalesce(Subquery(visits.annotate(v=Sum("unpaid_amount")).values("v")[:1]), ZERO),
+        visit_count=Coalesce(
+            Subquery(visits.annotate(v=Count("pk")).values("v")[:1], output_field=IntegerField()),
+            Value(0),
+        ),
+        last_visit_date=_last_visit_subquery(),
+        updated_at=timezone.now(),
+    )
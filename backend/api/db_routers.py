@@ -0,0 +1,124 @@
+"""
+Database routers.
+
+`ReplicaRouter` sends every write to `default` and, by default, every read
+too. Reads go to the aliases in settings.DATABASE_REPLICAS (round-robin)
+only while a request has opted in: `ReplicaReadMixin` does so for the safe
+actions a viewset lists in `replica_actions` (lists, retrieves, exports,
+reports). Everything else, including delta sync (`changes`), management
+commands and signal handlers, reads from the primary.
+
+Read-your-writes: the first write of a request pins the rest of it to the
+primary, and after a write (or any unsafe request) `ReplicaRoutingMiddleware`
+sets a short-lived cookie so the client's next requests are pinned too, for
+DATABASE_REPLICA_PIN_SECONDS, by which time the replicas have caught up.
+Reads inside a transaction on the primary also stay there.
+
+The routing only lasts while the view runs: a streamed response body is
+produced after the middleware has returned, so code that queries from it
+must bind its querysets to a database first (see api.exports).
+
+To try it locally, point a replica alias at the primary's data, e.g.
+`DB_REPLICA_HOSTS=localhost` (PostgreSQL) or `DB_ENGINE=sqlite3
+DB_REPLICA_HOSTS=local` (two aliases on the same SQLite file); see settings.
+"""
+import contextvars
+import dataclasses
+import itertools
+import threading
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY = "default"
+PIN_COOKIE = "db_primary_pin"
+
+
+@dataclasses.dataclass
+class RequestRouting:
+    use_replicas: bool = False
+    pinned: bool = False
+    wrote: bool = False
+
+
+_routing = contextvars.ContextVar("db_routing", default=None)
+
+
+def current_routing():
+    """The RequestRouting of the request being handled, or None outside one."""
+    return _routing.get()
+
+
+def reading_from_replica():
+    """True if reads made now would be served by a replica."""
+    routing = _routing.get()
+    return bool(
+        routing is not None
+        and routing.use_replicas
+        and not routing.pinned
+        and getattr(settings, "DATABASE_REPLICAS", None)
+        and not connections[PRIMARY].in_atomic_block
+    )
+
+
+class ReplicaRouter:
+    def __init__(self):
+        self._replicas = itertools.cycle(getattr(settings, "DATABASE_REPLICAS", []) or [PRIMARY])
+        self._lock = threading.Lock()
+
+    def next_replica(self):
+        with self._lock:
+            return next(self._replicas)
+
+    def db_for_read(self, model, **hints):
+        if reading_from_replica():
+            return self.next_replica()
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is not None:
+            routing.pinned = routing.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+class ReplicaRoutingMiddleware:
+    """Scopes a RequestRouting to each request and maintains the pin cookie."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _routing.set(RequestRouting(pinned=PIN_COOKIE in request.COOKIES))
+        try:
+            response = self.get_response(request)
+            if _routing.get().wrote or request.method not in SAFE_METHODS:
+                response.set_cookie(
+                    PIN_COOKIE,
+                    "1",
+                    max_age=getattr(settings, "DATABASE_REPLICA_PIN_SECONDS", 5),
+                    httponly=True,
+                    samesite="Lax",
+                )
+        finally:
+            _routing.reset(token)
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    ViewSet mixin: safe requests to the actions in `replica_actions` read from
+    the replicas, once authentication and permission checks (primary) pass.
+    """
+
+    replica_actions = ("list", "retrieve", "export")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        routing = _routing.get()
+        if routing is not None and request.method in SAFE_METHODS and self.action in self.replica_actions:
+            routing.use_replicas = True
@@ -0,0 +1,182 @@
+"""
+Fast read-only serialization for list responses.
+
+Instead of instantiating a model and running every DRF field per row, a list
+can fetch plain rows with `.values()` and encode them with a plan compiled
+once from the serializer's fields. The plan reproduces each DRF field's
+`to_representation`, so the rendered JSON is byte-identical to the regular
+serializer's. Serializers with fields the plan does not understand (nested
+serializers, method fields, non-default formats) fall back to the regular path.
+"""
+import datetime
+import decimal
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from .pagination import page_row_fields
+
+_plan_cache = {}
+
+
+def _identity(value):
+    return value
+
+
+def _iso_date(value):
+    return value.isoformat()
+
+
+def _decimal_encoder(field):
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    exponent = decimal.Decimal(".1") ** field.decimal_places
+    rounding = field.rounding
+
+    def encode(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return f"{value.quantize(exponent, rounding=rounding, context=context):f}"
+
+    return encode
+
+
+def _datetime_encoder(tz):
+    def encode(value):
+        if tz is not None:
+            value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+        elif timezone.is_aware(value):
+            value = timezone.make_naive(value, datetime.timezone.utc)
+        value = value.isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return encode
+
+
+def _field_kind(field):
+    """Return how to encode a DRF field's value, or None if the plan cannot reproduce it."""
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        return "raw" if field.pk_field is None else None
+    if isinstance(field, serializers.UUIDField):
+        return "str" if field.uuid_format == "hex_verbose" else None
+    if isinstance(field, serializers.DecimalField):
+        coerce = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+        if not coerce or field.localize or field.normalize_output or field.decimal_places is None:
+            return None
+        return "decimal"
+    if isinstance(field, serializers.DateTimeField):
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if output_format is None or output_format.lower() != ISO_8601 or hasattr(field, "timezone"):
+            return None
+        return "datetime"
+    if isinstance(field, serializers.DateField):
+        output_format = getattr(field, "format", api_settings.DATE_FORMAT)
+        if output_format is None or output_format.lower() != ISO_8601:
+            return None
+        return "date"
+    if isinstance(field, serializers.BooleanField):
+        return "bool"
+    if isinstance(field, serializers.IntegerField):
+        return "int"
+    if isinstance(field, serializers.JSONField):
+        return None if field.binary else "raw"
+    if isinstance(field, (serializers.CharField, serializers.ChoiceField)):
+        return "raw"
+    return None
+
+
+class RowPlan:
+    """Precompiled (output name, values() key, encoder kind) list for one serializer field set."""
+
+    def __init__(self, entries, model_fields):
+        self.entries = entries
+        self.model_fields = model_fields
+
+    def columns(self, extra=()):
+        """Columns to pass to `.values()`: the plan's own plus `extra` model fields that exist."""
+        columns = [key for _, key, _, _ in self.entries]
+        for name in extra:
+            if name in self.model_fields and name not in columns:
+                columns.append(name)
+        return columns
+
+    def encode(self, rows):
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        encoders = []
+        for name, key, kind, field in self.entries:
+            if kind == "decimal":
+                encoder = _decimal_encoder(field)
+            elif kind == "datetime":
+                encoder = _datetime_encoder(tz)
+            elif kind == "date":
+                encoder = _iso_date
+            elif kind == "str":
+                encoder = str
+            elif kind == "bool":
+                encoder = bool
+            elif kind == "int":
+                encoder = int
+            else:
+                encoder = _identity
+            encoders.append((name, key, encoder))
+        return [
+            {name: (None if row[key] is None else encoder(row[key])) for name, key, encoder in encoders}
+            for row in rows
+        ]
+
+
+def compile_plan(serializer):
+    """
+    Return a RowPlan for the readable fields of `serializer` (a ModelSerializer
+    instance, possibly pruned by ?fields=), or None if any field is unsupported.
+    """
+    model = serializer.Meta.model
+    readable = [(name, field) for name, field in serializer.fields.items() if not field.write_only]
+    cache_key = (type(serializer), tuple(name for name, _ in readable))
+    if cache_key in _plan_cache:
+        return _plan_cache[cache_key]
+    model_fields = {}
+    for model_field in model._meta.concrete_fields:
+        model_fields[model_field.name] = model_field
+        model_fields[model_field.attname] = model_field
+    entries = []
+    plan = None
+    for name, field in readable:
+        kind = _field_kind(field)
+        model_field = model_fields.get(field.source)
+        if kind is None or model_field is None:
+            break
+        key = model_field.attname if model_field.is_relation else model_field.name
+        entries.append((name, key, kind, field))
+    else:
+        plan = RowPlan(entries, model_fields)
+    _plan_cache[cache_key] = plan
+    return plan
+
+
+class FastListMixin:
+    """
+    ViewSet mixin: serve `list` through `.values()` and a compiled RowPlan when
+    the serializer allows it and API_FAST_LIST_SERIALIZATION is on.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, "API_FAST_LIST_SERIALIZATION", False):
+            return super().list(request, *args, **kwargs)
+        plan = compile_plan(self.get_serializer())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        # Cursor pagination and the list ETag read their fields from each row.
+        queryset = self.filter_queryset(self.get_queryset())
+        columns = plan.columns(extra=page_row_fields(request, self, queryset.model))
+        queryset = queryset.values(*columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.encode(page))
+        return Response(plan.encode(queryset))
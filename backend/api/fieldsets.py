@@ -0,0 +1,72 @@
+"""
+Sparse fieldsets for read requests.
+
+`?fields=a,b` keeps only the listed fields in the response and `?omit=c,d`
+drops the listed ones. `SparseFieldsetMixin` prunes the serializer, and
+`SparseFieldsetFilter` (a default filter backend) defers the model columns
+no remaining field reads, so they are not fetched from the database either.
+"""
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.permissions import SAFE_METHODS
+
+from .pagination import page_row_fields
+
+
+def _param_names(request, name):
+    value = request.query_params.get(name, "")
+    return {part.strip() for part in value.split(",") if part.strip()}
+
+
+def requested_fieldset(request, available):
+    """
+    Return the subset of `available` field names selected by ?fields= / ?omit=,
+    or None when neither is given. Unknown names are a 400.
+    """
+    fields = _param_names(request, "fields")
+    omit = _param_names(request, "omit")
+    if not fields and not omit:
+        return None
+    unknown = (fields | omit) - set(available)
+    if unknown:
+        raise ValidationError({"fields": f"Unknown field(s): {', '.join(sorted(unknown))}."})
+    keep = fields or set(available)
+    return [name for name in available if name in keep and name not in omit]
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin honouring ?fields= / ?omit= on the top-level serializer of GET requests."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self._context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        readable = [name for name, field in self.fields.items() if not field.write_only]
+        keep = requested_fieldset(request, readable)
+        if keep is None:
+            return
+        for name in readable:
+            if name not in keep:
+                self.fields.pop(name)
+
+
+class SparseFieldsetFilter(BaseFilterBackend):
+    """Defer model columns that the (pruned) serializer will not read."""
+
+    def filter_queryset(self, request, queryset, view):
+        if request.method not in SAFE_METHODS or not (
+            request.query_params.get("fields") or request.query_params.get("omit")
+        ):
+            return queryset
+        serializer = view.get_serializer()
+        needed = {field.source.split(".")[0] for field in serializer.fields.values() if not field.write_only}
+        # Cursor pagination and the list ETag read their fields from each instance.
+        needed |= page_row_fields(request, view, queryset.model)
+        meta = queryset.model._meta
+        deferred = [
+            field.name
+            for field in meta.concrete_fields
+            if not field.primary_key and field.name not in needed and field.attname not in needed
+        ]
+        return queryset.defer(*deferred) if deferred else queryset
@@ -0,0 +1,223 @@
+"""
+Query-parameter filter backends for list endpoints.
+Each backend turns `?param=value` pairs into queryset filters so the
+database, not the client, narrows down the rows.
+"""
+import json
+import re
+import uuid
+
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import VisitRecord
+
+TRUE_VALUES = {"1", "true", "yes", "on"}
+FALSE_VALUES = {"0", "false", "no", "off"}
+
+# JSON columns of `customers` accepted by the `?<field>__...` filters.
+CUSTOMER_JSON_FIELDS = ("contact_info", "preferences")
+# JSON keys promoted to generated, b-tree indexed columns on Customer.
+PROMOTED_JSON_KEYS = {
+    ("contact_info", "phone"): "contact_phone",
+    ("contact_info", "line_id"): "contact_line_id",
+}
+JSON_KEY = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def parse_uuid_param(request, name):
+    """Return the UUID in query param `name`, None if absent; 400 if malformed."""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise ValidationError({name: "Must be a valid UUID."})
+
+
+def parse_date_param(request, name):
+    """Return the ISO date in query param `name`, None if absent; 400 if malformed."""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Must be a date in YYYY-MM-DD format."})
+    return parsed
+
+
+def parse_bool_param(request, name):
+    """Return the boolean in query param `name`, None if absent; 400 if malformed."""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    value = value.lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValidationError({name: "Must be true or false."})
+
+
+def _json_path(field, keys):
+    return "$" + "".join(f'."{key}"' for key in keys)
+
+
+def _contained_q(queryset, field, value, keys=()):
+    """
+    Q for `field @> value`. Backends without JSON containment (SQLite) get the
+    same test spelled as key lookups, with json_each() for array members.
+    """
+    if not keys and connections[queryset.db].features.supports_json_field_contains:
+        return Q(**{f"{field}__contains": value})
+    if isinstance(value, dict):
+        if not all(isinstance(key, str) and JSON_KEY.match(key) for key in value):
+            raise ValidationError({f"{field}__contains": "Keys may only contain letters, digits, '_' and '-'."})
+        conditions = [_contained_q(queryset, field, item, (*keys, key)) for key, item in value.items()]
+        return Q(*conditions) if conditions else Q()
+    if isinstance(value, list):
+        conditions = []
+        for item in value:
+            if isinstance(item, (dict, list)):
+                raise ValidationError({f"{field}__contains": "Nested objects in arrays are not supported here."})
+            sql = (
+                f'EXISTS (SELECT 1 FROM json_each("{queryset.model._meta.db_table}"."{field}", %s) '
+                "WHERE json_each.value = %s)"
+            )
+            conditions.append(Q(RawSQL(sql, (_json_path(field, keys), item), output_field=BooleanField())))
+        return Q(*conditions) if conditions else Q()
+    if not keys:
+        raise ValidationError({f"{field}__contains": "Must be a JSON object or array."})
+    return Q(**{"__".join((field, *keys)): value})
+
+
+def filter_json_fields(request, queryset, fields):
+    """
+    `?<field>__<key>[__<key>...]=<value>`: the (nested) key equals the string
+    value, via a promoted column when there is one, else as containment so the
+    jsonb_path_ops GIN index applies. `?<field>__contains=<json>`: the column
+    contains the JSON object (e.g. `{"tags": ["vip"]}`). `?<field>__has_key=<key>`:
+    the top-level key exists (not index-assisted).
+    """
+    for param, values in request.query_params.lists():
+        field, _, rest = param.partition("__")
+        if field not in fields or not rest:
+            continue
+        for value in values:
+            if rest == "contains":
+                try:
+                    document = json.loads(value)
+                except ValueError:
+                    raise ValidationError({param: "Must be valid JSON."})
+                queryset = queryset.filter(_contained_q(queryset, field, document))
+            elif rest == "has_key":
+                queryset = queryset.filter(**{f"{field}__has_key": value})
+            else:
+                keys = tuple(rest.split("__"))
+                if not all(JSON_KEY.match(key) for key in keys):
+                    raise ValidationError({param: "Keys may only contain letters, digits, '_' and '-'."})
+                column = PROMOTED_JSON_KEYS.get((field, *keys))
+                if column is not None:
+                    queryset = queryset.filter(**{column: value})
+                else:
+                    document = value
+                    for key in reversed(keys):
+                        document = {key: document}
+                    queryset = queryset.filter(_contained_q(queryset, field, document))
+    return queryset
+
+
+class CustomerFilterBackend(BaseFilterBackend):
+    """
+    Filters for `/customers/`:
+    store, name (substring), name_prefix, first_visit_from, first_visit_to,
+    and JSON lookups on contact_info / preferences (see filter_json_fields).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        store = parse_uuid_param(request, "store")
+        if store is not None:
+            queryset = queryset.filter(store_id=store)
+        # On PostgreSQL both name filters (and VisitRecordFilterBackend's
+        # customer_name) are served by the indexes of migration 0013.
+        name = request.query_params.get("name", "").strip()
+        if name:
+            queryset = queryset.filter(name__icontains=name)
+        name_prefix = request.query_params.get("name_prefix", "").strip()
+        if name_prefix:
+            queryset = queryset.filter(name__startswith=name_prefix)
+        first_visit_from = parse_date_param(request, "first_visit_from")
+        if first_visit_from is not None:
+            queryset = queryset.filter(first_visit__gte=first_visit_from)
+        first_visit_to = parse_date_param(request, "first_visit_to")
+        if first_visit_to is not None:
+            queryset = queryset.filter(first_visit__lte=first_visit_to)
+        return filter_json_fields(request, queryset, CUSTOMER_JSON_FIELDS)
+
+
+class VisitRecordFilterBackend(BaseFilterBackend):
+    """
+    Filters for `/visit-records/`:
+    store, cast, customer, date_from, date_to, payment_method,
+    unpaid (true = outstanding balance only), customer_name (substring).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        store = parse_uuid_param(request, "store")
+        if store is not None:
+            queryset = queryset.filter(customer__store_id=store)
+        cast = parse_uuid_param(request, "cast")
+        if cast is not None:
+            queryset = queryset.filter(cast_id=cast)
+        customer = parse_uuid_param(request, "customer")
+        if customer is not None:
+            queryset = queryset.filter(customer_id=customer)
+        date_from = parse_date_param(request, "date_from")
+        if date_from is not None:
+            queryset = queryset.filter(visit_date__gte=date_from)
+        date_to = parse_date_param(request, "date_to")
+        if date_to is not None:
+            queryset = queryset.filter(visit_date__lte=date_to)
+        payment_method = request.query_params.get("payment_method")
+        if payment_method:
+            if payment_method not in VisitRecord.PaymentMethod.values:
+                raise ValidationError({
+                    "payment_method": f"Must be one of: {', '.join(VisitRecord.PaymentMethod.values)}.",
+                })
+            queryset = queryset.filter(payment_method=payment_method)
+        unpaid = parse_bool_param(request, "unpaid")
+        if unpaid is True:
+            queryset = queryset.filter(unpaid_amount__gt=0)
+        elif unpaid is False:
+            queryset = queryset.filter(unpaid_amount__lte=0)
+        customer_name = request.query_params.get("customer_name", "").strip()
+        if customer_name:
+            queryset = queryset.filter(customer__name__icontains=customer_name)
+        return queryset
+
+
+class DailySummaryFilterBackend(BaseFilterBackend):
+    """
+    Filters for `/daily-summaries/`:
+    store, date_from, date_to (on report_date).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        store = parse_uuid_param(request, "store")
+        if store is not None:
+            queryset = queryset.filter(store_id=store)
+        date_from = parse_date_param(request, "date_from")
+        if date_from is not None:
+            queryset = queryset.filter(report_date__gte=date_from)
+        date_to = parse_date_param(request, "date_to")
+        if date_to is not None:
+            queryset = queryset.filter(report_date__lte=date_to)
+        return queryset
@@ -0,0 +1,448 @@
+"""
+Bulk CSV import of customers and historical visits.
+
+Used by the `import_csv` management command and the `/customers/import/` and
+`/visit-records/import/` upload actions (`ImportMixin`). The CSV is read row
+by row and loaded in batches of API_IMPORT_BATCH_SIZE: each batch resolves
+its store/customer/cast references through lookup maps built with one query
+per table, validates every row, and writes the valid ones with `bulk_create`
+in one transaction. Invalid rows are skipped and reported by line number;
+they never abort the import. Uploads are checked to be UTF-8 before the
+first batch is read (`check_encoding`), so a badly encoded file is refused
+as a whole instead of after some batches were committed.
+
+When an importing `user` is given (the upload actions), every row's store
+must be one of the user's stores (any store for an Admin): customers by
+their `store`, visits by their customer's store, and a visit's cast must
+work in that same store.
+
+Customer CSV columns: store (UUID or name, optional with a default store),
+name, first_visit, plus optional `contact_info.<key>` / `preferences.<key>`
+columns folded into the JSON fields, `profile.<field>` columns for
+customers_profile and `detail.<field>` columns for customers_detail.
+
+Visit CSV columns: customer (UUID, or the customer name within `store`),
+store, cast (staff member UUID or the cast's user email within the store),
+visit_date, spending, payment_method, and optionally entry_time, exit_time
+(default: midnight of visit_date), accompanied, companions, memo,
+unpaid_amount, received_amount, unpaid_date (default: visit_date), receipt.
+"""
+import codecs
+import csv
+import datetime
+import io
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from . import performance, rollups
+from .customer_stats import recompute_customer_stats
+from .filters import FALSE_VALUES, TRUE_VALUES
+from .models import Customer, CustomerDetail, CustomerProfile, StaffMember, Store, VisitRecord
+from .permissions import check_store_access, has_store_access
+from .search import build_document
+
+
+ENCODING = "utf-8-sig"
+
+
+def check_encoding(chunks):
+    """Raise UnicodeDecodeError unless the byte `chunks` decode as UTF-8 (BOM allowed)."""
+    decoder = codecs.getincrementaldecoder(ENCODING)()
+    for chunk in chunks:
+        decoder.decode(chunk)
+    decoder.decode(b"", final=True)
+
+
+class RowError(Exception):
+    """Rejects one CSV row; `errors` maps column -> list of messages."""
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def convert_value(field, raw):
+    """Turn the CSV text `raw` into a value for model field `field`; raises ValidationError."""
+    raw = (raw or "").strip()
+    if raw == "":
+        if isinstance(field, (models.CharField, models.TextField)) and not field.choices:
+            return ""
+        if field.has_default():
+            return field.get_default()
+        if field.null:
+            return None
+        raise ValidationError("This field is required.")
+    if isinstance(field, models.BooleanField):
+        if raw.lower() in TRUE_VALUES:
+            return True
+        if raw.lower() in FALSE_VALUES:
+            return False
+        raise ValidationError("Must be true or false.")
+    value = field.clean(raw, None)
+    if isinstance(field, models.DateTimeField) and settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+class ImportReport:
+    """Counts, rejected rows and throughput of one import run."""
+
+    def __init__(self, max_rejects):
+        self.max_rejects = max_rejects
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.rejects = []
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def reject(self, line, errors):
+        self.rejected += 1
+        if len(self.rejects) < self.max_rejects:
+            self.rejects.append({"line": line, "errors": errors})
+
+    def finish(self):
+        self.elapsed = time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "seconds": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "rejects": self.rejects,
+        }
+
+
+class CsvImporter:
+    """
+    Base class: subclasses implement `build_lookups(batch)` and
+    `build_row(values, lookups)` (returning the model instances for one row,
+    or raising RowError), and `write(rows)`.
+    """
+
+    model = None
+
+    def __init__(self, default_store=None, batch_size=None, max_rejects=None, user=None):
+        self.default_store = default_store
+        self.user = user
+        self.batch_size = batch_size or getattr(settings, "API_IMPORT_BATCH_SIZE", 1000)
+        self.report = ImportReport(max_rejects or getattr(settings, "API_IMPORT_MAX_REJECTS", 1000))
+        self.fields = {field.name: field for field in self.model._meta.concrete_fields}
+        self._stores = None
+
+    def run(self, reader):
+        """Import every row of `reader` (a csv.DictReader); returns the ImportReport."""
+        batch = []
+        for values in reader:
+            self.report.rows += 1
+            # Line number in the file (the header is line 1).
+            batch.append((reader.line_num, values))
+            if len(batch) >= self.batch_size:
+                self.load_batch(batch)
+                batch = []
+        if batch:
+            self.load_batch(batch)
+        self.report.finish()
+        return self.report
+
+    def load_batch(self, batch):
+        lookups = self.build_lookups([values for _, values in batch])
+        rows = []
+        for line, values in batch:
+            try:
+                rows.append(self.build_row(values, lookups))
+            except RowError as exc:
+                self.report.reject(line, exc.errors)
+        if rows:
+            with transaction.atomic():
+                self.write(rows)
+            self.report.imported += len(rows)
+
+    def convert(self, values, fields, defaults=None, prefix="", model_fields=None):
+        """Convert the `fields` columns of one CSV row; collects errors into a RowError."""
+        model_fields = model_fields or self.fields
+        converted, errors = {}, {}
+        for name in fields:
+            column = prefix + name
+            raw = values.get(column)
+            if (raw is None or not raw.strip()) and defaults and name in defaults:
+                continue
+            try:
+                converted[name] = convert_value(model_fields[name], raw)
+            except ValidationError as exc:
+                errors[column] = exc.messages
+        if errors:
+            raise RowError(errors)
+        return converted
+
+    def store_map(self):
+        """Store UUID string and lower-cased name -> store id (None for ambiguous names); loaded once."""
+        if self._stores is None:
+            self._stores = {}
+            for pk, name in Store.objects.values_list("pk", "name"):
+                self._stores[str(pk)] = pk
+                key = name.strip().lower()
+                self._stores[key] = None if key in self._stores else pk
+        return self._stores
+
+    def resolve_store(self, values):
+        raw = (values.get("store") or "").strip() or self.default_store
+        if not raw:
+            raise RowError({"store": ["This field is required."]})
+        raw = str(raw)
+        stores = self.store_map()
+        key = raw.lower()
+        if key not in stores:
+            try:
+                key = str(uuid.UUID(raw))
+            except ValueError:
+                pass
+        if key not in stores:
+            raise RowError({"store": [f"Store {raw!r} not found."]})
+        if stores[key] is None:
+            raise RowError({"store": [f"Store name {raw!r} is ambiguous; use its UUID."]})
+        self.check_store(stores[key])
+        return stores[key]
+
+    def check_store(self, store_id, column="store"):
+        """Reject the row unless the importing user (if any) may write to `store_id`."""
+        if self.user is not None and not has_store_access(self.user, store_id):
+            raise RowError({column: ["You do not have access to this store."]})
+
+    def build_lookups(self, batch):
+        return {}
+
+    def build_row(self, values, lookups):
+        raise NotImplementedError
+
+    def write(self, rows):
+        raise NotImplementedError
+
+
+class CustomerImporter(CsvImporter):
+    """Creates customers plus, when their columns are present, profile and detail rows."""
+
+    model = Customer
+    FIELDS = ("name", "first_visit")
+    JSON_FIELDS = ("contact_info", "preferences")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profile_fields = {f.name: f for f in CustomerProfile._meta.concrete_fields if not f.primary_key}
+        self.detail_fields = {f.name: f for f in CustomerDetail._meta.concrete_fields if not f.primary_key}
+        self.seen = set()
+
+    def build_lookups(self, batch):
+        """(store_id, name) of customers that already exist, to reject duplicates."""
+        names = {(values.get("name") or "").strip() for values in batch}
+        existing = Customer.objects.filter(name__in=names).values_list("store_id", "name")
+        return {"existing": set(existing)}
+
+    def build_row(self, values, lookups):
+        store_id = self.resolve_store(values)
+        data = self.convert(values, self.FIELDS)
+        key = (store_id, data["name"])
+        if key in lookups["existing"] or key in self.seen:
+            raise RowError({"name": ["A customer with this name already exists in the store."]})
+        json_data = {name: {} for name in self.JSON_FIELDS}
+        for column, raw in values.items():
+            prefix, _, key_name = (column or "").partition(".")
+            if prefix in json_data and key_name and raw and raw.strip():
+                json_data[prefix][key_name] = raw.strip()
+        customer = Customer(store_id=store_id, **data, **json_data)
+        profile = detail = None
+        if any((values.get(f"profile.{name}") or "").strip() for name in self.profile_fields):
+            profile = CustomerProfile(
+                customer=customer,
+                **self.convert(values, self.profile_fields, prefix="profile.", model_fields=self.profile_fields),
+            )
+        if any((values.get(f"detail.{name}") or "").strip() for name in self.detail_fields):
+            detail = CustomerDetail(
+                customer=customer,
+                **self.convert(values, self.detail_fields, prefix="detail.", model_fields=self.detail_fields),
+            )
+        self.seen.add((store_id, customer.name))
+        return customer, profile, detail
+
+    def write(self, rows):
+        for customer, _, detail in rows:
+            customer.search_name, customer.search_document = build_document(
+                customer.name, customer.contact_info, detail.company_name if detail is not None else ""
+            )
+        Customer.objects.bulk_create([customer for customer, _, _ in rows])
+        CustomerProfile.objects.bulk_create([profile for _, profile, _ in rows if profile is not None])
+        CustomerDetail.objects.bulk_create([detail for _, _, detail in rows if detail is not None])
+
+
+class VisitImporter(CsvImporter):
+    """Creates visit records, then refreshes the touched customers' stats and daily rollups."""
+
+    model = VisitRecord
+    FIELDS = (
+        "visit_date",
+        "spending",
+        "payment_method",
+        "entry_time",
+        "exit_time",
+        "accompanied",
+        "companions",
+        "memo",
+        "unpaid_amount",
+        "received_amount",
+        "unpaid_date",
+        "receipt",
+    )
+    DEFAULTS = {
+        "accompanied": False,
+        "unpaid_amount": 0,
+        "received_amount": 0,
+        "receipt": False,
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._casts = None
+
+    def cast_map(self):
+        """Staff member UUID string and (store_id, lower-cased user email) -> staff member id; loaded once."""
+        if self._casts is None:
+            self._casts = {}
+            for pk, store_id, email in StaffMember.objects.values_list("pk", "store_id", "user__email"):
+                self._casts[str(pk)] = (pk, store_id)
+                self._casts[(store_id, email.lower())] = (pk, store_id)
+        return self._casts
+
+    def build_lookups(self, batch):
+        """(store_id, name) -> customer id for the names referenced in the batch (None if ambiguous)."""
+        names, ids = set(), set()
+        for values in batch:
+            raw = (values.get("customer") or "").strip()
+            try:
+                ids.add(uuid.UUID(raw))
+            except ValueError:
+                names.add(raw)
+        customers = {}
+        for pk, store_id, name in Customer.objects.filter(
+            models.Q(pk__in=ids) | models.Q(name__in=names)
+        ).values_list("pk", "store_id", "name"):
+            customers[pk] = (pk, store_id)
+            key = (store_id, name)
+            customers[key] = None if key in customers else (pk, store_id)
+        return {"customers": customers}
+
+    def resolve_customer(self, values, lookups):
+        raw = (values.get("customer") or "").strip()
+        if not raw:
+            raise RowError({"customer": ["This field is required."]})
+        customers = lookups["customers"]
+        try:
+            key = uuid.UUID(raw)
+        except ValueError:
+            key = (self.resolve_store(values), raw)
+        if key not in customers:
+            raise RowError({"customer": [f"Customer {raw!r} not found."]})
+        if customers[key] is None:
+            raise RowError({"customer": [f"Customer name {raw!r} is ambiguous in the store; use its UUID."]})
+        self.check_store(customers[key][1], column="customer")
+        return customers[key]
+
+    def resolve_cast(self, values, store_id):
+        raw = (values.get("cast") or "").strip()
+        if not raw:
+            raise RowError({"cast": ["This field is required."]})
+        casts = self.cast_map()
+        try:
+            key = str(uuid.UUID(raw))
+        except ValueError:
+            key = (store_id, raw.lower())
+        # A UUID can name a staff member of any store; the cast must work in the customer's.
+        if key not in casts or casts[key][1] != store_id:
+            raise RowError({"cast": [f"Staff member {raw!r} not found in the store."]})
+        return casts[key][0]
+
+    def build_row(self, values, lookups):
+        customer_id, store_id = self.resolve_customer(values, lookups)
+        cast_id = self.resolve_cast(values, store_id)
+        defaulted = {*self.DEFAULTS, "entry_time", "exit_time", "unpaid_date"}
+        data = {**self.DEFAULTS, **self.convert(values, self.FIELDS, defaults=defaulted)}
+        midnight = datetime.datetime.combine(data["visit_date"], datetime.time())
+        if settings.USE_TZ:
+            midnight = timezone.make_aware(midnight)
+        data.setdefault("entry_time", midnight)
+        data.setdefault("exit_time", midnight)
+        data.setdefault("unpaid_date", data["visit_date"])
+        visit = VisitRecord(customer_id=customer_id, cast_id=cast_id, **data)
+        return visit, store_id
+
+    def write(self, rows):
+        VisitRecord.objects.bulk_create([visit for visit, _ in rows])
+        # bulk_create skips the signals that keep customer stats and daily
+        # rollups current, so refresh them for the batch.
+        customer_ids = {visit.customer_id for visit, _ in rows}
+        recompute_customer_stats(Customer.objects.filter(pk__in=customer_ids))
+        days = defaultdict(set)
+        for visit, store_id in rows:
+            days[store_id].add(visit.visit_date)
+        for store_id, store_days in days.items():
+            for day in store_days:
+                rollups.mark_day_dirty(store_id, day)
+        performance.invalidate_casts({visit.cast_id for visit, _ in rows})
+
+
+IMPORTERS = {
+    "customers": CustomerImporter,
+    "visits": VisitImporter,
+}
+
+
+def run_import(kind, stream, **options):
+    """Import the text stream `stream` as CSV of `kind` ("customers" or "visits")."""
+    reader = csv.DictReader(stream)
+    return IMPORTERS[kind](**options).run(reader)
+
+
+class ImportMixin:
+    """
+    Adds `/<resource>/import/`: POST a multipart `file` (UTF-8 CSV, BOM allowed)
+    and optional `store` (default store for rows without one). Rows are limited
+    to the caller's stores. Responds with the ImportReport.
+    """
+
+    import_kind = None
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_csv(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"file": ["No file was submitted."]}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            check_encoding(upload.chunks())
+        except UnicodeDecodeError:
+            return Response({"file": ["File must be UTF-8 encoded CSV."]}, status=status.HTTP_400_BAD_REQUEST)
+        upload.seek(0)
+        importer = IMPORTERS[self.import_kind](default_store=request.data.get("store") or None)
+        if importer.default_store is not None:
+            try:
+                store_id = importer.resolve_store({})
+            except RowError as exc:
+                return Response(exc.errors, status=status.HTTP_400_BAD_REQUEST)
+            check_store_access(request.user, store_id)
+        importer.user = request.user
+        stream = io.TextIOWrapper(upload.file, encoding=ENCODING, newline="")
+        report = importer.run(csv.DictReader(stream))
+        return Response(report.as_dict())
@@ -0,0 +1,136 @@
+"""
+Email + password login for CmsUser (`jwt_login`).
+
+Password checks are deliberately slow, so `authenticate` keeps them off the
+hot path of an attack: failed attempts are counted per client IP and per
+account in a shared cache (LOGIN_THROTTLE_CACHE) over fixed windows of
+LOGIN_THROTTLE_WINDOW seconds, and once either limit is reached further
+attempts are refused with `LoginThrottled` before any hashing. A successful
+login clears the account's count; the IP count only ever holds failures, so
+many staff signing in from one shop's address at shift change are not
+blocked.
+
+An unknown email is checked against a dummy hash of the same hasher, so it
+costs as much as a wrong password and response times do not reveal which
+emails exist; the dummy hash is made at startup (and again when the setting
+changes) so the first such request is not slower. After a successful check, a hash made with another hasher (or
+fewer iterations) than CMS_PASSWORD_HASHER is transparently re-hashed.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.crypto import get_random_string
+
+from .models import CmsUser
+
+FAILURES_KEY = "login-failures:{}:{}:{}"
+
+
+class LoginThrottled(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Too many failed login attempts.")
+        self.retry_after = retry_after
+
+
+def _hasher():
+    return getattr(settings, "CMS_PASSWORD_HASHER", "default")
+
+
+def hash_password(raw_password):
+    """Encode `raw_password` for CmsUser.password_hash with CMS_PASSWORD_HASHER."""
+    return make_password(raw_password, hasher=_hasher())
+
+
+_dummy_hash = None
+
+
+def prepare_dummy_hash():
+    """Hash a random password with CMS_PASSWORD_HASHER for unknown emails; see api.apps."""
+    global _dummy_hash
+    _dummy_hash = make_password(get_random_string(32), hasher=_hasher())
+
+
+@receiver(setting_changed)
+def _hasher_changed(setting, **kwargs):
+    if setting == "CMS_PASSWORD_HASHER":
+        prepare_dummy_hash()
+
+
+def _cache():
+    return caches[getattr(settings, "LOGIN_THROTTLE_CACHE", "default")]
+
+
+def client_ip(request):
+    """The client address: REMOTE_ADDR, or the LOGIN_CLIENT_IP_HEADER META key set by a trusted proxy."""
+    header = getattr(settings, "LOGIN_CLIENT_IP_HEADER", None)
+    if header and request.META.get(header):
+        return request.META[header].split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _window():
+    length = getattr(settings, "LOGIN_THROTTLE_WINDOW", 300)
+    now = int(time.time())
+    return now // length, length - now % length
+
+
+def _account(email):
+    # Cache keys hold a digest, not the address itself.
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+
+def _scopes(email, ip):
+    return (
+        ("ip", ip, getattr(settings, "LOGIN_MAX_FAILURES_PER_IP", 50)),
+        ("account", _account(email), getattr(settings, "LOGIN_MAX_FAILURES_PER_ACCOUNT", 5)),
+    )
+
+
+def _record_failure(email, ip):
+    cache = _cache()
+    window, remaining = _window()
+    for scope, ident, _limit in _scopes(email, ip):
+        key = FAILURES_KEY.format(scope, ident, window)
+        cache.add(key, 0, remaining)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr().
+            cache.set(key, 1, remaining)
+
+
+def authenticate(email, password, ip):
+    """
+    The CmsUser with this email and password, or None. Raises LoginThrottled
+    (without checking the password) while the IP or the account is over its limit.
+    """
+    email, password = str(email), str(password)
+    cache = _cache()
+    window, remaining = _window()
+    scopes = _scopes(email, ip)
+    counts = cache.get_many([FAILURES_KEY.format(scope, ident, window) for scope, ident, _limit in scopes])
+    for scope, ident, limit in scopes:
+        if counts.get(FAILURES_KEY.format(scope, ident, window), 0) >= limit:
+            raise LoginThrottled(remaining)
+
+    hasher = _hasher()
+    user = CmsUser.objects.filter(email=email).first()
+    if user is None:
+        check_password(password, _dummy_hash)
+        _record_failure(email, ip)
+        return None
+
+    def upgrade(raw_password):
+        user.password_hash = make_password(raw_password, hasher=hasher)
+        user.save(update_fields=["password_hash", "updated_at"])
+
+    if not check_password(password, user.password_hash, setter=upgrade, preferred=hasher):
+        _record_failure(email, ip)
+        return None
+    cache.delete(FAILURES_KEY.format("account", _account(email), window))
+    return user
@@ -0,0 +1,69 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.test import Client
+
+from api.auth import tokens_for_user
+from api.models import CmsUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test an endpoint with a new database connection per request "
+        "(CONN_MAX_AGE=0) and with persistent, health-checked connections, "
+        "and compare latencies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/customers/?page_size=20", help="Endpoint to request.")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per mode (default 500).")
+        parser.add_argument("--database", default="default", help="Database alias to reconfigure.")
+        parser.add_argument("--email", help="User to authenticate as (default: the first Admin).")
+
+    def run(self, client, path, count):
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = client.get(path)
+            # The test client skips the request_finished handler that a real
+            # server runs; call it so CONN_MAX_AGE is honoured per request.
+            close_old_connections()
+            timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"{path} returned {response.status_code}")
+        return timings
+
+    def get_user(self, email):
+        users = CmsUser.objects.all()
+        user = users.filter(email=email).first() if email else users.filter(role=CmsUser.Role.ADMIN).first()
+        if user is None:
+            raise CommandError(f"No user {email}." if email else "No Admin user; pass --email.")
+        return user
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        original = (connection.settings_dict["CONN_MAX_AGE"], connection.settings_dict["CONN_HEALTH_CHECKS"])
+        token = tokens_for_user(self.get_user(options["email"])).access_token
+        client = Client(HTTP_HOST="localhost", HTTP_AUTHORIZATION=f"Bearer {token}")
+        modes = [("new connection per request", 0, False), ("persistent connections", 600, True)]
+        results = {}
+        try:
+            for label, max_age, health_checks in modes:
+                connection.close()
+                connection.settings_dict["CONN_MAX_AGE"] = max_age
+                connection.settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+                self.run(client, options["path"], 10)  # warm up
+                timings = self.run(client, options["path"], options["requests"])
+                results[label] = timings
+                self.stdout.write(
+                    f"{label:<28} mean {statistics.mean(timings):7.2f} ms  "
+                    f"p50 {statistics.median(timings):7.2f} ms  "
+                    f"p95 {statistics.quantiles(timings, n=20)[-1]:7.2f} ms"
+                )
+        finally:
+            connection.close()
+            connection.settings_dict["CONN_MAX_AGE"], connection.settings_dict["CONN_HEALTH_CHECKS"] = original
+        before, after = (statistics.mean(results[label]) for label, _, _ in modes)
+        self.stdout.write(self.style.SUCCESS(f"Persistent connections: {(1 - after / before) * 100:.1f}% lower mean latency."))
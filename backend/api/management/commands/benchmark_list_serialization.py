@@ -0,0 +1,77 @@
+import datetime
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import compile_plan
+from api.models import VisitRecord
+from api.serializers import VisitRecordSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare VisitRecordSerializer(many=True) with the compiled fast path on "
+        "synthetic in-memory rows, checking that both render identical JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, action="append",
+            help="Row count to benchmark; repeat for several (default: 10000 and 100000).",
+        )
+
+    def make_rows(self, count):
+        now = timezone.now()
+        customer_ids = [uuid.uuid4() for _ in range(50)]
+        cast_ids = [uuid.uuid4() for _ in range(10)]
+        methods = VisitRecord.PaymentMethod.values
+        rows = []
+        for i in range(count):
+            day = datetime.date(2024, 1, 1) + datetime.timedelta(days=i % 365)
+            rows.append({
+                "id": uuid.uuid4(),
+                "customer_id": customer_ids[i % len(customer_ids)],
+                "cast_id": cast_ids[i % len(cast_ids)],
+                "visit_date": day,
+                "spending": Decimal(i % 100000) / 100,
+                "payment_method": methods[i % len(methods)],
+                "entry_time": now - datetime.timedelta(minutes=i),
+                "exit_time": now,
+                "accompanied": bool(i % 2),
+                "companions": "",
+                "memo": f"memo {i}",
+                "unpaid_amount": Decimal(i % 7),
+                "received_amount": i,
+                "unpaid_date": day,
+                "receipt": bool(i % 3),
+                "updated_at": now,
+            })
+        return rows
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        plan = compile_plan(VisitRecordSerializer())
+        if plan is None:
+            raise CommandError("VisitRecordSerializer is not supported by the fast path.")
+        for count in options["rows"] or [10000, 100000]:
+            rows = self.make_rows(count)
+            instances = [VisitRecord(**row) for row in rows]
+
+            started = time.perf_counter()
+            slow = renderer.render(VisitRecordSerializer(instances, many=True).data)
+            slow_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            fast = renderer.render(plan.encode(rows))
+            fast_seconds = time.perf_counter() - started
+
+            if slow != fast:
+                raise CommandError(f"Output differs at {count} rows.")
+            self.stdout.write(
+                f"{count:>8} rows  serializer {slow_seconds:7.3f}s  fast path {fast_seconds:7.3f}s  "
+                f"speedup {slow_seconds / fast_seconds:5.1f}x  ({len(fast)} bytes, identical)"
+            )
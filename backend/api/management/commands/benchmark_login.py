@@ -0,0 +1,47 @@
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from api import login
+from api.models import CmsUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure single-core login throughput of api.login.authenticate for a correct "
+        "password, a wrong password, an unknown email and a throttled client. The "
+        "benchmark user is created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--attempts", type=int, default=20, help="Logins per scenario (default 20).")
+
+    def run(self, label, attempts, email, password, ip):
+        timings = []
+        for _ in range(attempts):
+            started = time.perf_counter()
+            try:
+                login.authenticate(email, password, ip)
+            except login.LoginThrottled:
+                pass
+            timings.append(time.perf_counter() - started)
+        mean = statistics.mean(timings)
+        self.stdout.write(f"{label:<16} {1 / mean:10.1f} logins/s  mean {mean * 1000:8.2f} ms")
+
+    def handle(self, *args, **options):
+        attempts = options["attempts"]
+        email = f"benchmark-{uuid.uuid4().hex}@example.com"
+        ip = f"benchmark-{uuid.uuid4().hex}"
+        with transaction.atomic():
+            CmsUser.objects.create(email=email, username="benchmark", password_hash=login.hash_password("secret"))
+            with override_settings(LOGIN_MAX_FAILURES_PER_IP=10 ** 9, LOGIN_MAX_FAILURES_PER_ACCOUNT=10 ** 9):
+                self.run("correct password", attempts, email, "secret", ip)
+                self.run("wrong password", attempts, email, "wrong", ip)
+                self.run("unknown email", attempts, f"missing-{email}", "secret", ip)
+            with override_settings(LOGIN_MAX_FAILURES_PER_IP=0):
+                self.run("throttled", attempts, email, "secret", ip)
+            transaction.set_rollback(True)
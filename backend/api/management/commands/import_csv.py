@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.imports import ENCODING, IMPORTERS, check_encoding, run_import
+
+
+class Command(BaseCommand):
+    help = (
+        "Import customers (with profile/detail columns) or historical visits "
+        "from a CSV file. See api/imports.py for the columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path", help="CSV file (UTF-8, header row required).")
+        parser.add_argument("--store", help="Store UUID or name for rows without a store column.")
+        parser.add_argument("--batch-size", type=int, help="Rows per transaction (default API_IMPORT_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], "rb") as raw:
+                check_encoding(iter(lambda: raw.read(64 * 1024), b""))
+            stream = open(options["path"], encoding=ENCODING, newline="")
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except UnicodeDecodeError:
+            raise CommandError(f"{options['path']} is not UTF-8 encoded; nothing was imported.")
+        with stream:
+            report = run_import(
+                options["kind"],
+                stream,
+                default_store=options["store"],
+                batch_size=options["batch_size"],
+            )
+        for reject in report.rejects:
+            errors = "; ".join(f"{column}: {' '.join(messages)}" for column, messages in reject["errors"].items())
+            self.stderr.write(f"line {reject['line']}: {errors}")
+        if report.rejected > len(report.rejects):
+            self.stderr.write(f"... {report.rejected - len(report.rejects)} more rejected rows not shown.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report.imported} of {report.rows} rows ({report.rejected} rejected) "
+            f"in {report.elapsed:.2f}s, {report.rows_per_second:.0f} rows/s."
+        ))
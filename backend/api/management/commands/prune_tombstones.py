@@ -0,0 +1,23 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete delta-sync tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS; "
+        "clients with older watermarks are told to sync from scratch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Retention in days (default: SYNC_TOMBSTONE_RETENTION_DAYS).")
+
+    def handle(self, *args, **options):
+        days = options["days"] or getattr(settings, "SYNC_TOMBSTONE_RETENTION_DAYS", 30)
+        cutoff = timezone.now() - datetime.timedelta(days=days)
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstones older than {days} days."))
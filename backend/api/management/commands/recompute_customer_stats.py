@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.customer_stats import recompute_customer_stats
+from api.models import Customer
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild Customer.total_spend, visit_count, last_visit_date and "
+        "unpaid_balance from visit_records, repairing any drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store", help="Only recompute customers of this store UUID.")
+
+    def handle(self, *args, **options):
+        queryset = Customer.objects.all()
+        if options["store"]:
+            queryset = queryset.filter(store_id=options["store"])
+        updated = recompute_customer_stats(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Recomputed stats for {updated} customers."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from api.rollups import refresh_daily_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute daily_summaries.total_sales/labor_costs and daily_payment_totals "
+        "from visit_records and staff_members for a date range."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", required=True, help="First day (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="end", required=True, help="Last day (YYYY-MM-DD), inclusive.")
+        parser.add_argument("--store", action="append", help="Store UUID; repeat for several. Default: all.")
+
+    def handle(self, *args, **options):
+        start = parse_date(options["start"])
+        end = parse_date(options["end"])
+        if start is None or end is None:
+            raise CommandError("--from and --to must be dates in YYYY-MM-DD format.")
+        if start > end:
+            raise CommandError("--from must not be after --to.")
+        written = refresh_daily_rollups(store_ids=options["store"], start=start, end=end)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily summaries for {start}..{end}."))
@@ -0,0 +1,78 @@
+# Generated manually for composite indexes on the list/report access paths
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_summaries(apps, schema_editor):
+    """
+    Fold rows sharing (store, report_date) into one before the unique
+    constraint is added. The sales and expense screens each created their own
+    row for a day, so amounts are summed and distinct notes are joined.
+    """
+    DailySummary = apps.get_model("api", "DailySummary")
+    summaries = DailySummary.objects.using(schema_editor.connection.alias)
+    duplicates = (
+        summaries.values("store_id", "report_date")
+        .annotate(rows=Count("id"))
+        .filter(rows__gt=1)
+    )
+    for key in list(duplicates):
+        keep, *rest = summaries.filter(store_id=key["store_id"], report_date=key["report_date"]).order_by("id")
+        totals = {name: getattr(keep, name) for name in ("total_sales", "total_expenses", "labor_costs")}
+        notes = [keep.notes] if keep.notes else []
+        for row in rest:
+            for name in totals:
+                totals[name] += getattr(row, name)
+            if row.notes and row.notes not in notes:
+                notes.append(row.notes)
+        # update() leaves store_id alone, so no foreign key check is queued
+        # ahead of the ALTER TABLE below.
+        summaries.filter(pk=keep.pk).update(notes="\n".join(notes), **totals)
+        summaries.filter(pk__in=[row.pk for row in rest]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_add_username_to_cmsuser"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["store", "name"], name="customers_store_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="performancetarget",
+            index=models.Index(fields=["staff", "target_date"], name="perf_targets_staff_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="visitrecord",
+            index=models.Index(fields=["visit_date"], name="visit_records_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="visitrecord",
+            index=models.Index(fields=["cast", "visit_date"], name="visit_records_cast_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="visitrecord",
+            index=models.Index(fields=["customer", "visit_date"], name="visit_records_cust_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="visitrecord",
+            index=models.Index(
+                fields=["customer", "unpaid_date"],
+                name="visit_records_unpaid_idx",
+                condition=models.Q(unpaid_amount__gt=0),
+            ),
+        ),
+        migrations.RunPython(merge_duplicate_summaries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="dailysummary",
+            constraint=models.UniqueConstraint(
+                fields=["store", "report_date"],
+                name="daily_summaries_store_date_uniq",
+            ),
+        ),
+    ]
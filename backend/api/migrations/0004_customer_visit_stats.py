@@ -0,0 +1,58 @@
+# Generated manually for incrementally maintained customer visit stats.
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_visit_stats(apps, schema_editor):
+    # The visit writes from here on adjust these columns by F() deltas, so they
+    # must start from the visits (as api.customer_stats.recompute_customer_stats
+    # does), not from 0 or the hand-entered total_spend.
+    Customer = apps.get_model("api", "Customer")
+    VisitRecord = apps.get_model("api", "VisitRecord")
+    db = schema_editor.connection.alias
+    visits = VisitRecord.objects.using(db).filter(customer=OuterRef("pk")).order_by().values("customer")
+    zero = Value(Decimal("0"), output_field=DecimalField(max_digits=8, decimal_places=2))
+    Customer.objects.using(db).update(
+        total_spend=Coalesce(Subquery(visits.annotate(v=Sum("spending")).values("v")[:1]), zero),
+        unpaid_balance=Coalesce(Subquery(visits.annotate(v=Sum("unpaid_amount")).values("v")[:1]), zero),
+        visit_count=Coalesce(
+            Subquery(visits.annotate(v=Count("pk")).values("v")[:1], output_field=IntegerField()),
+            Value(0),
+        ),
+        last_visit_date=Subquery(visits.annotate(last=Max("visit_date")).values("last")[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customer",
+            name="total_spend",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="visit_count",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="last_visit_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="unpaid_balance",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=8),
+        ),
+        migrations.RunPython(fill_visit_stats, migrations.RunPython.noop),
+    ]
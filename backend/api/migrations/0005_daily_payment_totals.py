@@ -0,0 +1,50 @@
+# Generated manually for the daily sales rollup (api.rollups)
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_customer_visit_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyPaymentTotal",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("report_date", models.DateField()),
+                (
+                    "payment_method",
+                    models.CharField(
+                        choices=[("Cash", "Cash"), ("Credit Card", "Credit Card"), ("PayPay", "PayPay")],
+                        max_length=255,
+                    ),
+                ),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("visit_count", models.IntegerField()),
+                (
+                    "store",
+                    models.ForeignKey(
+                        db_column="store_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_payment_totals",
+                        to="api.store",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "daily_payment_totals",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("store", "report_date", "payment_method"),
+                        name="daily_payment_totals_uniq",
+                    ),
+                ],
+            },
+        ),
+    ]
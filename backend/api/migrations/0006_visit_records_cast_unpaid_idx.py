@@ -0,0 +1,21 @@
+# Generated manually for the receivables report (api.receivables)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_daily_payment_totals"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="visitrecord",
+            index=models.Index(
+                fields=["cast", "unpaid_date"],
+                name="visit_records_cast_unpaid_idx",
+                condition=models.Q(unpaid_amount__gt=0),
+            ),
+        ),
+    ]
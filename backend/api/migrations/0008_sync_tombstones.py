@@ -0,0 +1,54 @@
+# Generated manually for delta sync (api.sync)
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("resource", models.CharField(max_length=100)),
+                ("object_id", models.UUIDField()),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "db_table": "sync_tombstones",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="cmsuser",
+            index=models.Index(fields=["updated_at", "id"], name="users_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["updated_at", "id"], name="customers_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="dailysummary",
+            index=models.Index(fields=["updated_at", "id"], name="daily_summaries_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="staffmember",
+            index=models.Index(fields=["updated_at", "id"], name="staff_members_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="store",
+            index=models.Index(fields=["updated_at", "id"], name="stores_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="visitrecord",
+            index=models.Index(fields=["updated_at", "id"], name="visit_records_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(fields=["resource", "deleted_at", "id"], name="sync_tombstones_resource_idx"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated manually for store-scoped querysets (api.permissions)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_sync_tombstones"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="customer",
+            name="customers_store_name_idx",
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["store", "name", "id"], name="customers_store_name_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="staffmember",
+            index=models.Index(fields=["store", "id"], name="staff_members_store_idx"),
+        ),
+    ]
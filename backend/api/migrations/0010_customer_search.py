@@ -0,0 +1,85 @@
+# Generated manually for customer search (api.search)
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+# A frozen copy of api.search.normalize/build_document as of this migration:
+# later changes to api.search must not change what this migration writes.
+KANJI_VARIANTS = str.maketrans({
+    "髙": "高", "﨑": "崎", "嵜": "崎", "邊": "辺", "邉": "辺", "澤": "沢", "濱": "浜",
+    "廣": "広", "櫻": "桜", "國": "国", "齋": "斎", "齊": "斉", "圓": "円", "嶋": "島",
+    "冨": "富", "德": "徳", "槇": "槙", "眞": "真", "惠": "恵", "瀧": "滝", "龍": "竜",
+})
+KATAKANA_TO_HIRAGANA = str.maketrans({chr(code): chr(code - 0x60) for code in range(0x30A1, 0x30F7)})
+SEPARATORS = re.compile(r"[\s\-‐‑‒–—―−()（）・.]+")
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKC", str(text)).casefold()
+    text = text.translate(KATAKANA_TO_HIRAGANA).translate(KANJI_VARIANTS)
+    return SEPARATORS.sub("", text)
+
+
+def build_document(name, contact_info=None, company_name="", hobby=""):
+    values = [name]
+    if isinstance(contact_info, dict):
+        values += [value for value in contact_info.values() if isinstance(value, (str, int))]
+    values += [company_name or "", hobby or ""]
+    parts = [part for part in (normalize(value) for value in values) if part]
+    return normalize(name), " ".join(parts)
+
+
+def fill_search_documents(apps, schema_editor):
+    Customer = apps.get_model("api", "Customer")
+    customers = Customer.objects.using(schema_editor.connection.alias)
+    rows = customers.values_list("pk", "name", "contact_info", "detail__company_name", "preference__hobby")
+    batch = []
+    for pk, name, contact_info, company_name, hobby in rows.iterator(chunk_size=BATCH_SIZE):
+        search_name, search_document = build_document(name, contact_info, company_name, hobby)
+        batch.append(Customer(pk=pk, search_name=search_name, search_document=search_document))
+        if len(batch) == BATCH_SIZE:
+            customers.bulk_update(batch, ["search_name", "search_document"])
+            batch = []
+    customers.bulk_update(batch, ["search_name", "search_document"])
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm and GIN exist only on PostgreSQL; elsewhere api.search falls back to Python.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS customers_search_trgm_idx ON customers USING gin (search_document gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS customers_search_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_store_scoped_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customer",
+            name="search_name",
+            field=models.CharField(blank=True, default="", editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="search_document",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
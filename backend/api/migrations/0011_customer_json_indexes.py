@@ -0,0 +1,63 @@
+# Generated manually for JSON filters on customers (api.filters)
+
+import django.db.models.fields.json
+from django.db import migrations, models
+
+JSON_INDEXES = {
+    "customers_contact_info_gin_idx": "contact_info",
+    "customers_preferences_gin_idx": "preferences",
+}
+
+
+def create_gin_indexes(apps, schema_editor):
+    # jsonb_path_ops GIN indexes serve @> containment; they exist only on PostgreSQL.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, column in JSON_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON customers USING gin ({column} jsonb_path_ops)"
+        )
+
+
+def drop_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in JSON_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_customer_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customer",
+            name="contact_phone",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.fields.json.KeyTextTransform("phone", "contact_info"),
+                output_field=models.CharField(max_length=255, null=True),
+            ),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="contact_line_id",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.fields.json.KeyTextTransform("line_id", "contact_info"),
+                output_field=models.CharField(max_length=255, null=True),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["store", "contact_phone"], name="customers_store_phone_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["store", "contact_line_id"], name="customers_store_line_id_idx"),
+        ),
+        migrations.RunPython(create_gin_indexes, drop_gin_indexes),
+    ]
@@ -0,0 +1,50 @@
+# Generated manually for (created_at, id) list keysets (api.pagination)
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_customer_json_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="store",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name="staffmember",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name="visitrecord",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.RemoveIndex(
+            model_name="staffmember",
+            name="staff_members_store_idx",
+        ),
+        migrations.AddIndex(
+            model_name="staffmember",
+            index=models.Index(fields=["store", "created_at", "id"], name="staff_members_store_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["store", "created_at", "id"], name="customers_store_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="visitrecord",
+            index=models.Index(fields=["created_at", "id"], name="visit_records_created_idx"),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated manually for name substring/prefix filters (api.filters)
+
+from django.db import migrations
+
+# PostgreSQL compiles name__icontains to UPPER("name"::text) LIKE UPPER(%s) and
+# name__startswith to "name"::text LIKE %s, so the indexes are built on those
+# exact expressions. The ::text cast makes the prefix index's operator class
+# text_pattern_ops (varchar_pattern_ops is the same for a varchar column);
+# pattern ops serve LIKE 'prefix%' under any collation, not only "C".
+PATTERN_INDEXES = {
+    "customers_name_trgm_idx": "CREATE INDEX IF NOT EXISTS customers_name_trgm_idx "
+    "ON customers USING gin ((UPPER(name::text)) gin_trgm_ops)",
+    "customers_store_name_prefix_idx": "CREATE INDEX IF NOT EXISTS customers_store_name_prefix_idx "
+    "ON customers (store_id, (name::text) text_pattern_ops)",
+}
+
+
+def create_pattern_indexes(apps, schema_editor):
+    # pg_trgm and operator classes exist only on PostgreSQL.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for sql in PATTERN_INDEXES.values():
+        schema_editor.execute(sql)
+
+
+def drop_pattern_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in PATTERN_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0012_created_at_keysets"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_pattern_indexes, drop_pattern_indexes),
+    ]
@@ -0,0 +1,43 @@
+# Generated manually for money totals that outgrow a single visit's precision
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_customer_name_pattern_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="customer",
+            name="total_spend",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="customer",
+            name="unpaid_balance",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="dailysummary",
+            name="total_sales",
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="dailysummary",
+            name="total_expenses",
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="dailysummary",
+            name="labor_costs",
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="dailypaymenttotal",
+            name="amount",
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated manually for shift history behind labor rollups (api.rollups)
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def record_current_shifts(apps, schema_editor):
+    # Until now only each staff member's current check-in/check-out pair was kept.
+    StaffMember = apps.get_model("api", "StaffMember")
+    Shift = apps.get_model("api", "Shift")
+    db = schema_editor.connection.alias
+    Shift.objects.using(db).bulk_create(
+        [
+            Shift(
+                staff_id=staff_id,
+                store_id=store_id,
+                hourly_wage=hourly_wage,
+                check_in=check_in,
+                check_out=check_out,
+            )
+            for staff_id, store_id, hourly_wage, check_in, check_out in StaffMember.objects.using(db).values_list(
+                "pk", "store_id", "hourly_wage", "check_in", "check_out"
+            ).iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_widen_money_totals"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Shift",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("hourly_wage", models.DecimalField(decimal_places=2, max_digits=8)),
+                ("check_in", models.DateTimeField()),
+                ("check_out", models.DateTimeField()),
+                (
+                    "staff",
+                    models.ForeignKey(
+                        db_column="staff_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shifts",
+                        to="api.staffmember",
+                    ),
+                ),
+                (
+                    "store",
+                    models.ForeignKey(
+                        db_column="store_id",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="shifts",
+                        to="api.store",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "staff_shifts",
+                "indexes": [models.Index(fields=["store", "check_in"], name="staff_shifts_store_idx")],
+                "constraints": [
+                    models.UniqueConstraint(fields=["staff", "check_in"], name="staff_shifts_staff_check_in_uniq")
+                ],
+            },
+        ),
+        migrations.RunPython(record_current_shifts, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="dailysummary",
+            name="total_sales",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name="dailysummary",
+            name="labor_costs",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated manually for store-scoped delta sync tombstones (api.sync)
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_staff_shifts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tombstone",
+            name="store_id",
+            field=models.UUIDField(null=True),
+        ),
+        migrations.AddField(
+            model_name="tombstone",
+            name="staff_id",
+            field=models.UUIDField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(fields=["resource", "store_id", "deleted_at", "id"], name="sync_tombstones_store_idx"),
+        ),
+    ]
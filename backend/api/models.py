@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models.fields.json import KT
 from django.utils import timezone
 import uuid
 
@@ -23,9 +24,15 @@ class Store(models.Model):
     )
     address = models.TextField()
     is_active = models.BooleanField()
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "stores"
+        indexes = [
+            # Delta sync reads rows changed since a watermark (api.sync).
+            models.Index(fields=["updated_at", "id"], name="stores_updated_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -53,9 +60,13 @@ class CmsUser(models.Model):
         default=Role.CAST,
     )
     created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "users"
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="users_updated_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.email
@@ -84,14 +95,56 @@ class StaffMember(models.Model):
     is_on_duty = models.BooleanField()
     check_in = models.DateTimeField()
     check_out = models.DateTimeField()
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "staff_members"
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="staff_members_updated_idx"),
+            # Store-scoped lists (api.permissions) in their (created_at, id) keyset order.
+            models.Index(fields=["store", "created_at", "id"], name="staff_members_store_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user.email} @ {self.store.name}"
 
 
+class Shift(models.Model):
+    """
+    One worked shift of a staff member: the check-in/check-out pair that
+    StaffMember holds while it is current, kept after the next check-in
+    replaces it. Labor costs (api.rollups) are computed from these rows,
+    with the store and hourly wage as they were during the shift.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    staff = models.ForeignKey(
+        StaffMember,
+        on_delete=models.CASCADE,
+        db_column="staff_id",
+        related_name="shifts",
+    )
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        db_column="store_id",
+        related_name="shifts",
+    )
+    hourly_wage = models.DecimalField(max_digits=8, decimal_places=2)
+    check_in = models.DateTimeField()
+    check_out = models.DateTimeField()
+
+    class Meta:
+        db_table = "staff_shifts"
+        constraints = [
+            models.UniqueConstraint(fields=["staff", "check_in"], name="staff_shifts_staff_check_in_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["store", "check_in"], name="staff_shifts_store_idx"),
+        ]
+
+
 class PerformanceTarget(models.Model):
     """
     Maps to `performance_targets`.
@@ -114,9 +167,13 @@ class PerformanceTarget(models.Model):
         choices=TargetType.choices,
     )
     target_date = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "performance_targets"
+        indexes = [
+            models.Index(fields=["staff", "target_date"], name="perf_targets_staff_date_idx"),
+        ]
 
 
 class Customer(models.Model):
@@ -135,10 +192,40 @@ class Customer(models.Model):
     first_visit = models.DateField()
     contact_info = models.JSONField()
     preferences = models.JSONField()
-    total_spend = models.DecimalField(max_digits=8, decimal_places=2)
+    # Maintained from visit_records writes; see api.customer_stats.
+    total_spend = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    visit_count = models.IntegerField(default=0)
+    last_visit_date = models.DateField(null=True, blank=True)
+    unpaid_balance = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Normalized search text, maintained by api.search.refresh_search_documents.
+    search_name = models.CharField(max_length=255, blank=True, default="", editable=False)
+    search_document = models.TextField(blank=True, default="", editable=False)
+    # The most-filtered contact_info keys, promoted to indexed columns (see
+    # api.filters.PROMOTED_JSON_KEYS); other keys are served by the GIN indexes.
+    contact_phone = models.GeneratedField(
+        expression=KT("contact_info__phone"),
+        output_field=models.CharField(max_length=255, null=True),
+        db_persist=True,
+    )
+    contact_line_id = models.GeneratedField(
+        expression=KT("contact_info__line_id"),
+        output_field=models.CharField(max_length=255, null=True),
+        db_persist=True,
+    )
 
     class Meta:
         db_table = "customers"
+        indexes = [
+            # Store-scoped lists (api.permissions) in their (created_at, id)
+            # keyset order, and in (name, id) order for `?ordering=name`.
+            models.Index(fields=["store", "created_at", "id"], name="customers_store_created_idx"),
+            models.Index(fields=["store", "name", "id"], name="customers_store_name_idx"),
+            models.Index(fields=["updated_at", "id"], name="customers_updated_idx"),
+            models.Index(fields=["store", "contact_phone"], name="customers_store_phone_idx"),
+            models.Index(fields=["store", "contact_line_id"], name="customers_store_line_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -182,9 +269,81 @@ class VisitRecord(models.Model):
     received_amount = models.BigIntegerField()
     unpaid_date = models.DateField(db_column="unpaid date")
     receipt = models.BooleanField()
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "visit_records"
+        indexes = [
+            models.Index(fields=["visit_date"], name="visit_records_date_idx"),
+            # List keyset order (api.pagination).
+            models.Index(fields=["created_at", "id"], name="visit_records_created_idx"),
+            models.Index(fields=["updated_at", "id"], name="visit_records_updated_idx"),
+            models.Index(fields=["cast", "visit_date"], name="visit_records_cast_date_idx"),
+            models.Index(fields=["customer", "visit_date"], name="visit_records_cust_date_idx"),
+            # Outstanding balances are a small slice of the table.
+            models.Index(
+                fields=["customer", "unpaid_date"],
+                name="visit_records_unpaid_idx",
+                condition=models.Q(unpaid_amount__gt=0),
+            ),
+            models.Index(
+                fields=["cast", "unpaid_date"],
+                name="visit_records_cast_unpaid_idx",
+                condition=models.Q(unpaid_amount__gt=0),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Customer stats are adjusted by signal handlers; keep them in the
+        # same transaction as the visit row.
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(type(self), instance=self)):
+            super().save(*args, **kwargs)
+
+
+class DailySummaryQuerySet(models.QuerySet):
+    # total_sales and labor_costs are written only by api.rollups.
+    UPSERT_FIELDS = ("total_expenses", "notes")
+
+    def upsert(self, store_id, report_date, **values):
+        """
+        Insert or update the summary for (store_id, report_date) with one
+        `INSERT ... ON CONFLICT DO UPDATE ... RETURNING` statement.
+        Only the fields passed in `values` are overwritten on an existing row;
+        a new row gets zero/empty defaults for the rest.
+        """
+        unknown = set(values) - set(self.UPSERT_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot upsert fields: {', '.join(sorted(unknown))}")
+        model = self.model
+        # A write: self.db would follow read routing (possibly to a replica).
+        db = self._db or router.db_for_write(model)
+        connection = connections[db]
+        qn = connection.ops.quote_name
+        row = {
+            "id": uuid.uuid4(),
+            "store": store_id,
+            "report_date": report_date,
+            "total_sales": 0,
+            "total_expenses": 0,
+            "labor_costs": 0,
+            "notes": "",
+            **values,
+            "updated_at": timezone.now(),
+        }
+        fields = [model._meta.get_field(name) for name in row]
+        columns = ", ".join(qn(f.column) for f in fields)
+        placeholders = ", ".join(["%s"] * len(fields))
+        params = [f.get_db_prep_save(row[f.name], connection) for f in fields]
+        conflict = ", ".join(qn(model._meta.get_field(n).column) for n in ("store", "report_date"))
+        updated = [model._meta.get_field(n).column for n in (*values, "updated_at")]
+        assignments = ", ".join(f"{qn(c)} = EXCLUDED.{qn(c)}" for c in updated)
+        sql = (
+            f"INSERT INTO {qn(model._meta.db_table)} ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({conflict}) DO UPDATE SET {assignments} "
+            f"RETURNING {columns}"
+        )
+        return next(iter(self.raw(sql, params, using=db)))
 
 
 class DailySummary(models.Model):
@@ -200,13 +359,55 @@ class DailySummary(models.Model):
         related_name="daily_summaries",
     )
     report_date = models.DateField()
-    total_sales = models.DecimalField(max_digits=8, decimal_places=2)
-    total_expenses = models.DecimalField(max_digits=8, decimal_places=2)
-    labor_costs = models.DecimalField(max_digits=8, decimal_places=2)
+    # Computed from visits and shifts by api.rollups; not writable through the API.
+    total_sales = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_expenses = models.DecimalField(max_digits=12, decimal_places=2)
+    labor_costs = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     notes = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = DailySummaryQuerySet.as_manager()
 
     class Meta:
         db_table = "daily_summaries"
+        constraints = [
+            # One summary per store per day; also serves store/date lookups.
+            models.UniqueConstraint(fields=["store", "report_date"], name="daily_summaries_store_date_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["updated_at", "id"], name="daily_summaries_updated_idx"),
+        ]
+
+
+class DailyPaymentTotal(models.Model):
+    """
+    Per-store, per-day visit sales by payment method.
+    Materialized alongside `daily_summaries` by api.rollups.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    store = models.ForeignKey(
+        Store,
+        on_delete=models.CASCADE,
+        db_column="store_id",
+        related_name="daily_payment_totals",
+    )
+    report_date = models.DateField()
+    payment_method = models.CharField(
+        max_length=255,
+        choices=VisitRecord.PaymentMethod.choices,
+    )
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    visit_count = models.IntegerField()
+
+    class Meta:
+        db_table = "daily_payment_totals"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["store", "report_date", "payment_method"],
+                name="daily_payment_totals_uniq",
+            ),
+        ]
 
 
 class CustomerProfile(models.Model):
@@ -225,6 +426,7 @@ class CustomerProfile(models.Model):
     birthday = models.DateField()
     zodiac = models.CharField(max_length=255)
     animal_fortune = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "customers_profile"
@@ -274,6 +476,7 @@ class CustomerDetail(models.Model):
         choices=MaritalStatus.choices,
     )
     children_info = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "customers_detail"
@@ -305,7 +508,31 @@ class CustomerPreference(models.Model):
     dislike_food = models.TextField()
     hobby = models.TextField()
     favorite_brand = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "customer_preferences"
 
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted row, so delta sync (api.sync) can tell clients to drop it.
+    `resource` is the model's label (e.g. "api.customer"); `store_id` and
+    `staff_id` are the row's store and staff member (where it had them), so
+    deletions are reported only to the users who could see the row.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    resource = models.CharField(max_length=100)
+    object_id = models.UUIDField()
+    # Plain ids, not foreign keys: the store or staff member may be gone too.
+    store_id = models.UUIDField(null=True)
+    staff_id = models.UUIDField(null=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "sync_tombstones"
+        indexes = [
+            models.Index(fields=["resource", "deleted_at", "id"], name="sync_tombstones_resource_idx"),
+            models.Index(fields=["resource", "store_id", "deleted_at", "id"], name="sync_tombstones_store_idx"),
+        ]
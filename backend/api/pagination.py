@@ -0,0 +1,154 @@
+"""
+Keyset (cursor) pagination shared by every router-registered list endpoint.
+Pages are addressed by an opaque cursor built from the view's ordering, so
+the database seeks on an index instead of scanning past an OFFSET.
+"""
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination, _reverse_ordering
+
+
+def keyset_ordering(ordering, model):
+    """
+    `ordering` with the primary key appended (in the direction of the last
+    field) unless it already ends with it, so every row has a distinct position.
+    """
+    if isinstance(ordering, str):
+        ordering = (ordering,)
+    ordering = tuple(ordering)
+    pk = model._meta.pk
+    if ordering and ordering[-1].lstrip("-") in ("pk", pk.name, pk.attname):
+        return ordering
+    direction = "-" if ordering and ordering[-1].startswith("-") else ""
+    return (*ordering, direction + pk.attname)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    CursorPagination over a composite keyset: the view's `ordering` (or the
+    OrderingFilter's) plus the primary key. The cursor holds the values of
+    all of these fields for the last row of a page and the next page starts
+    strictly after that row, so ties in the leading field are never skipped
+    or repeated and no OFFSET is needed. Views order by an immutable column
+    (`created_at`) by default; ordering fields must not be nullable.
+    Clients may request `?page_size=` up to `API_MAX_PAGE_SIZE`.
+    """
+
+    ordering = ("id",)
+    page_size_query_param = "page_size"
+    max_page_size = getattr(settings, "API_MAX_PAGE_SIZE", 500)
+
+    def get_ordering(self, request, queryset, view):
+        # Paginator instances are created per view instance, so adopting the
+        # view's ordering here does not leak between requests.
+        if getattr(view, "ordering", None):
+            self.ordering = view.ordering
+        return keyset_ordering(super().get_ordering(request, queryset, view), queryset.model)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # CursorPagination's own version filters on the first ordering field
+        # only and steps over ties with an offset; this one seeks on the whole
+        # keyset, so cursors never carry an offset.
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        current_position = self.cursor.position if self.cursor else None
+
+        queryset = queryset.order_by(*(_reverse_ordering(self.ordering) if reverse else self.ordering))
+        if current_position is not None:
+            try:
+                values = json.loads(current_position)
+                if not isinstance(values, list) or len(values) != len(self.ordering):
+                    raise ValueError
+                queryset = queryset.filter(self._after(self.ordering, values, reverse))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # One extra row tells whether there is a page after this one.
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = current_position is not None, current_position
+            self.has_previous, self.previous_position = following_position is not None, following_position
+        else:
+            self.has_next, self.next_position = following_position is not None, following_position
+            self.has_previous, self.previous_position = current_position is not None, current_position
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        # Positions are unique, so the boundary row itself is the marker.
+        position = self.next_position
+        if self.page:
+            position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self.previous_position
+        if self.page:
+            position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    @staticmethod
+    def _after(ordering, values, reverse):
+        """Rows strictly after `values` in `ordering` (before them if `reverse`)."""
+        clauses = []
+        for index, order in enumerate(ordering):
+            name = order.lstrip("-")
+            lookup = "lt" if order.startswith("-") != reverse else "gt"
+            equal = {field.lstrip("-"): value for field, value in zip(ordering[:index], values)}
+            clauses.append(Q(**equal, **{f"{name}__{lookup}": values[index]}))
+        return reduce(or_, clauses)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            name = order.lstrip("-")
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(str(value))
+        return json.dumps(values)
+
+
+def cursor_ordering_fields(request, view, model):
+    """Names of the `model` fields a list request may be ordered (and so cursor-paginated) by."""
+    ordering = getattr(view, "ordering", None) or ()
+    if isinstance(ordering, str):
+        ordering = (ordering,)
+    names = list(ordering) + request.query_params.get("ordering", "").split(",")
+    names.append(model._meta.pk.attname)
+    return {name.strip().lstrip("-") for name in names if name.strip()}
+
+
+def page_row_fields(request, view, model):
+    """
+    Names of the `model` fields every row of a list page must carry: the
+    cursor's ordering fields and the view's `updated_field`, from which
+    api.conditional builds the list ETag.
+    """
+    names = cursor_ordering_fields(request, view, model)
+    updated_field = getattr(view, "updated_field", None)
+    if updated_field:
+        names.add(updated_field)
+    return names
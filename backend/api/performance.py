@@ -0,0 +1,192 @@
+"""
+Cast performance vs. target.
+
+`cast_performance` compares each staff member's visit spending (as `cast`)
+in a date window with their `PerformanceTarget`s, in one query: visit totals
+and daily and monthly target totals all come from correlated subqueries, so
+the window is applied on visit_records_cast_date_idx and the cast's visits
+outside it are never joined. Monthly targets are compared with the spending
+of the whole months the window touches, daily targets with the window's own.
+
+Results are cached per (store, window) in PERFORMANCE_DASHBOARD_CACHE under a
+per-store version that visit, staff member and target writes bump (see
+api.signals), so stale entries are never read again. The version must reach
+every worker, so without a shared cache (the alias is None) nothing is cached.
+A result computed on a lagging read replica may predate the latest bump, so
+it is kept for at most DATABASE_REPLICA_CACHE_TTL seconds.
+"""
+import calendar
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .db_routers import reading_from_replica
+from .models import PerformanceTarget, StaffMember, VisitRecord
+
+CENTS = Decimal("0.01")
+ZERO = Value(Decimal("0"), output_field=DecimalField(max_digits=12, decimal_places=2))
+CACHE_KEY = "cast-performance:{}:{}:{}:{}"
+VERSION_KEY = "cast-performance-version:{}"
+
+
+def _cache():
+    alias = getattr(settings, "PERFORMANCE_DASHBOARD_CACHE", None)
+    return None if alias is None else caches[alias]
+
+
+def _target_total(target_type, start, end):
+    targets = (
+        PerformanceTarget.objects.filter(
+            staff=OuterRef("pk"),
+            target_type=target_type,
+            target_date__gte=start,
+            target_date__lte=end,
+        )
+        .order_by()
+        .values("staff")
+        .annotate(total=Sum("target_amount"))
+        .values("total")[:1]
+    )
+    return Coalesce(Subquery(targets), ZERO)
+
+
+def _visit_total(aggregate, start, end, default):
+    visits = (
+        VisitRecord.objects.filter(cast=OuterRef("pk"), visit_date__gte=start, visit_date__lte=end)
+        .order_by()
+        .values("cast")
+        .annotate(total=aggregate)
+        .values("total")[:1]
+    )
+    return Coalesce(Subquery(visits), default)
+
+
+def _ratio(actual, target):
+    if not target:
+        return None
+    return round(float(actual / target), 4)
+
+
+def compute_cast_performance(store_id, start, end):
+    """
+    Per staff member of `store_id`: visits and spending in [start, end], daily
+    targets dated in the window, monthly targets and spending of the whole
+    months it touches, achievement ratio (monthly spending against the monthly
+    target if any, else window spending against the daily sum) and commission
+    (window spending x commission_rate).
+    """
+    month_start = start.replace(day=1)
+    month_end = end.replace(day=calendar.monthrange(end.year, end.month)[1])
+    rows = (
+        StaffMember.objects.filter(store_id=store_id)
+        .annotate(
+            actual=_visit_total(Sum("spending"), start, end, ZERO),
+            monthly_actual=_visit_total(Sum("spending"), month_start, month_end, ZERO),
+            visits=_visit_total(Count("pk"), start, end, Value(0, output_field=IntegerField())),
+            daily_target=_target_total(PerformanceTarget.TargetType.DAILY, start, end),
+            monthly_target=_target_total(PerformanceTarget.TargetType.MONTHLY, month_start, month_end),
+        )
+        .order_by("-actual", "id")
+        .values(
+            "id", "user_id", "user__username", "user__email", "commission_rate",
+            "actual", "monthly_actual", "visits", "daily_target", "monthly_target",
+        )
+    )
+    results = []
+    for row in rows:
+        actual = Decimal(row["actual"]).quantize(CENTS)
+        daily_target = Decimal(row["daily_target"]).quantize(CENTS)
+        monthly_target = Decimal(row["monthly_target"]).quantize(CENTS)
+        monthly_actual = Decimal(row["monthly_actual"]).quantize(CENTS)
+        if monthly_target:
+            target, achieved = monthly_target, monthly_actual
+        else:
+            target, achieved = daily_target, actual
+        results.append({
+            "staff": str(row["id"]),
+            "user": str(row["user_id"]),
+            "username": row["user__username"],
+            "email": row["user__email"],
+            "visit_count": row["visits"],
+            "actual": f"{actual:f}",
+            "monthly_actual": f"{monthly_actual:f}",
+            "daily_target": f"{daily_target:f}",
+            "monthly_target": f"{monthly_target:f}",
+            "target": f"{target:f}",
+            "achievement_ratio": _ratio(achieved, target),
+            "commission_rate": row["commission_rate"],
+            "commission": f"{(actual * Decimal(str(row['commission_rate']))).quantize(CENTS):f}",
+        })
+    return results
+
+
+def _store_version(cache, store_id):
+    return cache.get(VERSION_KEY.format(store_id), 0)
+
+
+def cast_performance(store_id, start, end):
+    """`compute_cast_performance`, cached per (store, window) until the store's data changes."""
+    cache = _cache()
+    if cache is None:
+        return compute_cast_performance(store_id, start, end)
+    key = CACHE_KEY.format(store_id, _store_version(cache, store_id), start.isoformat(), end.isoformat())
+    results = cache.get(key)
+    if results is None:
+        ttl = getattr(settings, "PERFORMANCE_DASHBOARD_CACHE_TTL", 300)
+        if reading_from_replica():
+            ttl = min(ttl, getattr(settings, "DATABASE_REPLICA_CACHE_TTL", 10))
+        results = compute_cast_performance(store_id, start, end)
+        cache.set(key, results, ttl)
+    return results
+
+
+def _bump_store_version(store_id):
+    cache = _cache()
+    key = VERSION_KEY.format(store_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def invalidate_store(store_id, using=None):
+    """Retire every cached window of `store_id` once the current transaction commits."""
+    if store_id is None or _cache() is None:
+        return
+    transaction.on_commit(lambda: _bump_store_version(store_id), using=using)
+
+
+def _flush_dirty_casts(connection):
+    cast_ids = getattr(connection, "performance_dirty_casts", None)
+    if not cast_ids:
+        return
+    connection.performance_dirty_casts = set()
+    store_ids = StaffMember.objects.using(connection.alias).filter(pk__in=cast_ids).values_list("store_id", flat=True)
+    for store_id in set(store_ids):
+        _bump_store_version(store_id)
+
+
+def invalidate_casts(cast_ids, using=None):
+    """
+    `invalidate_store` for the stores of the given staff members. Casts marked
+    within one transaction are resolved to stores in one query at commit; a
+    deleted staff member's store is invalidated by its own delete handler.
+    """
+    if _cache() is None:
+        return
+    connection = transaction.get_connection(using)
+    if getattr(connection, "performance_dirty_casts", None) is None:
+        connection.performance_dirty_casts = set()
+    connection.performance_dirty_casts.update(cast_id for cast_id in cast_ids if cast_id is not None)
+    transaction.on_commit(lambda: _flush_dirty_casts(connection), using=using)
+
+
+def current_month():
+    """(first day, last day) of the current month, the dashboard's default window."""
+    today = timezone.localdate()
+    return today.replace(day=1), today.replace(day=calendar.monthrange(today.year, today.month)[1])
@@ -0,0 +1,109 @@
+"""
+Role-based permissions and row scoping, evaluated from request.user
+(CmsUserAuth: `role`, `store_ids`, `staff_ids`; see api.auth), whose user and
+memberships lookups are cached so they add no query to most requests.
+
+`RolePermission` (the DRF default) admits authenticated users whose role is
+in the view's `read_roles` (safe methods) or `write_roles`, or in
+`action_roles[action]` for actions that need their own rule; None means any
+role. `ScopedQuerysetMixin` narrows a viewset's rows: Admin sees everything,
+a Cast with `cast_scope` set sees only rows of their own StaffMember ids, and
+everyone else the rows of their stores via `store_scope`. The store filter
+comes first in every query of the view (lists, exports, sync, bulk updates
+and the conditional-GET validators all start from `get_queryset()`), so it
+can use the store-leading indexes on customers, staff_members and
+daily_summaries. Writes are limited the same way by the serializers'
+`ScopedWriteMixin` (api.serializers): the stores, customers and staff members
+a row points at must be within the caller's scope.
+"""
+import hashlib
+
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+
+from .models import CmsUser
+
+Role = CmsUser.Role
+
+ALL_ROLES = None
+STAFF_ROLES = (Role.STAFF, Role.MANAGER, Role.ADMIN)
+MANAGER_ROLES = (Role.MANAGER, Role.ADMIN)
+ADMIN_ROLES = (Role.ADMIN,)
+
+
+def is_admin(user):
+    return getattr(user, "role", None) == Role.ADMIN
+
+
+class RolePermission(BasePermission):
+    """Allow authenticated users whose role the view accepts; see the module docstring."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        action_roles = getattr(view, "action_roles", {})
+        if getattr(view, "action", None) in action_roles:
+            roles = action_roles[view.action]
+        elif request.method in SAFE_METHODS:
+            roles = getattr(view, "read_roles", ALL_ROLES)
+        else:
+            roles = getattr(view, "write_roles", ALL_ROLES)
+        return roles is None or getattr(user, "role", None) in roles
+
+
+def has_store_access(user, store_id):
+    """True if `user` may use data of `store_id`: an Admin, or a member of that store."""
+    return is_admin(user) or (store_id is not None and str(store_id) in user.store_ids)
+
+
+def check_store_access(user, store_id):
+    """Raise PermissionDenied unless `user` may read data of `store_id` (None = all stores: Admin only)."""
+    if is_admin(user):
+        return
+    if store_id is None:
+        raise PermissionDenied("A store within your memberships is required.")
+    if not has_store_access(user, store_id):
+        raise PermissionDenied("You do not have access to this store.")
+
+
+def scope_fingerprint(user):
+    """Short key identifying the rows `user` can see, for caches shared between users."""
+    if is_admin(user):
+        return "all"
+    scope = "|".join([getattr(user, "role", ""), *sorted(user.store_ids), "", *sorted(user.staff_ids)])
+    return hashlib.md5(scope.encode(), usedforsecurity=False).hexdigest()
+
+
+def scope_rows(queryset, user, store_scope=None, cast_scope=None):
+    """Narrow `queryset` to `user`'s rows; the lookups are those of ScopedQuerysetMixin."""
+    if is_admin(user):
+        return queryset
+    if cast_scope and user.role == Role.CAST:
+        return queryset.filter(**{f"{cast_scope}__in": user.staff_ids})
+    if store_scope:
+        stores = sorted(user.store_ids)
+        if len(stores) == 1:
+            # An equality on the leading store_id column lets the planner walk
+            # a (store_id, ...) index in order instead of sorting.
+            return queryset.filter(**{store_scope: stores[0]})
+        return queryset.filter(**{f"{store_scope}__in": stores})
+    return queryset
+
+
+class ScopedQuerysetMixin:
+    """
+    ViewSet mixin filtering `get_queryset()` to the caller's rows. Set
+    `store_scope` to the lookup from the model to its store id (e.g.
+    "customer__store") and optionally `cast_scope` to the lookup to its
+    StaffMember id, which limits Casts to their own rows.
+    """
+
+    store_scope = None
+    cast_scope = None
+
+    def scope_queryset(self, queryset):
+        return scope_rows(queryset, self.request.user, self.store_scope, self.cast_scope)
+
+    def get_queryset(self):
+        return self.scope_queryset(super().get_queryset())
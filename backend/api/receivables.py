@@ -0,0 +1,129 @@
+"""
+Accounts receivable: outstanding visit balances.
+
+A visit is outstanding while `unpaid_amount > 0`; the partial indexes on
+visit_records (customer, unpaid_date) and (cast, unpaid_date) cover exactly
+those rows, so the reports below never touch settled history.
+`receivable_balances` groups them per customer or per cast with ageing
+buckets by days since `unpaid date`; `post_payment` settles a customer's
+visits oldest first under row locks.
+"""
+import datetime
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, Min, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import VisitRecord
+
+ZERO = Value(Decimal("0"), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+# Ageing buckets: name -> (min days, max days) since `unpaid date`; None = open.
+AGEING_BUCKETS = {
+    "days_0_30": (None, 30),
+    "days_31_60": (31, 60),
+    "days_over_60": (61, None),
+}
+
+GROUPS = {
+    "customer": ("customer_id", "customer__name", "customer__store_id"),
+    "cast": ("cast_id", "cast__user__username", "cast__store_id"),
+}
+
+
+def outstanding_visits(store_id=None):
+    """Visits with a balance still owed, optionally of one store's customers."""
+    queryset = VisitRecord.objects.filter(unpaid_amount__gt=0)
+    if store_id is not None:
+        queryset = queryset.filter(customer__store_id=store_id)
+    return queryset
+
+
+def _bucket_filter(as_of, min_days, max_days):
+    condition = Q()
+    if min_days is not None:
+        condition &= Q(unpaid_date__lte=as_of - datetime.timedelta(days=min_days))
+    if max_days is not None:
+        condition &= Q(unpaid_date__gt=as_of - datetime.timedelta(days=max_days + 1))
+    return condition
+
+
+def receivable_balances(group, as_of, store_id=None):
+    """
+    Outstanding balance per customer or per cast (`group`), largest first,
+    split into the AGEING_BUCKETS as of the date `as_of`. One grouped query.
+    """
+    key, label, store = GROUPS[group]
+    buckets = {
+        name: Coalesce(Sum("unpaid_amount", filter=_bucket_filter(as_of, low, high)), ZERO)
+        for name, (low, high) in AGEING_BUCKETS.items()
+    }
+    rows = (
+        outstanding_visits(store_id)
+        .order_by()
+        .values(key, label, store)
+        .annotate(
+            balance=Sum("unpaid_amount"),
+            visits=Count("pk"),
+            oldest_unpaid_date=Min("unpaid_date"),
+            **buckets,
+        )
+        .order_by("-balance", key)
+    )
+    return [
+        {
+            group: str(row[key]),
+            "name": row[label],
+            "store": str(row[store]),
+            "visit_count": row["visits"],
+            "balance": _money(row["balance"]),
+            "oldest_unpaid_date": row["oldest_unpaid_date"].isoformat(),
+            **{name: _money(row[name]) for name in AGEING_BUCKETS},
+        }
+        for row in rows
+    ]
+
+
+def _money(value):
+    return f"{Decimal(value).quantize(Decimal('0.01')):f}"
+
+
+class PaymentError(ValueError):
+    """The payment cannot be applied (e.g. it exceeds the outstanding balance)."""
+
+
+def post_payment(customer_id, amount, visit_id=None):
+    """
+    Apply a payment of `amount` to the customer's outstanding visits, oldest
+    `unpaid date` first (or only to `visit_id`), atomically. Each settled
+    visit's unpaid_amount drops and its received_amount (whole yen) grows:
+    `amount` is rounded to yen once, every visit but the last is credited the
+    whole yen of its share and the last the remainder, so the credits add up
+    to the payment. Saving through the model keeps customer stats in step
+    (api.signals).
+    Returns [(visit, amount applied), ...]; raises PaymentError on overpayment.
+    """
+    with transaction.atomic():
+        visits = outstanding_visits().filter(customer_id=customer_id)
+        if visit_id is not None:
+            visits = visits.filter(pk=visit_id)
+        visits = list(visits.select_for_update().order_by("unpaid_date", "id"))
+        outstanding = sum((visit.unpaid_amount for visit in visits), Decimal("0"))
+        if amount > outstanding:
+            raise PaymentError(f"Payment {amount} exceeds the outstanding balance {outstanding}.")
+        allocations, remaining = [], amount
+        for visit in visits:
+            if remaining <= 0:
+                break
+            paid = min(remaining, visit.unpaid_amount)
+            allocations.append((visit, paid))
+            remaining -= paid
+        received = int(amount.to_integral_value(ROUND_HALF_UP))
+        for position, (visit, paid) in enumerate(allocations, start=1):
+            credit = received if position == len(allocations) else int(paid.to_integral_value(ROUND_DOWN))
+            received -= credit
+            visit.unpaid_amount -= paid
+            visit.received_amount += credit
+            visit.save(update_fields=["unpaid_amount", "received_amount", "updated_at"])
+    return allocations
@@ -0,0 +1,103 @@
+"""
+Response caching for slow-changing resources (stores, users).
+
+`CachedResponseMixin` serves `list` and `retrieve` from the cache: entries
+are keyed by the model's version, the caller's row scope (api.permissions)
+and the request path + query string, and hold the response data with its
+ETag and Last-Modified (from api.conditional when the view has them, else a
+hash of the data). Saving or deleting a row
+bumps the model's version (api.signals, on commit), so every older entry is
+simply never read again and ages out with RESPONSE_CACHE_TTL. Conditional
+requests are answered from the entry with a 304 and no body.
+
+The version lives in the cache itself, so RESPONSE_CACHE must be shared by
+every worker (settings only enable the cache when Redis is configured).
+"""
+import datetime
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .conditional import not_modified
+from .permissions import scope_fingerprint
+
+VERSION_KEY = "response-cache-version:{}"
+ENTRY_KEY = "response-cache:{}:{}:{}:{}"
+
+
+def _cache():
+    return caches[getattr(settings, "RESPONSE_CACHE", "default")]
+
+
+def model_version(model):
+    return _cache().get(VERSION_KEY.format(model._meta.label_lower), 0)
+
+
+def _bump_model_version(model):
+    cache = _cache()
+    key = VERSION_KEY.format(model._meta.label_lower)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def invalidate_model(model, using=None):
+    """Retire every cached response of `model` once the current transaction commits."""
+    transaction.on_commit(lambda: _bump_model_version(model), using=using)
+
+
+def compute_etag(data):
+    """Strong ETag of the JSON rendering of `data`."""
+    return '"{}"'.format(hashlib.md5(JSONRenderer().render(data), usedforsecurity=False).hexdigest())
+
+
+class CachedResponseMixin:
+    """ViewSet mixin caching `list` / `retrieve` responses; see the module docstring."""
+
+    def get_response_cache_key(self, request):
+        model = self.get_queryset().model
+        return ENTRY_KEY.format(
+            model._meta.label_lower, model_version(model), scope_fingerprint(request.user), request.get_full_path()
+        )
+
+    def cached_response(self, request, render):
+        if not getattr(settings, "RESPONSE_CACHE_ENABLED", False):
+            return render()
+        cache = _cache()
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = render()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            etag = response.get("ETag") or compute_etag(response.data)
+            entry = (response.data, etag, parse_http_date_safe(response.get("Last-Modified") or ""))
+            cache.set(key, entry, getattr(settings, "RESPONSE_CACHE_TTL", 600))
+        data, etag, last_modified = entry
+        if last_modified is not None:
+            last_modified = datetime.datetime.fromtimestamp(last_modified, tz=datetime.timezone.utc)
+        if not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+        # Browsers keep the body but must revalidate (cheaply, via the ETag) before reuse.
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, functools.partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, functools.partial(super().retrieve, request, *args, **kwargs))
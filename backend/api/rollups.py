@@ -0,0 +1,264 @@
+"""
+Daily sales rollup engine.
+
+Computes per-store, per-day visit sales (total and by payment method) and
+labor costs from `visit_records` and `staff_shifts`, and materializes them
+into `daily_summaries.total_sales` / `labor_costs` and `daily_payment_totals`.
+This module is the only writer of those two summary columns; the API and
+the upsert accept only `total_expenses` and `notes`.
+
+Visit and staff writes mark the (store, day) pairs they touch; those days are
+recomputed once the surrounding transaction commits (see api.signals), so
+history is never rescanned. `rollup_daily_sales` rebuilds arbitrary ranges.
+Each refresh locks its days before reading them and upserts its rows, so
+concurrent writers to the same day cannot collide or overwrite a newer total.
+"""
+import hashlib
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import Customer, DailyPaymentTotal, DailySummary, Shift, Store, VisitRecord
+
+SECONDS_PER_HOUR = Decimal(3600)
+CENTS = Decimal("0.01")
+
+
+def _date_filter(field, dates=None, start=None, end=None):
+    lookups = {}
+    if dates is not None:
+        lookups[f"{field}__in"] = sorted(set(dates))
+    if start is not None:
+        lookups[f"{field}__gte"] = start
+    if end is not None:
+        lookups[f"{field}__lte"] = end
+    return lookups
+
+
+def compute_daily_sales(store_ids=None, dates=None, start=None, end=None, using=None):
+    """
+    Return {(store_id, date): {payment_method: (amount, visit_count)}} with one
+    grouped aggregation over visit_records.
+    """
+    visits = VisitRecord.objects.using(using).filter(**_date_filter("visit_date", dates, start, end))
+    if store_ids is not None:
+        visits = visits.filter(customer__store_id__in=store_ids)
+    rows = (
+        visits.order_by()
+        .values_list("customer__store_id", "visit_date", "payment_method")
+        .annotate(amount=Sum("spending"), visits=Count("id"))
+    )
+    sales = defaultdict(dict)
+    for store_id, visit_date, payment_method, amount, visit_count in rows:
+        sales[(store_id, visit_date)][payment_method] = (amount, visit_count)
+    return sales
+
+
+def compute_labor_costs(store_ids=None, dates=None, start=None, end=None, using=None):
+    """
+    Return {(store_id, date): cost} from the recorded shifts (api.models.Shift),
+    each at its own hourly wage and attributed to the day of check-in.
+    """
+    shifts = Shift.objects.using(using).filter(**_date_filter("check_in__date", dates, start, end))
+    if store_ids is not None:
+        shifts = shifts.filter(store_id__in=store_ids)
+    costs = defaultdict(Decimal)
+    for store_id, hourly_wage, check_in, check_out in shifts.values_list(
+        "store_id", "hourly_wage", "check_in", "check_out"
+    ):
+        seconds = max((check_out - check_in).total_seconds(), 0)
+        key = (store_id, timezone.localdate(check_in))
+        costs[key] += hourly_wage * Decimal(seconds) / SECONDS_PER_HOUR
+    return {key: cost.quantize(CENTS) for key, cost in costs.items()}
+
+
+def record_shift(staff, previous=None, using=None):
+    """
+    Store `staff`'s current check-in/check-out pair as a Shift and mark the
+    days it affects. `previous` is the stored (check_in, check_out) before
+    this save, or None for a new staff member. A check-in at or after the
+    previous check-out starts a new shift and leaves the old one in place;
+    any other change corrects the current shift.
+    """
+    shifts = Shift.objects.using(using)
+    values = {"store_id": staff.store_id, "hourly_wage": staff.hourly_wage, "check_out": staff.check_out}
+    current = None
+    if previous is not None and not staff.check_in >= previous[1] > previous[0]:
+        current = shifts.filter(staff=staff, check_in=previous[0]).first()
+    if current is None:
+        current = shifts.filter(staff=staff, check_in=staff.check_in).first()
+    if current is None:
+        shifts.create(staff=staff, check_in=staff.check_in, **values)
+    else:
+        mark_day_dirty(current.store_id, timezone.localdate(current.check_in), using=using)
+        shifts.filter(pk=current.pk).update(check_in=staff.check_in, **values)
+    mark_day_dirty(staff.store_id, timezone.localdate(staff.check_in), using=using)
+
+
+def _lock_key(*parts):
+    digest = hashlib.blake2b(":".join(str(part) for part in ("rollup", *parts)).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _lock_days(store_ids, dates, using):
+    """
+    Serialize rollup refreshes of the same (store, day) on PostgreSQL with
+    transaction-level advisory locks, taken before anything is computed so the
+    last refresh to write is also the last to read. A refresh of known stores
+    and days holds its stores in shared mode and each (store, day) exclusively;
+    a range or all-store rebuild holds whole stores exclusively. Locks are taken
+    in sorted order, so refreshes cannot deadlock. Other databases serialize
+    writers themselves.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    if store_ids is None:
+        store_ids = Store.objects.using(using).values_list("pk", flat=True)
+    stores = sorted({str(store_id) for store_id in store_ids})
+    with connection.cursor() as cursor:
+        if dates is None:
+            for store_id in stores:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [_lock_key(store_id)])
+            return
+        for store_id in stores:
+            cursor.execute("SELECT pg_advisory_xact_lock_shared(%s)", [_lock_key(store_id)])
+        for store_id, day in sorted((store_id, day) for store_id in stores for day in set(dates)):
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [_lock_key(store_id, day)])
+
+
+def refresh_daily_rollups(store_ids=None, dates=None, start=None, end=None, using=None):
+    """
+    Recompute and store the rollups for the given stores (default: all) and
+    days (an explicit `dates` iterable and/or a `start`/`end` range).
+    Existing summaries in scope that no longer have visits are zeroed;
+    `total_expenses` and `notes` are never touched. The days are locked
+    (`_lock_days`) before they are read, and every row is written with an
+    upsert, so concurrent refreshes of the same day neither fail nor leave an
+    older total behind.
+    Returns the number of (store, day) summaries written.
+    """
+    using = using or router.db_for_write(DailySummary)
+    if store_ids is not None:
+        store_ids = list(store_ids)
+    if dates is not None:
+        dates = set(dates)
+    with transaction.atomic(using=using):
+        _lock_days(store_ids, dates, using)
+        sales = compute_daily_sales(store_ids, dates, start, end, using=using)
+        labor = compute_labor_costs(store_ids, dates, start, end, using=using)
+
+        existing = DailySummary.objects.using(using).filter(**_date_filter("report_date", dates, start, end))
+        current = DailyPaymentTotal.objects.using(using).filter(**_date_filter("report_date", dates, start, end))
+        if store_ids is not None:
+            existing = existing.filter(store_id__in=store_ids)
+            current = current.filter(store_id__in=store_ids)
+        keys = set(sales) | set(labor) | set(existing.values_list("store_id", "report_date"))
+
+        summaries = [
+            DailySummary(
+                store_id=store_id,
+                report_date=report_date,
+                total_sales=sum((amount for amount, _ in sales.get((store_id, report_date), {}).values()), Decimal(0)),
+                labor_costs=labor.get((store_id, report_date), Decimal(0)),
+                total_expenses=Decimal(0),
+                notes="",
+            )
+            for store_id, report_date in keys
+        ]
+        payment_totals = [
+            DailyPaymentTotal(
+                store_id=store_id,
+                report_date=report_date,
+                payment_method=payment_method,
+                amount=amount,
+                visit_count=visit_count,
+            )
+            for (store_id, report_date), methods in sales.items()
+            for payment_method, (amount, visit_count) in methods.items()
+        ]
+        stale = [
+            pk
+            for pk, store_id, report_date, payment_method in current.values_list(
+                "pk", "store_id", "report_date", "payment_method"
+            )
+            if payment_method not in sales.get((store_id, report_date), {})
+        ]
+        if stale:
+            DailyPaymentTotal.objects.using(using).filter(pk__in=stale).delete()
+        DailyPaymentTotal.objects.using(using).bulk_create(
+            payment_totals,
+            update_conflicts=True,
+            unique_fields=["store", "report_date", "payment_method"],
+            update_fields=["amount", "visit_count"],
+        )
+        DailySummary.objects.using(using).bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=["store", "report_date"],
+            update_fields=["total_sales", "labor_costs", "updated_at"],
+        )
+    return len(summaries)
+
+
+def _flush_dirty_days(connection):
+    days = getattr(connection, "rollup_dirty_days", None) or set()
+    customer_days = getattr(connection, "rollup_dirty_customer_days", None) or set()
+    if not days and not customer_days:
+        return
+    connection.rollup_dirty_days = set()
+    connection.rollup_dirty_customer_days = set()
+    by_store = defaultdict(set)
+    for store_id, day in days:
+        by_store[store_id].add(day)
+    if customer_days:
+        stores = dict(
+            Customer.objects.using(connection.alias)
+            .filter(pk__in={customer_id for customer_id, _day in customer_days})
+            .values_list("pk", "store_id")
+        )
+        orphaned = set()
+        for customer_id, day in customer_days:
+            if customer_id in stores:
+                by_store[stores[customer_id]].add(day)
+            else:
+                orphaned.add(day)
+        if orphaned:
+            # The customer was deleted along with its visits; its store is
+            # no longer known, so refresh those days for every store.
+            refresh_daily_rollups(dates=orphaned, using=connection.alias)
+    for store_id, store_days in by_store.items():
+        refresh_daily_rollups(store_ids=[store_id], dates=store_days, using=connection.alias)
+
+
+def _mark(attribute, entry, using):
+    connection = transaction.get_connection(using)
+    if getattr(connection, attribute, None) is None:
+        setattr(connection, attribute, set())
+    getattr(connection, attribute).add(entry)
+    transaction.on_commit(lambda: _flush_dirty_days(connection), using=using)
+
+
+def mark_day_dirty(store_id, day, using=None):
+    """
+    Schedule the (store, day) rollup to be recomputed once the current
+    transaction commits. Days marked within one transaction are refreshed
+    together by the first commit callback; later callbacks find nothing left.
+    """
+    if store_id is None or day is None:
+        return
+    _mark("rollup_dirty_days", (store_id, day), using)
+
+
+def mark_customer_day_dirty(customer_id, day, using=None):
+    """
+    `mark_day_dirty` for the store of `customer_id`. The stores of all marked
+    customers are looked up in one query at commit, so visit writes (and
+    cascading deletes of many visits) do not each load their customer.
+    """
+    if customer_id is None or day is None:
+        return
+    _mark("rollup_dirty_customer_days", (customer_id, day), using)
@@ -0,0 +1,187 @@
+"""
+Customer search by partial or misspelt name, phone (or any `contact_info`
+value), company (`CustomerDetail.company_name`) or hobby
+(`CustomerPreference.hobby`).
+
+Matching happens on two denormalized columns of `customers`, kept current by
+`refresh_search_documents` (api.signals, bulk writes, imports):
+`search_name` (the normalized name) and `search_document` (the normalized
+name, contact values, company and hobby, space separated). `normalize` folds
+what users type differently into one form: NFKC (full-width letters and
+digits, half-width kana), case, katakana to hiragana, common variant kanji
+in names (髙 -> 高, 﨑 -> 崎, ...) and spaces/hyphens/brackets inside a
+value, so "ﾔﾏﾀﾞ", "やまだ" and "ヤマダ" or "090-1234-5678" and
+"09012345678" are the same text.
+
+On PostgreSQL one query filters the (store-scoped) customers by substring
+(LIKE) or pg_trgm word similarity (`<%`) and ranks them by
+word_similarity(query, document) + similarity(query, name), both served by
+the GIN trigram index from migration 0010. pg_trgm only splits Japanese
+text into trigrams in a database with a UTF-8, non-C locale (LC_CTYPE);
+queries under three characters match by substring only. Elsewhere (SQLite
+in tests and local runs) `TrigramIndex`, a small pure-Python equivalent, is
+built over the scoped rows that can match at all (`candidate_filter`, a
+substring prefilter) and the same ranking is computed in Python.
+"""
+import re
+import unicodedata
+
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, Func, Q, Value
+
+from .models import Customer
+
+# Old or variant forms common in names, folded to the everyday character.
+KANJI_VARIANTS = str.maketrans({
+    "髙": "高", "﨑": "崎", "嵜": "崎", "邊": "辺", "邉": "辺", "澤": "沢", "濱": "浜",
+    "廣": "広", "櫻": "桜", "國": "国", "齋": "斎", "齊": "斉", "圓": "円", "嶋": "島",
+    "冨": "富", "德": "徳", "槇": "槙", "眞": "真", "惠": "恵", "瀧": "滝", "龍": "竜",
+})
+KATAKANA_TO_HIRAGANA = str.maketrans({chr(code): chr(code - 0x60) for code in range(0x30A1, 0x30F7)})
+SEPARATORS = re.compile(r"[\s\-‐‑‒–—―−()（）・.]+")
+SIMILARITY_THRESHOLD = 0.6  # pg_trgm's default word_similarity_threshold
+MIN_TRIGRAM_QUERY = 3
+
+
+def normalize(text):
+    """Fold `text` to the form stored in the search columns; see the module docstring."""
+    text = unicodedata.normalize("NFKC", str(text)).casefold()
+    text = text.translate(KATAKANA_TO_HIRAGANA).translate(KANJI_VARIANTS)
+    return SEPARATORS.sub("", text)
+
+
+def build_document(name, contact_info=None, company_name="", hobby=""):
+    """(search_name, search_document) for a customer's searchable values."""
+    values = [name]
+    if isinstance(contact_info, dict):
+        values += [value for value in contact_info.values() if isinstance(value, (str, int))]
+    values += [company_name or "", hobby or ""]
+    parts = [part for part in (normalize(value) for value in values) if part]
+    return normalize(name), " ".join(parts)
+
+
+def refresh_search_documents(customer_ids, using=None):
+    """Recompute the search columns of the given customers: one read, one bulk update."""
+    customer_ids = set(customer_ids)
+    if not customer_ids:
+        return
+    rows = Customer.objects.using(using).filter(pk__in=customer_ids).values_list(
+        "pk", "name", "contact_info", "detail__company_name", "preference__hobby"
+    )
+    customers = []
+    for pk, name, contact_info, company_name, hobby in rows:
+        search_name, search_document = build_document(name, contact_info, company_name, hobby)
+        customers.append(Customer(pk=pk, search_name=search_name, search_document=search_document))
+    Customer.objects.using(using).bulk_update(customers, ["search_name", "search_document"], batch_size=1000)
+
+
+def _trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a, b):
+    """pg_trgm similarity(): shared trigrams over all trigrams of the two strings."""
+    left, right = _trigrams(a), _trigrams(b)
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def word_similarity(query, document):
+    """Close to pg_trgm word_similarity(): 1.0 for a substring, else the best word's share of the query's trigrams."""
+    if not query:
+        return 0.0
+    if query in document:
+        return 1.0
+    wanted = _trigrams(query)
+    return max((len(wanted & _trigrams(word)) / len(wanted) for word in document.split()), default=0.0)
+
+
+class TrigramIndex:
+    """In-memory trigram -> row index with pg_trgm-like ranking, for databases without pg_trgm."""
+
+    def __init__(self, rows):
+        # rows: (pk, search_name, search_document)
+        self.rows = {}
+        self.postings = {}
+        for pk, name, document in rows:
+            self.rows[pk] = (name, document)
+            for word in document.split():
+                for trigram in _trigrams(word):
+                    self.postings.setdefault(trigram, set()).add(pk)
+
+    def search(self, query, limit):
+        """[(pk, rank)] best first, with the same filter and rank as the PostgreSQL query."""
+        if len(query) >= MIN_TRIGRAM_QUERY:
+            candidates = set().union(*(self.postings.get(trigram, ()) for trigram in _trigrams(query)))
+        else:
+            candidates = self.rows.keys()
+        scored = []
+        for pk in candidates:
+            name, document = self.rows[pk]
+            score = word_similarity(query, document)
+            if query in document or (len(query) >= MIN_TRIGRAM_QUERY and score >= SIMILARITY_THRESHOLD):
+                scored.append((-(score + similarity(query, name)), name, str(pk), pk))
+        scored.sort()
+        return [(pk, -negative_rank) for negative_rank, _name, _key, pk in scored[:limit]]
+
+
+def candidate_filter(query):
+    """
+    Q for the rows `TrigramIndex.search` can return for `query`, checked by
+    substring. A short query must be a substring. Otherwise a row that shares
+    enough of the query's trigrams (60% of len(query) + 1) contains either one
+    of its three-character runs or, matching a word's start, its first two
+    characters: without an inner run only the three padded edge trigrams remain.
+    """
+    if len(query) < MIN_TRIGRAM_QUERY:
+        return Q(search_document__contains=query)
+    matches = Q(search_document__contains=query[:2])
+    for start in range(len(query) - 2):
+        matches |= Q(search_document__contains=query[start:start + 3])
+    return matches
+
+
+class WordSimilarity(Func):
+    function = "word_similarity"
+    output_field = FloatField()
+
+
+class Similarity(Func):
+    function = "similarity"
+    output_field = FloatField()
+
+
+class WordSimilar(Func):
+    """`query <% document`: pg_trgm's indexable word-similarity test."""
+
+    arg_joiner = " <%% "
+    template = "(%(expressions)s)"
+    output_field = BooleanField()
+
+
+def search_customers(queryset, text, limit):
+    """
+    Customers of `queryset` matching `text`, best first, each with a `search_rank`
+    attribute. Returns [] when `text` normalizes to nothing.
+    """
+    query = normalize(text)
+    if not query:
+        return []
+    if connections[queryset.db].vendor == "postgresql":
+        matches = Q(search_document__contains=query)
+        if len(query) >= MIN_TRIGRAM_QUERY:
+            matches |= Q(WordSimilar(Value(query), F("search_document")))
+        rank = WordSimilarity(Value(query), F("search_document")) + Similarity(Value(query), F("search_name"))
+        return list(queryset.filter(matches).annotate(search_rank=rank).order_by("-search_rank", "name", "pk")[:limit])
+    candidates = queryset.filter(candidate_filter(query))
+    index = TrigramIndex(candidates.values_list("pk", "search_name", "search_document").iterator())
+    ranked = index.search(query, limit)
+    customers = queryset.in_bulk([pk for pk, _rank in ranked])
+    results = []
+    for pk, rank in ranked:
+        customer = customers[pk]
+        customer.search_rank = rank
+        results.append(customer)
+    return results
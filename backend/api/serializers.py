@@ -1,58 +1,112 @@
-from django.contrib.auth.hashers import make_password
+from decimal import Decimal
+
 from rest_framework import serializers
 
+from .bulk import PrefetchedPrimaryKeyRelatedField
+from .fieldsets import SparseFieldsetMixin
+from .login import hash_password
 from .models import (
     CmsUser,
     Customer,
     CustomerDetail,
     CustomerPreference,
     CustomerProfile,
+    DailyPaymentTotal,
     DailySummary,
     PerformanceTarget,
     StaffMember,
     Store,
     VisitRecord,
 )
-
-
-class StoreSerializer(serializers.ModelSerializer):
+from .permissions import Role, has_store_access, is_admin
+
+
+class ScopedWriteMixin:
+    """
+    Validation helpers that keep writes inside the caller's scope, like
+    ScopedQuerysetMixin keeps reads: a referenced store (directly or through a
+    customer or staff member) must be one of request.user's stores, and a Cast
+    may only name their own StaffMember. Admins, and serializers used without
+    a request, are not limited. Bulk writes validate every row this way.
+    """
+
+    def scope_user(self):
+        """request.user if their writes are limited, else None."""
+        request = self.context.get("request")
+        user = getattr(request, "user", None)
+        if user is None or not getattr(user, "is_authenticated", False) or is_admin(user):
+            return None
+        return user
+
+    def check_store(self, store_id):
+        user = self.scope_user()
+        if user is not None and not has_store_access(user, store_id):
+            raise serializers.ValidationError("You do not have access to this store.")
+
+    def check_staff(self, staff):
+        self.check_store(staff.store_id)
+        user = self.scope_user()
+        if user is not None and user.role == Role.CAST and str(staff.pk) not in user.staff_ids:
+            raise serializers.ValidationError("Casts may only name themselves.")
+
+
+class StoreSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Store
-        fields = ["id", "name", "store_type", "address", "is_active"]
+        fields = ["id", "name", "store_type", "address", "is_active", "updated_at"]
         read_only_fields = ["id"]
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, style={"input_type": "password"})
 
     class Meta:
         model = CmsUser
-        fields = ["id", "username", "email", "password", "role", "created_at"]
+        fields = ["id", "username", "email", "password", "role", "created_at", "updated_at"]
         read_only_fields = ["id", "created_at"]
         extra_kwargs = {"password": {"write_only": True}}
 
     def create(self, validated_data):
         raw_password = validated_data.pop("password")
-        validated_data["password_hash"] = make_password(raw_password)
+        validated_data["password_hash"] = hash_password(raw_password)
         return super().create(validated_data)
 
     def update(self, instance, validated_data):
         raw_password = validated_data.pop("password", None)
         if raw_password is not None:
-            validated_data["password_hash"] = make_password(raw_password)
+            validated_data["password_hash"] = hash_password(raw_password)
         return super().update(instance, validated_data)
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(ScopedWriteMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """CRUD for the `customers` table only (no profile/detail/preferences)."""
 
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
     class Meta:
         model = Customer
-        fields = ["id", "store", "name", "first_visit", "contact_info", "preferences", "total_spend"]
-        read_only_fields = ["id"]
+        fields = [
+            "id",
+            "store",
+            "name",
+            "first_visit",
+            "contact_info",
+            "preferences",
+            "total_spend",
+            "visit_count",
+            "last_visit_date",
+            "unpaid_balance",
+            "updated_at",
+        ]
+        # Visit stats are maintained from visit_records (api.customer_stats).
+        read_only_fields = ["id", "total_spend", "visit_count", "last_visit_date", "unpaid_balance"]
 
+    def validate_store(self, store):
+        self.check_store(store.pk)
+        return store
 
-class StaffMemberSerializer(serializers.ModelSerializer):
+
+class StaffMemberSerializer(ScopedWriteMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """CRUD for the `staff_members` table."""
 
     class Meta:
@@ -66,13 +120,20 @@ class StaffMemberSerializer(serializers.ModelSerializer):
             "is_on_duty",
             "check_in",
             "check_out",
+            "updated_at",
         ]
         read_only_fields = ["id"]
 
+    def validate_store(self, store):
+        self.check_store(store.pk)
+        return store
+
 
-class VisitRecordSerializer(serializers.ModelSerializer):
+class VisitRecordSerializer(ScopedWriteMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """CRUD for the `visit_records` table."""
 
+    serializer_related_field = PrefetchedPrimaryKeyRelatedField
+
     class Meta:
         model = VisitRecord
         fields = [
@@ -91,19 +152,38 @@ class VisitRecordSerializer(serializers.ModelSerializer):
             "received_amount",
             "unpaid_date",
             "receipt",
+            "updated_at",
         ]
         read_only_fields = ["id"]
 
+    def validate_customer(self, customer):
+        self.check_store(customer.store_id)
+        return customer
+
+    def validate_cast(self, cast):
+        self.check_staff(cast)
+        return cast
+
+    def validate(self, attrs):
+        customer, cast = attrs.get("customer"), attrs.get("cast")
+        if customer is not None and cast is not None and customer.store_id != cast.store_id:
+            raise serializers.ValidationError({"cast": ["The cast must work in the customer's store."]})
+        return attrs
 
-class CustomerProfileSerializer(serializers.ModelSerializer):
+
+class CustomerProfileSerializer(ScopedWriteMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """CRUD for the `customers_profile` table (one-to-one with Customer)."""
 
     class Meta:
         model = CustomerProfile
-        fields = ["customer", "birthday", "zodiac", "animal_fortune"]
+        fields = ["customer", "birthday", "zodiac", "animal_fortune", "updated_at"]
+
+    def validate_customer(self, customer):
+        self.check_store(customer.store_id)
+        return customer
 
 
-class CustomerDetailSerializer(serializers.ModelSerializer):
+class CustomerDetailSerializer(ScopedWriteMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """CRUD for the `customers_detail` table (one-to-one with Customer)."""
 
     class Meta:
@@ -124,10 +204,15 @@ class CustomerDetailSerializer(serializers.ModelSerializer):
             "has_lover",
             "marital_status",
             "children_info",
+            "updated_at",
         ]
 
+    def validate_customer(self, customer):
+        self.check_store(customer.store_id)
+        return customer
 
-class CustomerPreferenceSerializer(serializers.ModelSerializer):
+
+class CustomerPreferenceSerializer(ScopedWriteMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """CRUD for the `customer_preferences` table (one-to-one with Customer)."""
 
     class Meta:
@@ -139,22 +224,86 @@ class CustomerPreferenceSerializer(serializers.ModelSerializer):
             "dislike_food",
             "hobby",
             "favorite_brand",
+            "updated_at",
         ]
 
+    def validate_customer(self, customer):
+        self.check_store(customer.store_id)
+        return customer
+
 
-class PerformanceTargetSerializer(serializers.ModelSerializer):
+class PerformanceTargetSerializer(ScopedWriteMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """CRUD for the `performance_targets` table."""
 
     class Meta:
         model = PerformanceTarget
-        fields = ["id", "staff", "target_amount", "target_type", "target_date"]
+        fields = ["id", "staff", "target_amount", "target_type", "target_date", "updated_at"]
         read_only_fields = ["id"]
 
+    def validate_staff(self, staff):
+        self.check_staff(staff)
+        return staff
 
-class DailySummarySerializer(serializers.ModelSerializer):
+
+class DailySummarySerializer(ScopedWriteMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     """CRUD for the `daily_summaries` table."""
 
     class Meta:
         model = DailySummary
-        fields = ["id", "store", "report_date", "total_sales", "total_expenses", "labor_costs", "notes"]
-        read_only_fields = ["id"]
+        fields = ["id", "store", "report_date", "total_sales", "total_expenses", "labor_costs", "notes", "updated_at"]
+        # Sales and labor are computed from visits and shifts (api.rollups).
+        read_only_fields = ["id", "total_sales", "labor_costs"]
+
+    def validate_store(self, store):
+        self.check_store(store.pk)
+        return store
+
+
+class CustomerOverviewSerializer(CustomerSerializer):
+    """
+    Read-only customer 360: the customer row plus profile, detail, preference
+    and the most recent visits. Expects the queryset from
+    CustomerViewSet.get_queryset() for the overview actions
+    (select_related one-to-ones, `recent_visits` prefetched).
+    """
+
+    profile = CustomerProfileSerializer(read_only=True, allow_null=True)
+    detail = CustomerDetailSerializer(read_only=True, allow_null=True)
+    preference = CustomerPreferenceSerializer(read_only=True, allow_null=True)
+    recent_visits = VisitRecordSerializer(many=True, read_only=True)
+
+    class Meta(CustomerSerializer.Meta):
+        fields = CustomerSerializer.Meta.fields + ["profile", "detail", "preference", "recent_visits"]
+        read_only_fields = fields
+
+
+class DailyPaymentTotalSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Read-only rows of the `daily_payment_totals` rollup table."""
+
+    class Meta:
+        model = DailyPaymentTotal
+        fields = ["id", "store", "report_date", "payment_method", "amount", "visit_count"]
+        read_only_fields = fields
+
+
+class DailySummaryUpsertSerializer(serializers.Serializer):
+    """
+    Input for `POST /daily-summaries/upsert/`. `store` + `report_date` pick the row;
+    only the expense/notes fields present in the body are written (sales and
+    labor are computed by api.rollups).
+    """
+
+    store = serializers.UUIDField()
+    report_date = serializers.DateField()
+    total_expenses = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+    notes = serializers.CharField(required=False, allow_blank=True)
+
+
+class PaymentSerializer(serializers.Serializer):
+    """
+    Input for `POST /customers/{id}/payments/`: `amount` is applied to the
+    customer's outstanding visits oldest first, or only to `visit` if given.
+    """
+
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal("0.01"))
+    visit = serializers.UUIDField(required=False)
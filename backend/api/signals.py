@@ -0,0 +1,150 @@
+"""
+Model signal handlers. Connected in ApiConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import customer_stats, performance, response_cache, rollups, search, sync
+from .auth import invalidate_cached_memberships, invalidate_cached_user
+from .models import (
+    CmsUser,
+    Customer,
+    CustomerDetail,
+    CustomerPreference,
+    DailySummary,
+    PerformanceTarget,
+    Shift,
+    StaffMember,
+    Store,
+    VisitRecord,
+)
+
+
+@receiver(pre_save, sender=VisitRecord)
+def remember_previous_visit(sender, instance, raw, using, **kwargs):
+    """Stash the stored values of a visit about to be updated."""
+    if raw or instance._state.adding:
+        instance._previous_state = None
+    else:
+        instance._previous_state = customer_stats.stored_visit_state(instance.pk, using=using)
+
+
+@receiver(post_save, sender=VisitRecord)
+def on_visit_saved(sender, instance, created, raw, using, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_state", None)
+    current = customer_stats.visit_state(instance)
+    if previous is None:
+        customer_stats.add_visit(current, using=using)
+    else:
+        customer_stats.change_visit(previous, current, using=using)
+        rollups.mark_day_dirty(previous["customer__store_id"], previous["visit_date"], using=using)
+        performance.invalidate_store(previous["cast__store_id"], using=using)
+    rollups.mark_customer_day_dirty(instance.customer_id, instance.visit_date, using=using)
+    performance.invalidate_casts([instance.cast_id], using=using)
+    instance._previous_state = None
+
+
+@receiver(post_delete, sender=VisitRecord)
+def on_visit_deleted(sender, instance, using, **kwargs):
+    # Only the _id columns: deleting a customer or cast cascades to many visits.
+    customer_stats.remove_visit(customer_stats.visit_state(instance), using=using)
+    rollups.mark_customer_day_dirty(instance.customer_id, instance.visit_date, using=using)
+    performance.invalidate_casts([instance.cast_id], using=using)
+
+
+@receiver(pre_save, sender=StaffMember)
+def remember_previous_shift(sender, instance, raw, using, **kwargs):
+    """Stash the stored store, check-in/check-out and user of a staff member about to be updated."""
+    instance._previous_shift = None
+    if not raw and not instance._state.adding:
+        instance._previous_shift = (
+            StaffMember.objects.using(using)
+            .filter(pk=instance.pk)
+            .values_list("store_id", "check_in", "check_out", "user_id")
+            .first()
+        )
+
+
+@receiver(post_save, sender=StaffMember)
+def on_staff_member_saved(sender, instance, raw, using, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_shift", None)
+    rollups.record_shift(instance, previous[1:3] if previous else None, using=using)
+    if previous is not None:
+        performance.invalidate_store(previous[0], using=using)
+        invalidate_cached_memberships(previous[3])
+    performance.invalidate_store(instance.store_id, using=using)
+    # Store memberships drive permission checks (api.auth).
+    invalidate_cached_memberships(instance.user_id)
+    instance._previous_shift = None
+
+
+@receiver(post_delete, sender=StaffMember)
+def on_staff_member_deleted(sender, instance, using, **kwargs):
+    performance.invalidate_store(instance.store_id, using=using)
+    invalidate_cached_memberships(instance.user_id)
+
+
+@receiver(post_delete, sender=Shift)
+def on_shift_deleted(sender, instance, using, **kwargs):
+    """A staff member's shifts go with them; their labor leaves those days' rollups."""
+    rollups.mark_day_dirty(instance.store_id, timezone.localdate(instance.check_in), using=using)
+
+
+@receiver(post_save, sender=PerformanceTarget)
+@receiver(post_delete, sender=PerformanceTarget)
+def on_performance_target_changed(sender, instance, using, raw=False, **kwargs):
+    """Targets feed the cast performance dashboard (api.performance)."""
+    if raw:
+        return
+    performance.invalidate_casts([instance.staff_id], using=using)
+
+
+@receiver(post_save, sender=Customer)
+def on_customer_saved(sender, instance, raw, using, update_fields=None, **kwargs):
+    """Keep the customer's search columns current (api.search)."""
+    if raw or (update_fields is not None and not {"name", "contact_info"} & set(update_fields)):
+        return
+    search.refresh_search_documents([instance.pk], using=using)
+
+
+@receiver(post_save, sender=CustomerDetail)
+@receiver(post_delete, sender=CustomerDetail)
+@receiver(post_save, sender=CustomerPreference)
+@receiver(post_delete, sender=CustomerPreference)
+def on_customer_search_data_changed(sender, instance, using, raw=False, **kwargs):
+    """Company name and hobby are part of the customer's search document (api.search)."""
+    if raw:
+        return
+    search.refresh_search_documents([instance.customer_id], using=using)
+
+
+@receiver(post_save, sender=CmsUser)
+@receiver(post_delete, sender=CmsUser)
+def forget_cached_auth_user(sender, instance, **kwargs):
+    """Drop the user from the JWT authentication cache after any change (role, email, deletion)."""
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+@receiver(post_save, sender=CmsUser)
+@receiver(post_delete, sender=CmsUser)
+def invalidate_cached_responses(sender, using, **kwargs):
+    """Stores and users are served from the response cache (api.response_cache)."""
+    response_cache.invalidate_model(sender, using=using)
+
+
+@receiver(post_delete, sender=Store)
+@receiver(post_delete, sender=CmsUser)
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=StaffMember)
+@receiver(post_delete, sender=VisitRecord)
+@receiver(post_delete, sender=DailySummary)
+def record_tombstone(sender, instance, using, **kwargs):
+    """Deleted rows are reported to delta-sync clients (api.sync)."""
+    sync.record_deletion(instance, using=using)
@@ -0,0 +1,163 @@
+"""
+Delta sync: "what changed since my last fetch".
+
+`SyncMixin` adds `/<resource>/changes/?since=<watermark>`. The response holds
+the rows created or updated since the watermark (by the `updated_at` index,
+serialized like the list endpoint and honouring its filters), the ids of rows
+deleted since then (from `Tombstone`, written by api.signals), and a new
+opaque watermark to send next time. Without `since` it starts a full sync.
+Tombstones are scoped like the live rows: non-admins only hear about
+deletions in their stores (Casts, where the list is limited to their own
+rows, only about those). The action always reads the primary, never a
+replica, so a lagging replica cannot move the watermark past rows it has
+not received yet.
+
+The watermark is a cursor over (updated_at, id) and (deleted_at, id), so
+pages of SYNC_MAX_CHANGES rows chain without gaps (`has_more`). `updated_at`
+and `deleted_at` are stamped when a row is written, not when its transaction
+commits, so a row can become visible with a timestamp already behind the
+watermark. Once caught up, the watermark is therefore set
+SYNC_WATERMARK_OVERLAP seconds behind the clock, and that overlap must be
+longer than the longest write transaction on a synced table (an import
+batch or a bulk request included). Clients see recent rows more than once
+and should apply changes by id.
+Tombstones are pruned after SYNC_TOMBSTONE_RETENTION_DAYS (`prune_tombstones`);
+an older watermark gets 410 and the client must sync from scratch.
+"""
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .models import Customer, StaffMember, Store, Tombstone, VisitRecord
+from .permissions import Role, is_admin
+
+
+def _deletion_scope(instance):
+    """(store id, staff id) of a deleted row, as SyncMixin.scope_tombstones filters them."""
+    if isinstance(instance, Store):
+        return instance.pk, None
+    if isinstance(instance, StaffMember):
+        return instance.store_id, instance.pk
+    if isinstance(instance, VisitRecord):
+        # Only the _id columns are at hand in a cascade; the customer's store
+        # is read by the INSERT itself rather than by a query per visit.
+        store = Customer.objects.filter(pk=instance.customer_id).values("store_id")[:1]
+        return Subquery(store), instance.cast_id
+    return getattr(instance, "store_id", None), None
+
+
+def record_deletion(instance, using=None):
+    """Write the tombstone for the deleted model instance `instance`."""
+    store_id, staff_id = _deletion_scope(instance)
+    Tombstone.objects.using(using).create(
+        resource=instance._meta.label_lower,
+        object_id=instance.pk,
+        store_id=store_id,
+        staff_id=staff_id,
+    )
+
+
+def record_deletions(model, scopes, using=None):
+    """Tombstones for many deleted rows of `model` in one INSERT; `scopes` holds (pk, store id, staff id)."""
+    Tombstone.objects.using(using).bulk_create([
+        Tombstone(resource=model._meta.label_lower, object_id=pk, store_id=store_id, staff_id=staff_id)
+        for pk, store_id, staff_id in scopes
+    ])
+
+
+def encode_watermark(updated, deleted):
+    """Opaque token for the (timestamp, id) cursors of changed and deleted rows."""
+    payload = {
+        "u": [updated[0].isoformat(), str(updated[1]) if updated[1] is not None else None],
+        "d": [deleted[0].isoformat(), deleted[1]],
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+
+def decode_watermark(token):
+    """Inverse of encode_watermark; raises ValidationError (400) for a malformed token."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+        updated = (parse_datetime(payload["u"][0]), payload["u"][1])
+        deleted = (parse_datetime(payload["d"][0]), payload["d"][1])
+    except (ValueError, TypeError, KeyError, IndexError):
+        raise ValidationError({"since": "Invalid watermark."})
+    if updated[0] is None or deleted[0] is None:
+        raise ValidationError({"since": "Invalid watermark."})
+    return updated, deleted
+
+
+def _after(queryset, field, cursor):
+    moment, last_id = cursor
+    if last_id is None:
+        return queryset.filter(**{f"{field}__gt": moment})
+    return queryset.filter(Q(**{f"{field}__gt": moment}) | Q(**{field: moment, "pk__gt": last_id}))
+
+
+def _next_cursor(rows, field, limit, cutoff):
+    """Cursor after `rows` (fetched with limit + 1), or `cutoff` once caught up."""
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        return (getattr(last, field), last.pk), True
+    return (cutoff, None), False
+
+
+class SyncMixin:
+    """Adds the `changes` action to a ModelViewSet whose model has `updated_at`."""
+
+    def get_sync_limit(self):
+        return getattr(settings, "SYNC_MAX_CHANGES", 1000)
+
+    def scope_tombstones(self, tombstones):
+        """Limit `tombstones` to the caller's, as ScopedQuerysetMixin limits the live rows."""
+        user = self.request.user
+        if is_admin(user) or not getattr(self, "store_scope", None):
+            return tombstones
+        if getattr(self, "cast_scope", None) and user.role == Role.CAST:
+            return tombstones.filter(staff_id__in=user.staff_ids)
+        return tombstones.filter(store_id__in=user.store_ids)
+
+    @action(detail=False)
+    def changes(self, request):
+        now = timezone.now()
+        cutoff = now - datetime.timedelta(seconds=getattr(settings, "SYNC_WATERMARK_OVERLAP", 300))
+        token = request.query_params.get("since")
+        if token:
+            updated, deleted = decode_watermark(token)
+            retention = datetime.timedelta(days=getattr(settings, "SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+            if deleted[0] < now - retention:
+                return Response(
+                    {"detail": "Watermark is older than the tombstone retention; sync from scratch."},
+                    status=status.HTTP_410_GONE,
+                )
+        else:
+            # Full sync: every row, and no deletions to report before now.
+            updated = (datetime.datetime.min.replace(tzinfo=datetime.timezone.utc), None)
+            deleted = (cutoff, None)
+        limit = self.get_sync_limit()
+        model = self.get_queryset().model
+
+        queryset = _after(self.filter_queryset(self.get_queryset()), "updated_at", updated)
+        rows = list(queryset.order_by("updated_at", "pk")[: limit + 1])
+        updated, more_rows = _next_cursor(rows, "updated_at", limit, cutoff)
+
+        tombstones = self.scope_tombstones(Tombstone.objects.filter(resource=model._meta.label_lower))
+        tombstones = _after(tombstones, "deleted_at", deleted)
+        tombstones = list(tombstones.order_by("deleted_at", "pk")[: limit + 1])
+        deleted, more_tombstones = _next_cursor(tombstones, "deleted_at", limit, cutoff)
+
+        return Response({
+            "changed": self.get_serializer(rows[:limit], many=True).data,
+            "deleted": [str(tombstone.object_id) for tombstone in tombstones[:limit]],
+            "watermark": encode_watermark(updated, deleted),
+            "has_more": more_rows or more_tombstones,
+        })
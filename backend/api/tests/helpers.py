@@ -0,0 +1,72 @@
+"""Factories and an authenticated API client shared by the api tests."""
+import datetime
+from decimal import Decimal
+
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.auth import tokens_for_user
+from api.login import hash_password
+from api.models import CmsUser, Customer, StaffMember, Store, VisitRecord
+
+
+def make_store(name="Store"):
+    return Store.objects.create(name=name, address="Tokyo", is_active=True)
+
+
+def make_user(email, role=CmsUser.Role.ADMIN, password="secret"):
+    return CmsUser.objects.create(
+        email=email, username=email.split("@")[0], password_hash=hash_password(password), role=role
+    )
+
+
+def make_staff(store, user=None, hourly_wage="1000", check_in=None, hours=5):
+    user = user or make_user(f"cast-{CmsUser.objects.count()}@example.com", CmsUser.Role.CAST)
+    check_in = check_in or timezone.now() - datetime.timedelta(hours=hours)
+    return StaffMember.objects.create(
+        user=user,
+        store=store,
+        hourly_wage=Decimal(hourly_wage),
+        commission_rate=0.1,
+        is_on_duty=False,
+        check_in=check_in,
+        check_out=check_in + datetime.timedelta(hours=hours),
+    )
+
+
+def make_customer(store, name="Customer", **fields):
+    fields.setdefault("first_visit", datetime.date(2024, 1, 1))
+    fields.setdefault("contact_info", {})
+    fields.setdefault("preferences", {})
+    return Customer.objects.create(store=store, name=name, **fields)
+
+
+def make_visit(customer, cast, visit_date=datetime.date(2024, 1, 1), spending="100", unpaid="0", **fields):
+    now = timezone.now()
+    values = {
+        "payment_method": VisitRecord.PaymentMethod.CASH,
+        "entry_time": now,
+        "exit_time": now,
+        "accompanied": False,
+        "companions": "",
+        "memo": "",
+        "received_amount": 0,
+        "unpaid_date": visit_date,
+        "receipt": False,
+        **fields,
+    }
+    return VisitRecord.objects.create(
+        customer=customer,
+        cast=cast,
+        visit_date=visit_date,
+        spending=Decimal(spending),
+        unpaid_amount=Decimal(unpaid),
+        **values,
+    )
+
+
+def client_for(user):
+    """An APIClient sending `user`'s access token."""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens_for_user(user).access_token}")
+    return client
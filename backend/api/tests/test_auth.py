@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api import auth
+from api.auth import SHARED_CACHE_KEY, TTLCache, get_cached_identity, get_cached_memberships
+from api.models import CmsUser
+
+from .helpers import client_for, make_staff, make_store, make_user
+
+
+class TTLCacheTests(TestCase):
+    def test_entries_expire_after_the_ttl(self):
+        entries = TTLCache(ttl=60, max_size=10)
+        with mock.patch("api.auth.time.monotonic", return_value=1000):
+            entries.set("a", 1)
+        with mock.patch("api.auth.time.monotonic", return_value=1059):
+            self.assertEqual(entries.get("a"), 1)
+        with mock.patch("api.auth.time.monotonic", return_value=1061):
+            self.assertIsNone(entries.get("a"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        entries = TTLCache(ttl=60, max_size=2)
+        entries.set("a", 1)
+        entries.set("b", 2)
+        entries.get("a")
+        entries.set("c", 3)
+        self.assertEqual((entries.get("a"), entries.get("b"), entries.get("c")), (1, None, 3))
+
+    def test_zero_ttl_disables_the_cache(self):
+        entries = TTLCache(ttl=0, max_size=2)
+        entries.set("a", 1)
+        self.assertIsNone(entries.get("a"))
+
+
+@override_settings(CMS_AUTH_USER_SHARED_CACHE="default")
+class AuthCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        auth.user_cache.clear()
+        auth.membership_cache.clear()
+        self.addCleanup(auth.user_cache.clear)
+        self.addCleanup(auth.membership_cache.clear)
+        self.store = make_store()
+        self.user = make_user("manager@example.com", CmsUser.Role.MANAGER)
+
+    def test_only_the_fields_authentication_needs_are_cached(self):
+        expected = {"id": self.user.id, "role": CmsUser.Role.MANAGER}
+        self.assertEqual(get_cached_identity(self.user.id), expected)
+        self.assertEqual(cache.get(SHARED_CACHE_KEY.format(self.user.id)), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_identity(self.user.id), expected)
+        auth.user_cache.clear()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cached_identity(self.user.id), expected)
+
+    def test_unknown_users_are_not_cached(self):
+        self.user.delete()
+        with self.assertRaises(CmsUser.DoesNotExist):
+            get_cached_identity(self.user.id)
+        self.assertIsNone(cache.get(SHARED_CACHE_KEY.format(self.user.id)))
+
+    def test_saving_or_deleting_the_user_drops_the_entry(self):
+        client = client_for(self.user)
+        self.assertEqual(client.get("/api/users/").status_code, 200)
+        self.user.role = CmsUser.Role.CAST
+        self.user.save()
+        self.assertIsNone(cache.get(SHARED_CACHE_KEY.format(self.user.id)))
+        self.assertEqual(client.get("/api/users/").status_code, 403)
+        self.user.delete()
+        self.assertEqual(client.get("/api/users/").status_code, 401)
+
+    def test_membership_changes_drop_the_entry(self):
+        client = client_for(self.user)
+        self.assertEqual(get_cached_memberships(self.user.id), ([], []))
+        self.assertEqual(client.get(f"/api/stores/{self.store.id}/").status_code, 404)
+
+        staff = make_staff(self.store, user=self.user)
+        self.assertEqual(get_cached_memberships(self.user.id), ([str(self.store.id)], [str(staff.id)]))
+        self.assertEqual(client.get(f"/api/stores/{self.store.id}/").status_code, 200)
+
+        other = make_store("Other")
+        staff.store = other
+        staff.save()
+        self.assertEqual(get_cached_memberships(self.user.id), ([str(other.id)], [str(staff.id)]))
+        self.assertEqual(client.get(f"/api/stores/{self.store.id}/").status_code, 404)
+
+        staff.delete()
+        self.assertEqual(get_cached_memberships(self.user.id), ([], []))
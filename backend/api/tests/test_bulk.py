@@ -0,0 +1,161 @@
+import uuid
+
+from django.db.models import Count, Sum
+from django.test import TestCase, override_settings
+
+from api.models import Customer, DailyPaymentTotal, Tombstone, VisitRecord
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user
+
+URL = "/api/customers/bulk/"
+VISITS_URL = "/api/visit-records/bulk/"
+
+
+def customer_payload(store, name):
+    return {"store": str(store.id), "name": name, "first_visit": "2024-01-01", "contact_info": {}, "preferences": {}}
+
+
+class BulkWriteTests(TestCase):
+    def setUp(self):
+        self.store = make_store()
+        self.client = client_for(make_user("admin@example.com"))
+
+    def test_create_writes_every_row(self):
+        rows = [customer_payload(self.store, "Alice"), customer_payload(self.store, "Bob")]
+        response = self.client.post(URL, rows, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([row["name"] for row in response.data], ["Alice", "Bob"])
+        self.assertEqual(Customer.objects.count(), 2)
+
+    def test_invalid_rows_reject_the_whole_batch(self):
+        rows = [
+            customer_payload(self.store, "Alice"),
+            {**customer_payload(self.store, "Bob"), "first_visit": "not a date"},
+            {**customer_payload(self.store, "Carol"), "store": str(uuid.uuid4())},
+        ]
+        response = self.client.post(URL, rows, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1, 2])
+        self.assertIn("first_visit", response.data["errors"][0]["errors"])
+        self.assertIn("store", response.data["errors"][1]["errors"])
+        self.assertFalse(Customer.objects.exists())
+
+    def test_body_must_be_a_list_of_objects(self):
+        self.assertEqual(self.client.post(URL, customer_payload(self.store, "Alice"), format="json").status_code, 400)
+        self.assertEqual(self.client.post(URL, ["Alice"], format="json").status_code, 400)
+        self.assertFalse(Customer.objects.exists())
+
+    @override_settings(API_MAX_BULK_SIZE=2)
+    def test_batches_over_the_limit_are_rejected(self):
+        rows = [customer_payload(self.store, name) for name in ("Alice", "Bob", "Carol")]
+        self.assertEqual(self.client.post(URL, rows, format="json").status_code, 400)
+        ids = [str(uuid.uuid4()) for _ in range(3)]
+        self.assertEqual(self.client.delete(URL, {"ids": ids}, format="json").status_code, 400)
+        self.assertFalse(Customer.objects.exists())
+
+    def test_update_reports_unknown_ids_and_rolls_back(self):
+        alice = make_customer(self.store, "Alice")
+        rows = [{"id": str(alice.id), "name": "Alicia"}, {"id": str(uuid.uuid4()), "name": "Nobody"}]
+        response = self.client.patch(URL, rows, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["errors"], [{"index": 1, "errors": {"id": ["Not found."]}}])
+        alice.refresh_from_db()
+        self.assertEqual(alice.name, "Alice")
+
+        response = self.client.patch(URL, rows[:1], format="json")
+        self.assertEqual(response.status_code, 200)
+        alice.refresh_from_db()
+        self.assertEqual(alice.name, "Alicia")
+
+    def test_delete_by_ids(self):
+        alice = make_customer(self.store, "Alice")
+        bob = make_customer(self.store, "Bob")
+        response = self.client.delete(URL, {"ids": [str(alice.id), str(uuid.uuid4())]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"deleted": 1})
+        self.assertEqual(list(Customer.objects.values_list("pk", flat=True)), [bob.pk])
+
+        self.assertEqual(self.client.delete(URL, {"ids": ["nope"]}, format="json").status_code, 400)
+        self.assertEqual(self.client.delete(URL, [str(bob.id)], format="json").status_code, 400)
+
+
+def visit_payload(customer, cast, index):
+    return {
+        "customer": str(customer.id),
+        "cast": str(cast.id),
+        "visit_date": f"2024-01-{1 + index % 5:02d}",
+        "spending": "100",
+        "payment_method": ("Cash", "PayPay")[index % 2],
+        "entry_time": "2024-01-01T20:00:00Z",
+        "exit_time": "2024-01-01T22:00:00Z",
+        "accompanied": False,
+        "companions": "-",
+        "memo": "-",
+        "unpaid_amount": "10",
+        "received_amount": 90,
+        "unpaid_date": "2024-01-01",
+        "receipt": False,
+    }
+
+
+class VisitBulkWriteTests(TestCase):
+    """Visit batches cost the same number of queries whatever their size, and leave derived data right."""
+
+    def setUp(self):
+        self.client = client_for(make_user("admin@example.com"))
+        # Run the setup's rollups now (along with any days left marked on the
+        # connection by earlier tests), so only the batch's are counted below.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stores = [make_store("Ginza"), make_store("Shibuya")]
+            self.casts = [make_staff(store) for store in self.stores]
+            self.customers = [make_customer(store, f"Customer {n}") for n, store in enumerate(self.stores * 2)]
+
+    def rows(self, size):
+        return [
+            visit_payload(self.customers[index % 4], self.casts[index % 4 % 2], index) for index in range(size)
+        ]
+
+    def send(self, method, payload, queries):
+        # The day rollups run in the commit callbacks and are counted too.
+        with self.assertNumQueries(queries), self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(VISITS_URL, payload, format="json")
+        self.assertLess(response.status_code, 300, response.data)
+        return response
+
+    def assert_derived_data_matches_the_visits(self):
+        visits = VisitRecord.objects.order_by()
+        stats = {
+            row["customer_id"]: (row["count"], row["unpaid"], row["spend"])
+            for row in visits.values("customer_id").annotate(
+                count=Count("pk"), unpaid=Sum("unpaid_amount"), spend=Sum("spending")
+            )
+        }
+        for customer in Customer.objects.all():
+            self.assertEqual(
+                (customer.visit_count, customer.unpaid_balance, customer.total_spend),
+                stats.get(customer.pk, (0, 0, 0)),
+            )
+        totals = visits.values_list("customer__store_id", "visit_date", "payment_method").annotate(
+            Sum("spending"), Count("pk")
+        )
+        stored = DailyPaymentTotal.objects.values_list("store_id", "report_date", "payment_method", "amount", "visit_count")
+        self.assertEqual(set(stored), set(totals))
+
+    def test_create_update_and_delete_take_constant_queries(self):
+        for size in (10, 100):
+            with self.subTest(size=size):
+                ids = [row["id"] for row in self.send("post", self.rows(size), queries=24).data]
+                self.assertEqual(VisitRecord.objects.count(), size)
+                self.assert_derived_data_matches_the_visits()
+
+                changes = [
+                    {"id": pk, "spending": "250", "unpaid_amount": "0", "visit_date": "2024-01-09"}
+                    for pk in ids[::2]
+                ]
+                self.send("patch", changes, queries=15)
+                self.assert_derived_data_matches_the_visits()
+
+                self.assertEqual(self.send("delete", {"ids": ids}, queries=23).data, {"deleted": size})
+                self.assertFalse(VisitRecord.objects.exists())
+                self.assert_derived_data_matches_the_visits()
+                self.assertEqual(Tombstone.objects.filter(resource="api.visitrecord", object_id__in=ids).count(), size)
@@ -0,0 +1,84 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Customer
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user, make_visit
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        self.store = make_store()
+        self.customer = make_customer(self.store, "Alice")
+        self.client = client_for(make_user("admin@example.com"))
+        self.url = f"/api/customers/{self.customer.id}/"
+
+    def test_retrieve_returns_304_for_a_matching_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        self.customer.name = "Alicia"
+        self.customer.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_etag_changes_when_a_row_is_added(self):
+        etag = self.client.get("/api/customers/")["ETag"]
+        self.assertEqual(self.client.get("/api/customers/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        make_customer(self.store, "Bob")
+        response = self.client.get("/api/customers/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_update_with_current_if_match_succeeds(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.patch(self.url, {"name": "Alicia"}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response["ETag"], self.client.get(self.url)["ETag"])
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.name, "Alicia")
+
+    def test_update_with_stale_if_match_fails(self):
+        stale = self.client.get(self.url)["ETag"]
+        self.client.patch(self.url, {"name": "Alicia"}, format="json", HTTP_IF_MATCH=stale)
+        response = self.client.patch(self.url, {"name": "Bob"}, format="json", HTTP_IF_MATCH=stale)
+        self.assertEqual(response.status_code, 412)
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.name, "Alicia")
+
+    def test_update_without_if_match_is_unconditional(self):
+        response = self.client.patch(self.url, {"name": "Bob"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.patch(self.url, {"name": "Carol"}, format="json", HTTP_IF_MATCH="*").status_code, 200)
+
+    def test_list_etag_does_not_aggregate_over_the_table(self):
+        cast = make_staff(self.store)
+        make_visit(self.customer, cast)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/visit-records/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header("ETag"))
+        sql = " ".join(query["sql"].upper() for query in queries.captured_queries)
+        self.assertNotIn("COUNT(", sql)
+        self.assertNotIn("MAX(", sql)
+
+    def test_list_etag_covers_only_the_served_page(self):
+        make_customer(self.store, "Bob")
+        first = self.client.get("/api/customers/?page_size=1")
+        etag, next_url = first["ETag"], first.data["next"]
+        self.assertNotEqual(self.client.get(next_url)["ETag"], etag)
+
+        # Editing a row on another page leaves this page's ETag alone.
+        Customer.objects.exclude(pk=first.data["results"][0]["id"]).get().save()
+        self.assertEqual(self.client.get("/api/customers/?page_size=1", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Customer.objects.get(pk=first.data["results"][0]["id"]).save()
+        self.assertEqual(self.client.get("/api/customers/?page_size=1", HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,110 @@
+import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+
+from api.customer_stats import recompute_customer_stats
+from api.models import Customer, DailySummary
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user, make_visit
+
+DAY = datetime.date(2024, 1, 1)
+
+
+class CustomerStatsTests(TestCase):
+    def setUp(self):
+        self.store = make_store()
+        self.cast = make_staff(self.store)
+        self.customer = make_customer(self.store)
+
+    def stats(self):
+        customer = Customer.objects.get(pk=self.customer.pk)
+        return customer.total_spend, customer.unpaid_balance, customer.visit_count, customer.last_visit_date
+
+    def test_visit_writes_adjust_the_counters(self):
+        first = make_visit(self.customer, self.cast, DAY, spending="100", unpaid="30")
+        make_visit(self.customer, self.cast, DAY + datetime.timedelta(days=3), spending="50")
+        self.assertEqual(self.stats(), (Decimal("150"), Decimal("30"), 2, DAY + datetime.timedelta(days=3)))
+
+        first.spending, first.unpaid_amount = Decimal("120"), Decimal("0")
+        first.save()
+        self.assertEqual(self.stats(), (Decimal("170"), Decimal("0"), 2, DAY + datetime.timedelta(days=3)))
+
+        first.delete()
+        self.assertEqual(self.stats(), (Decimal("50"), Decimal("0"), 1, DAY + datetime.timedelta(days=3)))
+
+    def test_recompute_matches_the_incremental_counters(self):
+        for day in range(5):
+            make_visit(self.customer, self.cast, DAY + datetime.timedelta(days=day), spending="10", unpaid="1")
+        before = self.stats()
+        Customer.objects.update(total_spend=0, unpaid_balance=0, visit_count=0, last_visit_date=None)
+        recompute_customer_stats()
+        self.assertEqual(self.stats(), before)
+
+    def test_totals_beyond_eight_digits(self):
+        for _ in range(3):
+            make_visit(self.customer, self.cast, DAY, spending="999999.99")
+        response = client_for(make_user("admin@example.com")).get("/api/customers/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["total_spend"], "2999999.97")
+
+    def test_cascading_delete_does_not_load_each_visits_customer_and_cast(self):
+        def delete_cost(visits):
+            with self.captureOnCommitCallbacks(execute=True):
+                customer = make_customer(self.store)
+                for _ in range(visits):
+                    make_visit(customer, self.cast, DAY)
+            with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                customer.delete()
+            return len(queries)
+
+        # remove_visit and the tombstone still write once per visit; the
+        # customer/cast reads and rollup refresh must not grow with it.
+        self.assertEqual(delete_cost(10) - delete_cost(5), 5 * 2)
+        self.assertEqual(DailySummary.objects.get(store=self.store, report_date=DAY).total_sales, Decimal("0"))
+
+
+class VisitStatsMigrationTests(TransactionTestCase):
+    before = [("api", "0003_query_indexes")]
+    after = [("api", "0004_customer_visit_stats")]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_stats_are_backfilled_from_existing_visits(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        store = apps.get_model("api", "Store").objects.create(name="Store", address="Tokyo", is_active=True)
+        user = apps.get_model("api", "CmsUser").objects.create(email="cast@example.com", password_hash="x")
+        now = timezone.now()
+        cast = apps.get_model("api", "StaffMember").objects.create(
+            user=user, store=store, hourly_wage=1000, commission_rate=0.1, is_on_duty=False, check_in=now, check_out=now
+        )
+        Customer = apps.get_model("api", "Customer")
+        values = {"store": store, "first_visit": DAY, "contact_info": {}, "preferences": {}}
+        regular = Customer.objects.create(name="Regular", total_spend=Decimal("999"), **values)
+        Customer.objects.create(name="New", total_spend=Decimal("5"), **values)
+        visit = {
+            "customer": regular, "cast": cast, "payment_method": "Cash", "entry_time": now, "exit_time": now,
+            "accompanied": False, "companions": "", "memo": "", "received_amount": 0, "unpaid_date": DAY,
+            "receipt": False,
+        }
+        VisitRecord = apps.get_model("api", "VisitRecord")
+        VisitRecord.objects.create(visit_date=DAY, spending=Decimal("100"), unpaid_amount=Decimal("30"), **visit)
+        later = DAY + datetime.timedelta(days=3)
+        VisitRecord.objects.create(visit_date=later, spending=Decimal("50"), unpaid_amount=Decimal("0"), **visit)
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.after)
+        rows = executor.loader.project_state(self.after).apps.get_model("api", "Customer").objects.order_by("name")
+        self.assertEqual(
+            [(row.name, row.total_spend, row.unpaid_balance, row.visit_count, row.last_visit_date) for row in rows],
+            [("New", Decimal("0"), Decimal("0"), 0, None), ("Regular", Decimal("150"), Decimal("30"), 2, later)],
+        )
@@ -0,0 +1,119 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api import rollups
+from api.db_routers import ReplicaRouter
+from api.models import DailyPaymentTotal, DailySummary, Shift, VisitRecord
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user, make_visit
+
+DAY = datetime.date(2024, 1, 1)
+
+
+class DailySummaryUpsertTests(TestCase):
+    def setUp(self):
+        self.store = make_store()
+
+    def test_upsert_inserts_then_updates_only_the_given_fields(self):
+        DailySummary.objects.upsert(self.store.pk, DAY, total_expenses=Decimal("40"), notes="rent")
+        summary = DailySummary.objects.upsert(self.store.pk, DAY, notes="rent and stock")
+        self.assertEqual(DailySummary.objects.count(), 1)
+        self.assertEqual((summary.total_expenses, summary.notes), (Decimal("40"), "rent and stock"))
+
+    @override_settings(DATABASE_ROUTERS=["api.db_routers.ReplicaRouter"])
+    def test_upsert_writes_to_the_primary_while_reads_go_to_a_replica(self):
+        # "replica" is not a configured alias: any statement routed there fails.
+        with mock.patch.object(ReplicaRouter, "db_for_read", return_value="replica"):
+            summary = DailySummary.objects.upsert(self.store.pk, DAY, notes="closed")
+        self.assertEqual(summary._state.db, "default")
+        self.assertTrue(DailySummary.objects.filter(store=self.store, report_date=DAY, notes="closed").exists())
+
+
+class DailyRollupTests(TestCase):
+    def setUp(self):
+        self.store = make_store()
+        self.client = client_for(make_user("admin@example.com"))
+
+    def summary(self, day=DAY):
+        return DailySummary.objects.get(store=self.store, report_date=day)
+
+    def check_in(self, staff, start, hours):
+        with self.captureOnCommitCallbacks(execute=True):
+            staff.check_in, staff.check_out = start, start + datetime.timedelta(hours=hours)
+            staff.save()
+
+    def test_sales_and_payment_totals_follow_visits(self):
+        cast = make_staff(self.store)
+        customer = make_customer(self.store)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_visit(customer, cast, DAY, spending="100")
+            visit = make_visit(customer, cast, DAY, spending="50", payment_method=VisitRecord.PaymentMethod.PAYPAY)
+        self.assertEqual(self.summary().total_sales, Decimal("150"))
+        with self.captureOnCommitCallbacks(execute=True):
+            visit.delete()
+        self.assertEqual(self.summary().total_sales, Decimal("100"))
+        self.assertEqual(
+            list(DailyPaymentTotal.objects.values_list("payment_method", "amount")),
+            [(VisitRecord.PaymentMethod.CASH, Decimal("100"))],
+        )
+
+    def test_checking_in_on_a_new_day_keeps_the_previous_days_labor(self):
+        start = timezone.make_aware(datetime.datetime(2024, 1, 1, 18))
+        with self.captureOnCommitCallbacks(execute=True):
+            cast = make_staff(self.store, hourly_wage="1000", check_in=start, hours=6)
+            other = make_staff(self.store, hourly_wage="2000", check_in=start, hours=4)
+        self.assertEqual(self.summary().labor_costs, Decimal("14000.00"))
+
+        next_day = start + datetime.timedelta(days=1)
+        self.check_in(cast, next_day, 5)
+        self.assertEqual(self.summary().labor_costs, Decimal("14000.00"))
+        self.assertEqual(self.summary(next_day.date()).labor_costs, Decimal("5000.00"))
+
+        # Correcting the current shift's check-out replaces it, not adds to it.
+        self.check_in(cast, next_day, 3)
+        self.assertEqual(self.summary(next_day.date()).labor_costs, Decimal("3000.00"))
+        self.assertEqual(Shift.objects.filter(staff=cast).count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(self.summary().labor_costs, Decimal("6000.00"))
+
+    def test_payment_totals_are_updated_in_place(self):
+        cast = make_staff(self.store)
+        customer = make_customer(self.store)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_visit(customer, cast, DAY, spending="100")
+            visit = make_visit(customer, cast, DAY, spending="50", payment_method=VisitRecord.PaymentMethod.PAYPAY)
+        cash = DailyPaymentTotal.objects.get(payment_method=VisitRecord.PaymentMethod.CASH)
+        with self.captureOnCommitCallbacks(execute=True):
+            visit.payment_method = VisitRecord.PaymentMethod.CASH
+            visit.save()
+        self.assertEqual(
+            list(DailyPaymentTotal.objects.values_list("pk", "payment_method", "amount", "visit_count")),
+            [(cash.pk, VisitRecord.PaymentMethod.CASH, Decimal("150"), 2)],
+        )
+
+    def test_days_are_locked_before_they_are_read(self):
+        calls = mock.Mock()
+        calls.sales.return_value = {}
+        with mock.patch.object(rollups, "_lock_days", calls.lock), mock.patch.object(
+            rollups, "compute_daily_sales", calls.sales
+        ):
+            rollups.refresh_daily_rollups(store_ids=[self.store.pk], dates=[DAY])
+        self.assertEqual([name for name, _args, _kwargs in calls.mock_calls], ["lock", "sales"])
+
+    def test_sales_and_labor_are_not_writable_through_the_api(self):
+        cast = make_staff(self.store)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_visit(make_customer(self.store), cast, DAY, spending="100")
+        body = {"store": self.store.pk, "report_date": DAY, "total_sales": "1", "labor_costs": "1"}
+        response = self.client.post("/api/daily-summaries/upsert/", {**body, "total_expenses": "40"})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.patch(f"/api/daily-summaries/{self.summary().pk}/", {"total_sales": "1"})
+        self.assertEqual(response.status_code, 200)
+        summary = self.summary()
+        self.assertEqual((summary.total_sales, summary.total_expenses), (Decimal("100"), Decimal("40")))
@@ -0,0 +1,34 @@
+import csv
+import io
+from unittest import mock
+
+from django.test import TransactionTestCase, override_settings
+
+from api.db_routers import ReplicaRouter
+
+from .helpers import client_for, make_customer, make_store, make_user
+
+
+class ExportTests(TransactionTestCase):
+    def setUp(self):
+        self.store = make_store()
+        make_customer(self.store, "Alice")
+        make_customer(self.store, "Bob")
+        self.client = client_for(make_user("admin@example.com"))
+
+    def export(self, output):
+        response = self.client.get("/api/customers/export/", {"output": output})
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode("utf-8-sig")
+
+    def test_csv_export_streams_every_row(self):
+        rows = list(csv.DictReader(io.StringIO(self.export("csv"))))
+        self.assertEqual(sorted(row["name"] for row in rows), ["Alice", "Bob"])
+
+    @override_settings(DATABASE_ROUTERS=["api.db_routers.ReplicaRouter"], DATABASE_REPLICAS=["default"])
+    def test_streamed_rows_are_read_from_a_replica(self):
+        # The body is produced after ReplicaRoutingMiddleware returned.
+        with mock.patch.object(ReplicaRouter, "next_replica", return_value="default") as next_replica:
+            lines = self.export("ndjson").splitlines()
+        self.assertEqual(len(lines), 2)
+        next_replica.assert_called()
@@ -0,0 +1,56 @@
+import datetime
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user, make_visit
+
+
+class FastListSerializationTests(TestCase):
+    """The .values() list path must render exactly the bytes of the regular serializers."""
+
+    @classmethod
+    def setUpTestData(cls):
+        store = make_store()
+        cast = make_staff(store)
+        for index in range(5):
+            customer = make_customer(
+                store,
+                name=f"顧客 {index}",
+                contact_info={"phone": f"090-0000-000{index}", "tags": ["vip", index]},
+                preferences={"drink": None, "nested": {"level": index}},
+            )
+            make_visit(
+                customer,
+                cast,
+                datetime.date(2024, 1, 1) + datetime.timedelta(days=index),
+                spending=f"{index}1234.5",
+                unpaid=f"{index}.05",
+                entry_time=timezone.make_aware(datetime.datetime(2024, 1, 1, 18, 30, 15, 123456)),
+            )
+        cls.user = make_user("admin@example.com")
+
+    def assertSameBytes(self, url):
+        client = client_for(self.user)
+        with override_settings(API_FAST_LIST_SERIALIZATION=False):
+            regular = client.get(url)
+        with override_settings(API_FAST_LIST_SERIALIZATION=True):
+            fast = client.get(url)
+        self.assertEqual(regular.status_code, 200)
+        self.assertEqual(fast.content, regular.content)
+
+    def test_lists_are_byte_identical(self):
+        for url in (
+            "/api/customers/",
+            "/api/customers/?page_size=2",
+            "/api/customers/?ordering=-total_spend",
+            "/api/customers/?fields=id,name,total_spend",
+            "/api/visit-records/",
+            "/api/visit-records/?omit=memo&page_size=3",
+        ):
+            with self.subTest(url=url):
+                self.assertSameBytes(url)
+
+    def test_following_pages_are_byte_identical(self):
+        first = client_for(self.user).get("/api/customers/?page_size=2")
+        self.assertSameBytes(first.data["next"])
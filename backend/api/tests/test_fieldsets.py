@@ -0,0 +1,61 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import CustomerSerializer
+
+from .helpers import client_for, make_customer, make_store, make_user
+
+URL = "/api/customers/"
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.store = make_store()
+        self.customer = make_customer(self.store, "Alice", contact_info={"phone": "090"}, preferences={"drink": "wine"})
+        self.client = client_for(make_user("admin@example.com"))
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        # The last customers query reads the rows (a retrieve first reads its ETag).
+        selects = [query["sql"] for query in context.captured_queries if 'FROM "customers"' in query["sql"]]
+        return response.data, selects[-1].split(" FROM ")[0]
+
+    def test_fields_keeps_only_the_listed_fields(self):
+        data, columns = self.get(URL, {"fields": "id,name"})
+        self.assertEqual([set(row) for row in data["results"]], [{"id", "name"}])
+        self.assertNotIn('"contact_info"', columns)
+        self.assertNotIn('"search_document"', columns)
+        # The cursor and the list ETag still read their columns.
+        self.assertIn('"created_at"', columns)
+        self.assertIn('"updated_at"', columns)
+
+    def test_omit_drops_the_listed_fields(self):
+        data, columns = self.get(f"{URL}{self.customer.id}/", {"omit": "contact_info,preferences"})
+        self.assertEqual(set(data), set(CustomerSerializer.Meta.fields) - {"contact_info", "preferences"})
+        self.assertNotIn('"contact_info"', columns)
+        self.assertNotIn('"preferences"', columns)
+        self.assertIn('"name"', columns)
+
+    def test_fields_and_omit_combine(self):
+        data, _columns = self.get(URL, {"fields": "id,name,store", "omit": "store"})
+        self.assertEqual(set(data["results"][0]), {"id", "name"})
+
+    @override_settings(API_FAST_LIST_SERIALIZATION=True)
+    def test_fast_list_path_is_trimmed_too(self):
+        data, columns = self.get(URL, {"fields": "name,total_spend"})
+        self.assertEqual(data["results"], [{"name": "Alice", "total_spend": "0.00"}])
+        self.assertNotIn('"preferences"', columns)
+
+    def test_unknown_fields_are_rejected(self):
+        for params in ({"fields": "id,password_hash"}, {"omit": "nope"}):
+            response = self.client.get(URL, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("fields", response.data)
+
+    def test_writes_ignore_the_parameters(self):
+        response = self.client.patch(f"{URL}{self.customer.id}/?fields=name", {"name": "Alicia"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), set(CustomerSerializer.Meta.fields))
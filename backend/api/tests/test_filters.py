@@ -0,0 +1,156 @@
+import datetime
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.models import DailySummary, VisitRecord
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user, make_visit
+
+
+class JsonFieldFilterTests(TestCase):
+    def setUp(self):
+        store = make_store()
+        self.client = client_for(make_user("admin@example.com"))
+        make_customer(
+            store, "Alice", contact_info={"phone": "09011112222", "line_id": "alice"},
+            preferences={"drink": "wine", "tags": ["vip", "regular"], "seat": {"area": "counter"}},
+        )
+        make_customer(
+            store, "Bob", contact_info={"phone": "09033334444"},
+            preferences={"drink": "beer", "tags": ["regular"], "seat": {"area": "box"}},
+        )
+
+    def names(self, params):
+        response = self.client.get("/api/customers/", params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return sorted(row["name"] for row in response.data["results"])
+
+    def test_promoted_keys_filter_on_the_generated_column(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.names({"contact_info__phone": "09011112222"}), ["Alice"])
+        sql = next(query["sql"] for query in context.captured_queries if '"customers"' in query["sql"])
+        self.assertIn('"contact_phone" =', sql)
+        self.assertEqual(self.names({"contact_info__line_id": "bob"}), [])
+
+    def test_other_keys_filter_by_containment(self):
+        self.assertEqual(self.names({"preferences__drink": "beer"}), ["Bob"])
+        self.assertEqual(self.names({"preferences__seat__area": "counter"}), ["Alice"])
+        self.assertEqual(self.names({"preferences__drink": "sake"}), [])
+
+    def test_contains_matches_objects_and_array_members(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.names({"preferences__contains": json.dumps({"tags": ["vip"]})}), ["Alice"])
+        if connection.vendor == "sqlite":
+            self.assertTrue(any("json_each" in query["sql"] for query in context.captured_queries))
+        tags = json.dumps({"tags": ["regular"]})
+        self.assertEqual(self.names({"preferences__contains": tags}), ["Alice", "Bob"])
+        both = json.dumps({"drink": "beer", "tags": ["vip"]})
+        self.assertEqual(self.names({"preferences__contains": both}), [])
+        seat = json.dumps({"seat": {"area": "box"}})
+        self.assertEqual(self.names({"preferences__contains": seat}), ["Bob"])
+        self.assertEqual(self.names({"preferences__contains": "{}"}), ["Alice", "Bob"])
+
+    def test_has_key(self):
+        self.assertEqual(self.names({"contact_info__has_key": "line_id"}), ["Alice"])
+
+    def test_malformed_values_are_rejected(self):
+        rejected = [{"preferences__contains": "{not json"}, {"preferences__bad%key": "1"}]
+        if not connection.features.supports_json_field_contains:
+            # Documents the key-lookup spelling cannot express.
+            rejected += [
+                {"preferences__contains": '"vip"'},
+                {"preferences__contains": '{"bad key": 1}'},
+                {"preferences__contains": '{"tags": [{"name": "vip"}]}'},
+            ]
+        for params in rejected:
+            response = self.client.get("/api/customers/", params)
+            self.assertEqual(response.status_code, 400, params)
+
+
+class ListFilterTests(TestCase):
+    def setUp(self):
+        self.client = client_for(make_user("admin@example.com"))
+        self.ginza, self.shibuya = make_store("Ginza"), make_store("Shibuya")
+        self.cast, self.other_cast = make_staff(self.ginza), make_staff(self.shibuya)
+        self.alice = make_customer(self.ginza, "Alice Tanaka", first_visit=datetime.date(2024, 1, 10))
+        self.bob = make_customer(self.shibuya, "Bob Suzuki", first_visit=datetime.date(2024, 2, 10))
+        self.early = make_visit(self.alice, self.cast, datetime.date(2024, 1, 10), spending="300", unpaid="50")
+        self.late = make_visit(
+            self.alice, self.cast, datetime.date(2024, 1, 20), spending="100",
+            payment_method=VisitRecord.PaymentMethod.PAYPAY,
+        )
+        self.elsewhere = make_visit(self.bob, self.other_cast, datetime.date(2024, 2, 10), spending="200")
+
+    def ids(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [row["id"] for row in response.data["results"]]
+
+    def assert_rejected(self, url, params):
+        for name, value in params.items():
+            response = self.client.get(url, {name: value})
+            self.assertEqual(response.status_code, 400, name)
+            self.assertIn(name, response.data)
+
+    def test_customer_filters(self):
+        url = "/api/customers/"
+        alice, bob = str(self.alice.id), str(self.bob.id)
+        self.assertEqual(self.ids(url, {"store": str(self.ginza.id)}), [alice])
+        self.assertEqual(self.ids(url, {"name": "suzuki"}), [bob])
+        self.assertEqual(self.ids(url, {"name_prefix": "Alice"}), [alice])
+        self.assertEqual(self.ids(url, {"name_prefix": "Tanaka"}), [])
+        self.assertEqual(self.ids(url, {"first_visit_from": "2024-02-01"}), [bob])
+        self.assertEqual(self.ids(url, {"first_visit_to": "2024-01-31"}), [alice])
+        self.assertEqual(self.ids(url, {"first_visit_from": "2024-01-11", "first_visit_to": "2024-02-09"}), [])
+        self.assert_rejected(url, {"store": "ginza", "first_visit_from": "2024-13-01", "first_visit_to": "soon"})
+
+    def test_visit_filters(self):
+        url = "/api/visit-records/"
+        early, late, elsewhere = str(self.early.id), str(self.late.id), str(self.elsewhere.id)
+        self.assertEqual(set(self.ids(url, {"store": str(self.ginza.id)})), {early, late})
+        self.assertEqual(self.ids(url, {"cast": str(self.other_cast.id)}), [elsewhere])
+        self.assertEqual(self.ids(url, {"customer": str(self.bob.id)}), [elsewhere])
+        self.assertEqual(self.ids(url, {"date_from": "2024-01-15", "date_to": "2024-01-31"}), [late])
+        self.assertEqual(self.ids(url, {"payment_method": "PayPay"}), [late])
+        self.assertEqual(self.ids(url, {"unpaid": "true"}), [early])
+        self.assertEqual(set(self.ids(url, {"unpaid": "no"})), {late, elsewhere})
+        self.assertEqual(self.ids(url, {"customer_name": "suzu"}), [elsewhere])
+        self.assertEqual(self.ids(url, {"store": str(self.ginza.id), "date_to": "2024-01-15"}), [early])
+        self.assert_rejected(url, {
+            "cast": "1", "customer": "x", "date_from": "2024/01/01", "payment_method": "cash", "unpaid": "maybe",
+        })
+
+    def test_daily_summary_filters(self):
+        url = "/api/daily-summaries/"
+        rows = {
+            (store, day): DailySummary.objects.create(
+                store=store, report_date=day, total_sales=0, total_expenses=0, labor_costs=0, notes=""
+            )
+            for store in (self.ginza, self.shibuya)
+            for day in (datetime.date(2024, 3, 1), datetime.date(2024, 3, 2))
+        }
+        march_2 = datetime.date(2024, 3, 2)
+        self.assertEqual(
+            self.ids(url, {"store": str(self.ginza.id), "date_from": "2024-03-02"}),
+            [str(rows[self.ginza, march_2].id)],
+        )
+        self.assertEqual(len(self.ids(url, {"date_to": "2024-03-01"})), 2)
+        self.assertEqual(self.ids(url, {"date_from": "2024-03-03"}), [])
+        self.assert_rejected(url, {"store": "all", "date_from": "yesterday", "date_to": "2024-03-32"})
+
+    def test_ordering_is_limited_to_the_listed_fields(self):
+        url = "/api/visit-records/"
+        early, late, elsewhere = str(self.early.id), str(self.late.id), str(self.elsewhere.id)
+        self.assertEqual(self.ids(url, {"ordering": "-spending"}), [early, elsewhere, late])
+        self.assertEqual(self.ids(url, {"ordering": "visit_date"}), [early, late, elsewhere])
+        # Other fields are ignored, leaving the default (newest first) order.
+        default = [elsewhere, late, early]
+        self.assertEqual(self.ids(url, {}), default)
+        self.assertEqual(self.ids(url, {"ordering": "payment_method"}), default)
+        self.assertEqual(self.ids(url, {"ordering": "customer__name"}), default)
+        alice, bob = str(self.alice.id), str(self.bob.id)
+        self.assertEqual(self.ids("/api/customers/", {"ordering": "name"}), [alice, bob])
+        self.assertEqual(self.ids("/api/customers/", {"ordering": "search_document"}), [bob, alice])
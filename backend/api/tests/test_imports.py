@@ -0,0 +1,64 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from api.models import CmsUser, Customer, VisitRecord
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user
+
+
+def upload(text, encoding="utf-8"):
+    return SimpleUploadedFile("import.csv", text.encode(encoding) if isinstance(text, str) else text, "text/csv")
+
+
+class CsvImportTests(TestCase):
+    def setUp(self):
+        self.store = make_store("A")
+        self.other = make_store("B")
+        self.manager = make_user("manager@example.com", CmsUser.Role.MANAGER)
+        make_staff(self.store, user=self.manager)
+        self.client = client_for(self.manager)
+
+    def post(self, resource, text, **data):
+        return self.client.post(f"/api/{resource}/import/", {"file": upload(text), **data}, format="multipart")
+
+    def test_invalid_rows_are_rejected_and_the_rest_imported(self):
+        response = self.post("customers", "name,first_visit\nAlice,2024-01-02\nBob,not-a-date\n", store=str(self.store.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["imported"], response.data["rejected"]), (1, 1))
+        self.assertEqual(response.data["rejects"][0]["line"], 3)
+        self.assertEqual(list(Customer.objects.values_list("name", flat=True)), ["Alice"])
+
+    def test_rows_for_another_store_are_rejected(self):
+        text = f"store,name,first_visit\n{self.store.id},Alice,2024-01-02\n{self.other.id},Bob,2024-01-02\n"
+        response = self.post("customers", text)
+        self.assertEqual((response.data["imported"], response.data["rejected"]), (1, 1))
+        self.assertIn("store", response.data["rejects"][0]["errors"])
+        self.assertFalse(Customer.objects.filter(store=self.other).exists())
+
+    def test_default_store_must_be_accessible(self):
+        response = self.post("customers", "name,first_visit\nAlice,2024-01-02\n", store=str(self.other.id))
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Customer.objects.exists())
+
+    def test_visit_cast_must_work_in_the_customers_store(self):
+        customer = make_customer(self.store)
+        foreign_cast = make_staff(self.other)
+        text = (
+            "customer,cast,visit_date,spending,payment_method\n"
+            f"{customer.id},{foreign_cast.id},2024-01-02,1000,cash\n"
+        )
+        response = self.post("visit-records", text)
+        self.assertEqual((response.data["imported"], response.data["rejected"]), (0, 1))
+        self.assertIn("cast", response.data["rejects"][0]["errors"])
+        self.assertFalse(VisitRecord.objects.exists())
+
+    def test_badly_encoded_file_imports_nothing(self):
+        rows = "".join(f"Customer {n},2024-01-02\n" for n in range(50))
+        data = ("name,first_visit\n" + rows).encode() + "顧客,2024-01-02\n".encode("shift_jis")
+        with self.settings(API_IMPORT_BATCH_SIZE=10):
+            response = self.client.post(
+                "/api/customers/import/", {"file": upload(data), "store": str(self.store.id)}, format="multipart"
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("file", response.data)
+        self.assertFalse(Customer.objects.exists())
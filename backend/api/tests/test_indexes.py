@@ -0,0 +1,93 @@
+"""
+The list and report access paths are served by the composite indexes of
+migrations 0003, 0009 and 0012. Checked with SQLite's EXPLAIN QUERY PLAN,
+which the test database uses; the plans name the index that is searched
+and would show "USE TEMP B-TREE" for an ORDER BY the index does not cover.
+"""
+import datetime
+import unittest
+from decimal import Decimal
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from api.models import Customer, DailySummary, PerformanceTarget, StaffMember, VisitRecord
+
+from .helpers import make_customer, make_staff, make_store
+
+DAY = datetime.date(2024, 1, 1)
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite's")
+class IndexUsageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.store = make_store()
+        cls.staff = make_staff(cls.store)
+        cls.customer = make_customer(cls.store)
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(f"USING INDEX {index}", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_store_scoped_lists_seek_in_keyset_order(self):
+        customers = Customer.objects.filter(store=self.store)
+        self.assertUsesIndex(customers.order_by("-created_at", "-id"), "customers_store_created_idx")
+        self.assertUsesIndex(customers.order_by("name", "id"), "customers_store_name_idx")
+        staff = StaffMember.objects.filter(store=self.store).order_by("created_at", "id")
+        self.assertUsesIndex(staff, "staff_members_store_idx")
+
+    def test_visit_report_paths(self):
+        self.assertUsesIndex(
+            VisitRecord.objects.filter(cast=self.staff, visit_date__gte=DAY), "visit_records_cast_date_idx"
+        )
+        self.assertUsesIndex(
+            VisitRecord.objects.filter(visit_date__range=(DAY, DAY + datetime.timedelta(days=30))),
+            "visit_records_date_idx",
+        )
+        self.assertUsesIndex(
+            VisitRecord.objects.filter(customer=self.customer, unpaid_amount__gt=0).order_by("unpaid_date"),
+            "visit_records_unpaid_idx",
+        )
+
+    def test_target_and_summary_lookups(self):
+        self.assertUsesIndex(
+            PerformanceTarget.objects.filter(staff=self.staff, target_date__gte=DAY), "perf_targets_staff_date_idx"
+        )
+        # The (store, report_date) unique constraint's own index.
+        plan = DailySummary.objects.filter(store=self.store, report_date=DAY).explain()
+        self.assertIn("(store_id=? AND report_date=?)", plan)
+
+
+class MergeDuplicateSummariesMigrationTests(TransactionTestCase):
+    before = [("api", "0002_add_username_to_cmsuser")]
+    after = [("api", "0003_query_indexes")]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicate_days_are_merged_before_the_unique_constraint(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        Store = apps.get_model("api", "Store")
+        Summary = apps.get_model("api", "DailySummary")
+        store = Store.objects.create(name="Store", address="Tokyo", is_active=True)
+        values = {"store": store, "report_date": DAY, "total_expenses": 0, "labor_costs": 0}
+        Summary.objects.create(total_sales=Decimal("100"), notes="sales", **values)
+        Summary.objects.create(total_sales=Decimal("0"), notes="expenses", **{**values, "total_expenses": 40})
+        Summary.objects.create(total_sales=Decimal("5"), notes="", **{**values, "report_date": DAY.replace(day=2)})
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.after)
+        rows = executor.loader.project_state(self.after).apps.get_model("api", "DailySummary").objects.order_by(
+            "report_date"
+        )
+        self.assertEqual(
+            [(row.report_date, row.total_sales, row.total_expenses, sorted(row.notes.split("\n"))) for row in rows],
+            [(DAY, Decimal("100"), Decimal("40"), ["expenses", "sales"]), (DAY.replace(day=2), Decimal("5"), 0, [""])],
+        )
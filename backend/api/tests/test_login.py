@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.contrib.auth.hashers import identify_hasher
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import login
+
+from .helpers import make_user
+
+URL = "/api/auth/login/"
+
+
+@override_settings(LOGIN_MAX_FAILURES_PER_IP=4, LOGIN_MAX_FAILURES_PER_ACCOUNT=2)
+class LoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user("alice@example.com", password="secret")
+        self.client = APIClient()
+
+    def post(self, email, password, ip="10.0.0.1", **extra):
+        return self.client.post(URL, {"email": email, "password": password}, format="json", REMOTE_ADDR=ip, **extra)
+
+    def test_valid_credentials_return_tokens(self):
+        response = self.post("alice@example.com", "secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["user_id"], str(self.user.id))
+        self.assertIn("access", response.data)
+        self.assertEqual(self.post("alice@example.com", "wrong").status_code, 401)
+
+    def test_account_is_throttled_after_repeated_failures(self):
+        self.assertEqual(self.post("alice@example.com", "wrong", ip="10.0.0.1").status_code, 401)
+        self.assertEqual(self.post("ALICE@example.com", "wrong", ip="10.0.0.2").status_code, 401)
+        with mock.patch("api.login.check_password") as check_password:
+            response = self.post("alice@example.com", "secret", ip="10.0.0.3")
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+        check_password.assert_not_called()
+        # Other accounts are unaffected.
+        make_user("bob@example.com", password="secret")
+        self.assertEqual(self.post("bob@example.com", "secret", ip="10.0.0.3").status_code, 200)
+
+    def test_success_clears_the_account_count(self):
+        self.assertEqual(self.post("alice@example.com", "wrong").status_code, 401)
+        self.assertEqual(self.post("alice@example.com", "secret").status_code, 200)
+        self.assertEqual(self.post("alice@example.com", "wrong").status_code, 401)
+        self.assertEqual(self.post("alice@example.com", "secret").status_code, 200)
+
+    def test_ip_is_throttled_across_accounts(self):
+        for n in range(4):
+            self.assertEqual(self.post(f"nobody{n}@example.com", "wrong").status_code, 401)
+        response = self.post("alice@example.com", "secret")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        self.assertEqual(self.post("alice@example.com", "secret", ip="10.0.0.2").status_code, 200)
+
+    def test_ip_header_is_read_only_when_configured(self):
+        for n in range(4):
+            self.post(f"nobody{n}@example.com", "wrong")
+        self.assertEqual(self.post("alice@example.com", "secret", HTTP_X_REAL_IP="10.9.9.9").status_code, 429)
+        with override_settings(LOGIN_CLIENT_IP_HEADER="HTTP_X_REAL_IP"):
+            response = self.post("alice@example.com", "secret", HTTP_X_REAL_IP="10.9.9.9")
+        self.assertEqual(response.status_code, 200)
+
+    def test_unknown_email_is_checked_against_the_dummy_hash(self):
+        with mock.patch("api.login.check_password", return_value=False) as check_password:
+            self.assertEqual(self.post("nobody@example.com", "secret").status_code, 401)
+        check_password.assert_called_once_with("secret", login._dummy_hash)
+        algorithm = identify_hasher(self.user.password_hash).algorithm
+        self.assertEqual(identify_hasher(login._dummy_hash).algorithm, algorithm)
+
+    def test_dummy_hash_follows_the_configured_hasher(self):
+        with override_settings(CMS_PASSWORD_HASHER="pbkdf2_sha1"):
+            self.assertEqual(identify_hasher(login._dummy_hash).algorithm, "pbkdf2_sha1")
+        self.assertEqual(identify_hasher(login._dummy_hash).algorithm, "pbkdf2_sha256")
+
+    def test_login_rehashes_with_the_configured_hasher(self):
+        with override_settings(CMS_PASSWORD_HASHER="pbkdf2_sha1"):
+            legacy = make_user("legacy@example.com", password="secret")
+        self.assertEqual(identify_hasher(legacy.password_hash).algorithm, "pbkdf2_sha1")
+
+        self.assertEqual(self.post("legacy@example.com", "wrong").status_code, 401)
+        legacy.refresh_from_db()
+        self.assertEqual(identify_hasher(legacy.password_hash).algorithm, "pbkdf2_sha1")
+
+        self.assertEqual(self.post("legacy@example.com", "secret").status_code, 200)
+        legacy.refresh_from_db()
+        self.assertEqual(identify_hasher(legacy.password_hash).algorithm, "pbkdf2_sha256")
+        self.assertEqual(self.post("legacy@example.com", "secret").status_code, 200)
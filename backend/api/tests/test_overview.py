@@ -0,0 +1,100 @@
+import datetime
+
+from django.test import TestCase
+
+from api import auth
+from api.models import CmsUser, CustomerProfile
+from api.serializers import CustomerSerializer, VisitRecordSerializer
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user, make_visit
+
+DAY = datetime.date(2024, 1, 1)
+OVERVIEW_FIELDS = {*CustomerSerializer.Meta.fields, "profile", "detail", "preference", "recent_visits"}
+
+
+class CustomerOverviewTests(TestCase):
+    def setUp(self):
+        auth.user_cache.clear()
+        auth.membership_cache.clear()
+        self.addCleanup(auth.user_cache.clear)
+        self.addCleanup(auth.membership_cache.clear)
+        self.store = make_store()
+        self.cast, self.colleague = make_staff(self.store), make_staff(self.store)
+        self.admin = client_for(make_user("admin@example.com"))
+
+    def add_customers(self, count, visits=3):
+        customers = []
+        for n in range(count):
+            customer = make_customer(self.store, f"Customer {n}")
+            for day in range(visits):
+                cast = self.cast if day % 2 else self.colleague
+                make_visit(customer, cast, DAY + datetime.timedelta(days=day))
+            customers.append(customer)
+        return customers
+
+    def get(self, client, url, params=None):
+        response = client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_list_queries_do_not_grow_with_the_page(self):
+        self.get(self.admin, "/api/customers/overview/")  # resolves and caches the user
+        self.add_customers(2)
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.get(self.admin, "/api/customers/overview/")["results"]), 2)
+        self.add_customers(8, visits=6)
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.get(self.admin, "/api/customers/overview/")["results"]), 10)
+
+    def test_detail_queries(self):
+        [customer] = self.add_customers(1)
+        url = f"/api/customers/{customer.id}/overview/"
+        self.get(self.admin, url)
+        with self.assertNumQueries(2):
+            self.get(self.admin, url)
+
+    def test_cast_queries_do_not_grow_with_the_page(self):
+        client = client_for(self.cast.user)
+        self.get(client, "/api/customers/overview/")  # resolves and caches the user and memberships
+        self.add_customers(2)
+        with self.assertNumQueries(2):
+            self.get(client, "/api/customers/overview/")
+        self.add_customers(8, visits=6)
+        with self.assertNumQueries(2):
+            self.get(client, "/api/customers/overview/")
+
+    def test_response_shape(self):
+        [customer] = self.add_customers(1, visits=7)
+        CustomerProfile.objects.create(customer=customer, birthday=DAY, zodiac="Aries", animal_fortune="Tiger")
+        data = self.get(self.admin, f"/api/customers/{customer.id}/overview/")
+        self.assertEqual(set(data), OVERVIEW_FIELDS)
+        self.assertEqual(data["profile"]["zodiac"], "Aries")
+        self.assertIsNone(data["detail"])
+        self.assertIsNone(data["preference"])
+        visits = data["recent_visits"]
+        self.assertEqual(len(visits), 5)
+        self.assertEqual(set(visits[0]), set(VisitRecordSerializer.Meta.fields))
+        dates = [visit["visit_date"] for visit in visits]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        self.assertEqual(dates[0], "2024-01-07")
+
+        listing = self.get(self.admin, "/api/customers/overview/", {"visits": "2"})["results"]
+        self.assertEqual(set(listing[0]), OVERVIEW_FIELDS)
+        self.assertEqual(len(listing[0]["recent_visits"]), 2)
+        listing = self.get(self.admin, "/api/customers/overview/", {"visits": "0"})["results"]
+        self.assertEqual(listing[0]["recent_visits"], [])
+
+    def test_casts_see_their_own_visits_of_their_stores_customers(self):
+        [customer] = self.add_customers(1, visits=4)
+        client = client_for(self.cast.user)
+        visits = self.get(client, f"/api/customers/{customer.id}/overview/")["recent_visits"]
+        self.assertEqual({visit["cast"] for visit in visits}, {self.cast.id})
+        self.assertEqual(len(visits), 2)
+        [row] = self.get(client, "/api/customers/overview/")["results"]
+        self.assertEqual([visit["id"] for visit in row["recent_visits"]], [visit["id"] for visit in visits])
+
+        outsider = make_user("outsider@example.com", CmsUser.Role.CAST)
+        make_staff(make_store("Other"), user=outsider)
+        outsider_client = client_for(outsider)
+        self.assertEqual(outsider_client.get(f"/api/customers/{customer.id}/overview/").status_code, 404)
+        self.assertEqual(self.get(outsider_client, "/api/customers/overview/")["results"], [])
@@ -0,0 +1,54 @@
+from django.test import TestCase
+
+from api.models import Customer
+
+from .helpers import client_for, make_customer, make_store, make_user
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.store = make_store()
+        self.client = client_for(make_user("admin@example.com"))
+
+    def collect(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row["id"] for row in response.data["results"]]
+            url, pages = response.data["next"], pages + 1
+        return ids, pages
+
+    def test_ties_in_the_leading_field_are_neither_skipped_nor_repeated(self):
+        # bulk_create gives every row the same created_at.
+        customers = [Customer(store=self.store, name="Same", first_visit="2024-01-01", contact_info={}, preferences={})
+                     for _ in range(7)]
+        Customer.objects.bulk_create(customers)
+        Customer.objects.update(created_at=Customer.objects.first().created_at)
+        for ordering in ("", "&ordering=name", "&ordering=-total_spend"):
+            ids, pages = self.collect(f"/api/customers/?page_size=3{ordering}")
+            self.assertEqual(pages, 3)
+            self.assertCountEqual(ids, [str(c.pk) for c in customers])
+            self.assertEqual(len(set(ids)), 7)
+
+    def test_renaming_a_row_does_not_move_it_between_pages(self):
+        for index in range(6):
+            make_customer(self.store, name=f"Customer {index}")
+        first = self.client.get("/api/customers/?page_size=3")
+        Customer.objects.filter(pk=first.data["results"][0]["id"]).update(name="zzz")
+        Customer.objects.filter(pk=first.data["results"][1]["id"]).update(name="aaa")
+        rest, _pages = self.collect(first.data["next"])
+        self.assertEqual(len(rest), 3)
+        self.assertFalse(set(rest) & {row["id"] for row in first.data["results"]})
+
+    def test_previous_link_returns_the_earlier_page(self):
+        for index in range(5):
+            make_customer(self.store, name=f"Customer {index}")
+        first = self.client.get("/api/customers/?page_size=2")
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+
+    def test_malformed_cursor_is_not_found(self):
+        response = self.client.get("/api/customers/?cursor=cD1bIngiXQ%3D%3D")
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,90 @@
+import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.models import PerformanceTarget
+from api.performance import cast_performance, compute_cast_performance
+
+from .helpers import make_customer, make_staff, make_store, make_visit
+
+
+class CastPerformanceTests(TestCase):
+    def setUp(self):
+        self.store = make_store()
+        self.cast = make_staff(self.store)
+        self.idle = make_staff(self.store)
+        customer = make_customer(self.store)
+        make_visit(customer, self.cast, datetime.date(2024, 3, 1), spending="1000")
+        make_visit(customer, self.cast, datetime.date(2024, 3, 31), spending="500")
+        make_visit(customer, self.cast, datetime.date(2024, 2, 29), spending="9000")
+        make_visit(customer, self.cast, datetime.date(2024, 4, 1), spending="9000")
+        PerformanceTarget.objects.create(
+            staff=self.cast, target_amount=Decimal("3000"),
+            target_type=PerformanceTarget.TargetType.MONTHLY, target_date=datetime.date(2024, 3, 1),
+        )
+
+    def test_only_visits_in_the_window_are_counted(self):
+        rows = compute_cast_performance(self.store.id, datetime.date(2024, 3, 1), datetime.date(2024, 3, 31))
+        by_staff = {row["staff"]: row for row in rows}
+        cast = by_staff[str(self.cast.id)]
+        self.assertEqual((cast["visit_count"], cast["actual"]), (2, "1500.00"))
+        self.assertEqual((cast["target"], cast["achievement_ratio"]), ("3000.00", 0.5))
+        idle = by_staff[str(self.idle.id)]
+        self.assertEqual((idle["visit_count"], idle["actual"], idle["achievement_ratio"]), (0, "0.00", None))
+        self.assertEqual(rows[0]["staff"], str(self.cast.id))
+
+    def test_visits_are_not_joined_into_the_outer_query(self):
+        with self.assertNumQueries(1) as context:
+            compute_cast_performance(self.store.id, datetime.date(2024, 3, 1), datetime.date(2024, 3, 31))
+        sql = context.captured_queries[0]["sql"].upper()
+        self.assertNotIn("LEFT OUTER JOIN \"VISIT_RECORDS\"", sql)
+        self.assertNotIn("GROUP BY \"STAFF_MEMBERS\"", sql)
+
+    def test_monthly_targets_are_compared_with_the_whole_month(self):
+        rows = compute_cast_performance(self.store.id, datetime.date(2024, 3, 1), datetime.date(2024, 3, 15))
+        cast = next(row for row in rows if row["staff"] == str(self.cast.id))
+        self.assertEqual((cast["actual"], cast["monthly_actual"]), ("1000.00", "1500.00"))
+        self.assertEqual((cast["target"], cast["achievement_ratio"]), ("3000.00", 0.5))
+
+    def test_daily_targets_are_compared_with_the_window(self):
+        PerformanceTarget.objects.create(
+            staff=self.idle, target_amount=Decimal("400"),
+            target_type=PerformanceTarget.TargetType.DAILY, target_date=datetime.date(2024, 3, 2),
+        )
+        make_visit(make_customer(self.store), self.idle, datetime.date(2024, 3, 2), spending="100")
+        rows = compute_cast_performance(self.store.id, datetime.date(2024, 3, 2), datetime.date(2024, 3, 2))
+        idle = next(row for row in rows if row["staff"] == str(self.idle.id))
+        self.assertEqual((idle["actual"], idle["target"], idle["achievement_ratio"]), ("100.00", "400.00", 0.25))
+
+
+class CastPerformanceCacheTests(TestCase):
+    window = (datetime.date(2024, 3, 1), datetime.date(2024, 3, 31))
+
+    def setUp(self):
+        cache.clear()
+        self.store = make_store()
+        self.cast = make_staff(self.store)
+        self.customer = make_customer(self.store)
+
+    def add_visit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            make_visit(self.customer, self.cast, datetime.date(2024, 3, 5), spending="100")
+
+    @override_settings(PERFORMANCE_DASHBOARD_CACHE="default")
+    def test_shared_cache_is_retired_by_writes(self):
+        self.add_visit()
+        self.assertEqual(cast_performance(self.store.id, *self.window)[0]["actual"], "100.00")
+        with self.assertNumQueries(0):
+            cast_performance(self.store.id, *self.window)
+        self.add_visit()
+        self.assertEqual(cast_performance(self.store.id, *self.window)[0]["actual"], "200.00")
+
+    @override_settings(PERFORMANCE_DASHBOARD_CACHE=None)
+    def test_nothing_is_cached_without_a_shared_cache(self):
+        self.add_visit()
+        with self.assertNumQueries(1):
+            self.assertEqual(cast_performance(self.store.id, *self.window)[0]["actual"], "100.00")
+        with self.assertNumQueries(1):
+            cast_performance(self.store.id, *self.window)
@@ -0,0 +1,132 @@
+import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.models import CmsUser, VisitRecord
+from api.receivables import PaymentError, post_payment
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user, make_visit
+
+DAY = datetime.date(2024, 1, 1)
+
+
+class PostPaymentTests(TestCase):
+    def setUp(self):
+        self.store = make_store()
+        self.cast = make_staff(self.store)
+        self.customer = make_customer(self.store)
+        self.client = client_for(make_user("admin@example.com"))
+        # Created out of order: allocation follows the unpaid date, not the insert order.
+        self.newest = make_visit(self.customer, self.cast, DAY + datetime.timedelta(days=31), unpaid="200")
+        self.oldest = make_visit(self.customer, self.cast, DAY, unpaid="300")
+        self.middle = make_visit(self.customer, self.cast, DAY + datetime.timedelta(days=9), unpaid="500")
+        self.settled = make_visit(self.customer, self.cast, DAY - datetime.timedelta(days=1))
+
+    def state(self, visit):
+        visit.refresh_from_db()
+        return visit.unpaid_amount, visit.received_amount
+
+    def pay(self, amount, visit=None):
+        payload = {"amount": amount, **({"visit": str(visit.id)} if visit else {})}
+        return self.client.post(f"/api/customers/{self.customer.id}/payments/", payload, format="json")
+
+    def test_payment_settles_the_oldest_visits_first(self):
+        response = self.pay("600")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["visit"], row["applied"]) for row in response.data["allocations"]],
+            [(str(self.oldest.id), "300.00"), (str(self.middle.id), "300.00")],
+        )
+        self.assertEqual(response.data["unpaid_balance"], "400.00")
+        self.assertEqual(self.state(self.oldest), (Decimal("0"), 300))
+        self.assertEqual(self.state(self.middle), (Decimal("200"), 300))
+        self.assertEqual(self.state(self.newest), (Decimal("200"), 0))
+        self.assertEqual(self.state(self.settled), (Decimal("0"), 0))
+
+    def test_overpayment_is_rejected_and_changes_nothing(self):
+        response = self.pay("1000.01")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("amount", response.data)
+        self.assertEqual(self.state(self.oldest), (Decimal("300"), 0))
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.unpaid_balance, Decimal("1000"))
+        self.assertEqual(self.pay("300.01", visit=self.oldest).status_code, 400)
+
+    def test_payment_of_a_single_visit(self):
+        response = self.pay("150", visit=self.newest)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["visit"] for row in response.data["allocations"]], [str(self.newest.id)])
+        self.assertEqual(self.state(self.newest), (Decimal("50"), 150))
+        self.assertEqual(self.state(self.oldest), (Decimal("300"), 0))
+        self.assertEqual(self.pay("1", visit=self.settled).status_code, 400)
+
+    def test_received_yen_add_up_to_the_rounded_payment(self):
+        customer = make_customer(self.store, "Fractions")
+        visits = [make_visit(customer, self.cast, DAY + datetime.timedelta(days=n), unpaid="0.50") for n in range(3)]
+        allocations = post_payment(customer.pk, Decimal("1.50"))
+        self.assertEqual([paid for _visit, paid in allocations], [Decimal("0.50")] * 3)
+        received = [VisitRecord.objects.get(pk=visit.pk).received_amount for visit in visits]
+        self.assertEqual(received, [0, 0, 2])
+        with self.assertRaises(PaymentError):
+            post_payment(customer.pk, Decimal("0.01"))
+
+    def test_visits_are_read_without_joins(self):
+        with CaptureQueriesContext(connection) as context, self.assertRaises(PaymentError):
+            post_payment(self.customer.pk, Decimal("5000"))
+        [select] = [query["sql"] for query in context.captured_queries if query["sql"].startswith("SELECT")]
+        self.assertNotIn("JOIN", select.upper())
+
+    def test_payments_require_access_to_the_customer(self):
+        outsider = make_user("outsider@example.com", CmsUser.Role.MANAGER)
+        make_staff(make_store("Other"), user=outsider)
+        url = f"/api/customers/{self.customer.id}/payments/"
+        response = client_for(outsider).post(url, {"amount": "10"}, format="json")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.state(self.oldest), (Decimal("300"), 0))
+
+
+class ReceivablesReportTests(TestCase):
+    as_of = datetime.date(2024, 3, 31)
+
+    def setUp(self):
+        self.store = make_store()
+        self.cast = make_staff(self.store)
+        self.alice = make_customer(self.store, "Alice")
+        self.bob = make_customer(self.store, "Bob")
+        for days, unpaid in ((0, "1"), (30, "10"), (31, "100"), (60, "1000"), (61, "10000")):
+            make_visit(self.alice, self.cast, self.as_of - datetime.timedelta(days=days), unpaid=unpaid)
+        make_visit(self.bob, self.cast, self.as_of, unpaid="5")
+        make_visit(self.bob, self.cast, self.as_of - datetime.timedelta(days=90))
+        other = make_store("Other")
+        make_visit(make_customer(other, "Carol"), make_staff(other), self.as_of, unpaid="7")
+        self.client = client_for(make_user("admin@example.com"))
+
+    def report(self, **params):
+        response = self.client.get("/api/visit-records/receivables/", {"as_of": self.as_of.isoformat(), **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data["results"]
+
+    def test_balances_are_aged_by_unpaid_date(self):
+        alice, bob = self.report(store=str(self.store.id))
+        self.assertEqual(alice["customer"], str(self.alice.id))
+        self.assertEqual(
+            (alice["balance"], alice["days_0_30"], alice["days_31_60"], alice["days_over_60"]),
+            ("11111.00", "11.00", "1100.00", "10000.00"),
+        )
+        self.assertEqual((alice["visit_count"], alice["oldest_unpaid_date"]), (5, "2024-01-30"))
+        # Bob's settled visit is not outstanding.
+        self.assertEqual((bob["balance"], bob["visit_count"], bob["days_0_30"]), ("5.00", 1, "5.00"))
+
+    def test_grouped_by_cast_and_across_stores(self):
+        by_cast = self.report(group="cast", store=str(self.store.id))
+        self.assertEqual([(row["cast"], row["balance"]) for row in by_cast], [(str(self.cast.id), "11116.00")])
+        self.assertEqual(len(self.report()), 3)
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({"group": "store"}, {"as_of": "yesterday"}, {"store": "nope"}):
+            response = self.client.get("/api/visit-records/receivables/", params)
+            self.assertEqual(response.status_code, 400, params)
+
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api.models import CmsUser, Store
+
+from .helpers import client_for, make_staff, make_store, make_user
+
+
+def names(response):
+    return [row["name"] for row in response.data["results"]]
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.store = make_store("Ginza")
+        self.client = client_for(make_user("admin@example.com"))
+
+    def test_entries_are_served_until_a_write_bumps_the_version(self):
+        self.assertEqual(names(self.client.get("/api/stores/")), ["Ginza"])
+        # A queryset update sends no signal, so the cached entry is still served.
+        Store.objects.filter(pk=self.store.pk).update(name="Shibuya")
+        self.assertEqual(names(self.client.get("/api/stores/")), ["Ginza"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f"/api/stores/{self.store.id}/", {"name": "Shinjuku"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(names(self.client.get("/api/stores/")), ["Shinjuku"])
+        self.assertEqual(self.client.get(f"/api/stores/{self.store.id}/").data["name"], "Shinjuku")
+
+    def test_entries_are_not_shared_between_scopes(self):
+        other = make_store("Shibuya")
+        ginza = make_user("ginza@example.com", CmsUser.Role.MANAGER)
+        shibuya = make_user("shibuya@example.com", CmsUser.Role.MANAGER)
+        make_staff(self.store, user=ginza)
+        make_staff(other, user=shibuya)
+
+        self.assertEqual(names(client_for(ginza).get("/api/stores/")), ["Ginza"])
+        self.assertEqual(names(client_for(shibuya).get("/api/stores/")), ["Shibuya"])
+        self.assertEqual(names(client_for(ginza).get("/api/stores/")), ["Ginza"])
+        self.assertEqual(client_for(shibuya).get(f"/api/stores/{self.store.id}/").status_code, 404)
+
+    def test_conditional_requests_are_answered_from_the_entry(self):
+        etag = self.client.get("/api/stores/")["ETag"]
+        response = self.client.get("/api/stores/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ResponseCacheDisabledTests(TestCase):
+    def test_reads_go_to_the_database(self):
+        cache.clear()
+        store = make_store("Ginza")
+        client = client_for(make_user("admin@example.com"))
+        self.assertEqual(names(client.get("/api/stores/")), ["Ginza"])
+        Store.objects.filter(pk=store.pk).update(name="Shibuya")
+        self.assertEqual(names(client.get("/api/stores/")), ["Shibuya"])
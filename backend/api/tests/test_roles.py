@@ -0,0 +1,91 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.auth import tokens_for_user
+from api.models import CmsUser, Customer
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user, make_visit
+
+
+class RolePermissionTests(TestCase):
+    def setUp(self):
+        self.store = make_store()
+        self.customer = make_customer(self.store, "Alice")
+        self.url = f"/api/customers/{self.customer.id}/"
+
+    def member(self, email, role):
+        user = make_user(email, role)
+        make_staff(self.store, user=user)
+        return user
+
+    def test_customer_writes_need_a_manager(self):
+        staff = client_for(self.member("staff@example.com", CmsUser.Role.STAFF))
+        self.assertEqual(staff.get(self.url).status_code, 200)
+        self.assertEqual(staff.patch(self.url, {"name": "Bob"}, format="json").status_code, 403)
+        self.assertEqual(staff.delete(self.url).status_code, 403)
+        self.assertEqual(staff.post("/api/customers/bulk/", [], format="json").status_code, 403)
+
+        manager = client_for(self.member("manager@example.com", CmsUser.Role.MANAGER))
+        self.assertEqual(manager.patch(self.url, {"name": "Bob"}, format="json").status_code, 200)
+
+    def test_role_change_applies_to_issued_tokens(self):
+        user = self.member("manager@example.com", CmsUser.Role.MANAGER)
+        client = client_for(user)
+        self.assertEqual(client.patch(self.url, {"name": "Bob"}, format="json").status_code, 200)
+        user.role = CmsUser.Role.CAST
+        user.save()
+        self.assertEqual(client.patch(self.url, {"name": "Carol"}, format="json").status_code, 403)
+
+    def test_membership_change_applies_to_issued_tokens(self):
+        user = self.member("manager@example.com", CmsUser.Role.MANAGER)
+        client = client_for(user)
+        self.assertEqual(client.get(self.url).status_code, 200)
+        staff = user.staff_members.get()
+        staff.store = make_store("Other")
+        staff.save()
+        self.assertEqual(client.get(self.url).status_code, 404)
+
+    def test_refresh_reissues_claims_from_the_database(self):
+        user = self.member("manager@example.com", CmsUser.Role.MANAGER)
+        refresh = tokens_for_user(user)
+        user.role = CmsUser.Role.STAFF
+        user.save()
+        response = APIClient().post("/api/auth/refresh/", {"refresh": str(refresh)}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["role"], CmsUser.Role.STAFF)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        self.assertEqual(client.patch(self.url, {"name": "Bob"}, format="json").status_code, 403)
+        self.assertEqual(Customer.objects.get(pk=self.customer.pk).name, "Alice")
+
+    def test_refresh_rejects_bad_tokens(self):
+        client = APIClient()
+        self.assertEqual(client.post("/api/auth/refresh/", {"refresh": "nope"}, format="json").status_code, 401)
+        user = self.member("gone@example.com", CmsUser.Role.MANAGER)
+        refresh = str(tokens_for_user(user))
+        user.delete()
+        self.assertEqual(client.post("/api/auth/refresh/", {"refresh": refresh}, format="json").status_code, 401)
+
+    def test_requests_without_a_token_are_rejected(self):
+        self.assertEqual(APIClient().get("/api/customers/").status_code, 401)
+
+
+class CastOverviewTests(TestCase):
+    def test_overview_shows_a_cast_only_their_own_visits(self):
+        store = make_store()
+        customer = make_customer(store, "Alice")
+        cast, colleague = make_staff(store), make_staff(store)
+        own = make_visit(customer, cast, memo="mine")
+        make_visit(customer, colleague, memo="secret-of-cast2")
+        client = client_for(cast.user)
+
+        detail = client.get(f"/api/customers/{customer.id}/overview/")
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual([visit["id"] for visit in detail.data["recent_visits"]], [str(own.id)])
+        listing = client.get("/api/customers/overview/")
+        self.assertEqual(listing.status_code, 200)
+        self.assertEqual([visit["id"] for visit in listing.data["results"][0]["recent_visits"]], [str(own.id)])
+
+        admin = client_for(make_user("admin@example.com"))
+        self.assertEqual(len(admin.get(f"/api/customers/{customer.id}/overview/").data["recent_visits"]), 2)
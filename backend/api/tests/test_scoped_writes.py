@@ -0,0 +1,109 @@
+import datetime
+
+from django.test import TestCase
+
+from api.models import CmsUser, Customer, DailySummary, VisitRecord
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user
+
+
+def customer_payload(store, name):
+    return {"store": str(store.id), "name": name, "first_visit": "2024-01-01", "contact_info": {}, "preferences": {}}
+
+
+def visit_payload(customer, cast):
+    return {
+        "customer": str(customer.id),
+        "cast": str(cast.id),
+        "visit_date": "2024-01-02",
+        "spending": "1000.00",
+        "payment_method": VisitRecord.PaymentMethod.CASH,
+        "entry_time": "2024-01-02T20:00:00Z",
+        "exit_time": "2024-01-02T22:00:00Z",
+        "accompanied": False,
+        "companions": "none",
+        "memo": "note",
+        "unpaid_amount": "0.00",
+        "received_amount": 1000,
+        "unpaid_date": "2024-01-02",
+        "receipt": False,
+    }
+
+
+class ManagerCrossStoreWriteTests(TestCase):
+    def setUp(self):
+        self.store_a = make_store("A")
+        self.store_b = make_store("B")
+        manager = make_user("manager@example.com", CmsUser.Role.MANAGER)
+        make_staff(self.store_a, user=manager)
+        self.client = client_for(manager)
+
+    def test_customer_cannot_be_created_in_or_moved_to_another_store(self):
+        response = self.client.post("/api/customers/", customer_payload(self.store_b, "Bob"), format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data), {"store"})
+
+        customer = make_customer(self.store_a)
+        response = self.client.patch(f"/api/customers/{customer.id}/", {"store": str(self.store_b.id)}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Customer.objects.filter(store=self.store_b).exists())
+
+    def test_bulk_rejects_rows_for_another_store(self):
+        rows = [customer_payload(self.store_a, "Own"), customer_payload(self.store_b, "Foreign")]
+        response = self.client.post("/api/customers/bulk/", rows, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.data["errors"]], [1])
+        self.assertFalse(Customer.objects.exists())
+
+    def test_daily_summary_writes_are_limited_to_own_stores(self):
+        response = self.client.post(
+            "/api/daily-summaries/upsert/",
+            {"store": str(self.store_b.id), "report_date": "2024-01-01", "total_expenses": "100"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post(
+            "/api/daily-summaries/",
+            {"store": str(self.store_b.id), "report_date": "2024-01-01", "total_expenses": "100", "notes": ""},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(DailySummary.objects.exists())
+
+    def test_own_store_writes_succeed(self):
+        response = self.client.post(
+            "/api/daily-summaries/upsert/",
+            {"store": str(self.store_a.id), "report_date": datetime.date(2024, 1, 1).isoformat(), "total_expenses": "100"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class CastVisitWriteTests(TestCase):
+    def setUp(self):
+        self.store_a = make_store("A")
+        self.store_b = make_store("B")
+        self.cast = make_staff(self.store_a)
+        self.colleague = make_staff(self.store_a)
+        self.customer = make_customer(self.store_a)
+        self.client = client_for(self.cast.user)
+
+    def test_cast_records_own_visit(self):
+        response = self.client.post("/api/visit-records/", visit_payload(self.customer, self.cast), format="json")
+        self.assertEqual(response.status_code, 201)
+
+    def test_cast_cannot_record_a_colleagues_visit(self):
+        response = self.client.post("/api/visit-records/", visit_payload(self.customer, self.colleague), format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cast", response.data)
+        self.assertFalse(VisitRecord.objects.exists())
+
+    def test_cast_cannot_record_a_visit_for_another_stores_customer(self):
+        foreign = make_customer(self.store_b)
+        response = self.client.post("/api/visit-records/", visit_payload(foreign, self.cast), format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("customer", response.data)
+
+        response = self.client.post("/api/visit-records/bulk/", [visit_payload(foreign, self.cast)], format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(VisitRecord.objects.exists())
@@ -0,0 +1,112 @@
+import itertools
+
+from django.test import SimpleTestCase, TestCase
+
+from api.models import CmsUser, Customer
+from api.search import TrigramIndex, candidate_filter, normalize, search_customers
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user
+
+
+class NormalizeTests(SimpleTestCase):
+    def test_widths_and_case_are_folded(self):
+        self.assertEqual(normalize("ＡＢＣ１２３"), "abc123")
+        self.assertEqual(normalize("Tanaka"), "tanaka")
+
+    def test_kana_is_folded_to_hiragana(self):
+        self.assertEqual(normalize("ﾔﾏﾀﾞ"), "やまだ")
+        self.assertEqual(normalize("ヤマダ"), "やまだ")
+        self.assertEqual(normalize("やまだ"), "やまだ")
+
+    def test_variant_kanji_are_folded(self):
+        self.assertEqual(normalize("髙橋"), "高橋")
+        self.assertEqual(normalize("山﨑"), normalize("山崎"))
+        self.assertEqual(normalize("渡邊"), normalize("渡辺"))
+
+    def test_separators_are_removed(self):
+        self.assertEqual(normalize("090-1234-5678"), "09012345678")
+        self.assertEqual(normalize("(03) 1234・5678"), "0312345678")
+
+
+class TrigramIndexTests(SimpleTestCase):
+    rows = [
+        (1, "tanaka", "tanaka 09012345678"),
+        (2, "tanabe", "tanabe"),
+        (3, "suzuki", "suzuki tanakasangyo"),
+        (4, "sato", "sato"),
+    ]
+
+    def test_substring_and_misspelt_matches_are_ranked(self):
+        ranked = TrigramIndex(self.rows).search("tanaka", 10)
+        self.assertEqual([pk for pk, _rank in ranked], [1, 3])
+        self.assertGreater(ranked[0][1], ranked[1][1])
+        # Misspelt: most of the query's trigrams are in a word of rows 1 and 3.
+        self.assertEqual([pk for pk, _rank in TrigramIndex(self.rows).search("tanakq", 10)], [1, 3])
+
+    def test_short_queries_match_by_substring_only(self):
+        # Equal word scores; the closer (then alphabetically first) name wins.
+        self.assertEqual([pk for pk, _rank in TrigramIndex(self.rows).search("ta", 10)], [2, 1, 3])
+        self.assertEqual(TrigramIndex(self.rows).search("zz", 10), [])
+
+    def test_limit(self):
+        self.assertEqual(len(TrigramIndex(self.rows).search("ta", 2)), 2)
+
+
+class SearchCustomersTests(TestCase):
+    def setUp(self):
+        self.store = make_store()
+        self.yamada = make_customer(self.store, "山田 太郎", contact_info={"phone": "090-1234-5678"})
+        self.takahashi = make_customer(self.store, "髙橋 花子")
+        self.yamamoto = make_customer(self.store, "山本 一郎")
+        make_customer(make_store("Other"), "山田 次郎")
+
+    def names(self, text, limit=10):
+        return [customer.name for customer in search_customers(Customer.objects.filter(store=self.store), text, limit)]
+
+    def test_matches_across_widths_kana_and_variants(self):
+        self.assertEqual(self.names("高橋"), ["髙橋 花子"])
+        self.assertEqual(self.names("09012345678"), ["山田 太郎"])
+        self.assertEqual(self.names("０９０‐１２３４"), ["山田 太郎"])
+        self.assertEqual(self.names("山田太郎"), ["山田 太郎"])
+
+    def test_results_are_ranked_and_scoped(self):
+        results = search_customers(Customer.objects.filter(store=self.store), "山", 10)
+        self.assertEqual([customer.name for customer in results], ["山本 一郎", "山田 太郎"])
+        self.assertEqual(len({customer.search_rank for customer in results}), 1)
+        self.assertEqual(self.names("山田太朗"), ["山田 太郎"])
+        self.assertEqual(self.names(" - "), [])
+
+    def test_prefilter_keeps_every_match(self):
+        words = ["やまだ", "やまもと", "たなか", "たかはし", "やまだや", "だまや", "まだ"]
+        Customer.objects.bulk_create([
+            Customer(
+                store=self.store, name=first, first_visit="2024-01-01", contact_info={}, preferences={},
+                search_name=first, search_document=f"{first} {second}",
+            )
+            for first, second in itertools.permutations(words, 2)
+        ])
+        queryset = Customer.objects.filter(store=self.store)
+        rows = list(queryset.values_list("pk", "search_name", "search_document"))
+        for query in ["やまだ", "やまだあ", "やまもど", "たかはしい", "まだ", "や", "だまやま"]:
+            everything = TrigramIndex(rows).search(query, len(rows))
+            candidates = queryset.filter(candidate_filter(query))
+            prefiltered = TrigramIndex(candidates.values_list("pk", "search_name", "search_document"))
+            self.assertTrue(everything, query)
+            self.assertLess(candidates.count(), len(rows), query)
+            self.assertEqual(prefiltered.search(query, len(rows)), everything, query)
+
+
+class SearchEndpointTests(TestCase):
+    def test_cast_searches_only_their_stores(self):
+        store = make_store()
+        cast = make_user("cast@example.com", CmsUser.Role.CAST)
+        make_staff(store, user=cast)
+        make_customer(store, "田中 一郎")
+        make_customer(make_store("Other"), "田中 二郎")
+        response = client_for(cast).get("/api/customers/search/", {"q": "ﾀﾅｶ"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"], [])
+        response = client_for(cast).get("/api/customers/search/", {"q": "田中"})
+        self.assertEqual([row["name"] for row in response.data["results"]], ["田中 一郎"])
+        self.assertIn("rank", response.data["results"][0])
+        self.assertEqual(client_for(cast).get("/api/customers/search/").status_code, 400)
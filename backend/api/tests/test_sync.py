@@ -0,0 +1,78 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import CmsUser, Customer, Tombstone
+from api.views import CustomerViewSet, VisitRecordViewSet
+
+from .helpers import client_for, make_customer, make_staff, make_store, make_user, make_visit
+
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.store = make_store("A")
+        self.other = make_store("B")
+        self.admin = client_for(make_user("admin@example.com"))
+        manager = make_user("manager@example.com", CmsUser.Role.MANAGER)
+        make_staff(self.store, user=manager)
+        self.manager = client_for(manager)
+
+    def changes(self, client, resource, since=None):
+        response = client.get(f"/api/{resource}/changes/", {"since": since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_changes_and_deletions_since_the_watermark(self):
+        kept = make_customer(self.store, "Kept")
+        gone = make_customer(self.store, "Gone")
+        watermark = self.changes(self.admin, "customers")["watermark"]
+        gone_id = str(gone.id)
+        gone.delete()
+        kept.name = "Renamed"
+        kept.save()
+
+        data = self.changes(self.admin, "customers", watermark)
+        self.assertIn(str(kept.id), [row["id"] for row in data["changed"]])
+        self.assertEqual(data["deleted"], [gone_id])
+        self.assertFalse(data["has_more"])
+
+    def test_row_committed_after_the_watermark_with_an_older_stamp_is_not_lost(self):
+        watermark = self.changes(self.admin, "customers")["watermark"]
+        customer = make_customer(self.store, "Slow import")
+        # A long transaction stamps updated_at well before it commits.
+        Customer.objects.filter(pk=customer.pk).update(updated_at=timezone.now() - datetime.timedelta(seconds=60))
+        data = self.changes(self.admin, "customers", watermark)
+        self.assertIn(str(customer.id), [row["id"] for row in data["changed"]])
+
+    def test_deletions_are_scoped_to_the_callers_stores(self):
+        watermark = self.changes(self.manager, "customers")["watermark"]
+        own = make_customer(self.store, "Own")
+        foreign = make_customer(self.other, "Foreign")
+        own_id, foreign_id = str(own.id), str(foreign.id)
+        own.delete()
+        foreign.delete()
+
+        self.assertEqual(self.changes(self.manager, "customers", watermark)["deleted"], [own_id])
+        admin_deleted = self.changes(self.admin, "customers", watermark)["deleted"]
+        self.assertEqual(sorted(admin_deleted), sorted([own_id, foreign_id]))
+
+    def test_cascaded_visit_deletions_record_the_customers_store(self):
+        cast = make_staff(self.store)
+        other_cast = make_staff(self.store)
+        customer = make_customer(self.store)
+        mine = make_visit(customer, cast)
+        make_visit(customer, other_cast)
+        cast_client = client_for(cast.user)
+        watermark = self.changes(cast_client, "visit-records")["watermark"]
+
+        customer.delete()
+
+        tombstones = Tombstone.objects.filter(resource="api.visitrecord")
+        self.assertEqual({tombstone.store_id for tombstone in tombstones}, {self.store.id})
+        self.assertEqual(self.changes(cast_client, "visit-records", watermark)["deleted"], [str(mine.id)])
+        self.assertEqual(len(self.changes(self.manager, "visit-records", watermark)["deleted"]), 2)
+
+    def test_changes_read_from_the_primary(self):
+        self.assertNotIn("changes", CustomerViewSet.replica_actions)
+        self.assertNotIn("changes", VisitRecordViewSet.replica_actions)
@@ -1,6 +1,5 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
 
 from . import views
 
@@ -15,10 +14,11 @@ router.register(r"customer-details", views.CustomerDetailViewSet, basename="cust
 router.register(r"customer-preferences", views.CustomerPreferenceViewSet, basename="customer-preference")
 router.register(r"performance-targets", views.PerformanceTargetViewSet, basename="performance-target")
 router.register(r"daily-summaries", views.DailySummaryViewSet, basename="daily-summary")
+router.register(r"daily-payment-totals", views.DailyPaymentTotalViewSet, basename="daily-payment-total")
 
 urlpatterns = [
     path("", views.api_home),
     path("auth/login/", views.jwt_login),
-    path("auth/refresh/", TokenRefreshView.as_view()),
+    path("auth/refresh/", views.jwt_refresh),
     path("", include(router.urls)),
 ]
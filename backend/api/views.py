@@ -1,37 +1,74 @@
-from django.contrib.auth.hashers import check_password
-from rest_framework import status, viewsets
-from rest_framework.decorators import api_view
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Prefetch
+from django.utils import timezone
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .auth import CmsUserAuth
+from . import login, performance, receivables, rollups, search, sync
+from .auth import tokens_for_user
+from .bulk import BulkWriteMixin
+from .conditional import ConditionalGetMixin
+from .db_routers import ReplicaReadMixin
+from .customer_stats import recompute_customer_stats
+from .exports import ExportMixin
+from .fast_serializers import FastListMixin
+from .fieldsets import SparseFieldsetFilter
+from .filters import (
+    CustomerFilterBackend,
+    DailySummaryFilterBackend,
+    VisitRecordFilterBackend,
+    parse_date_param,
+    parse_uuid_param,
+)
+from .imports import ImportMixin
 from .models import (
     CmsUser,
     Customer,
     CustomerDetail,
     CustomerPreference,
     CustomerProfile,
+    DailyPaymentTotal,
     DailySummary,
     PerformanceTarget,
     StaffMember,
     Store,
     VisitRecord,
 )
+from .permissions import (
+    ADMIN_ROLES,
+    MANAGER_ROLES,
+    STAFF_ROLES,
+    ScopedQuerysetMixin,
+    check_store_access,
+    scope_rows,
+)
+from .response_cache import CachedResponseMixin
 from .serializers import (
     CustomerDetailSerializer,
     CustomerPreferenceSerializer,
     CustomerProfileSerializer,
+    CustomerOverviewSerializer,
     CustomerSerializer,
+    DailyPaymentTotalSerializer,
     DailySummarySerializer,
+    DailySummaryUpsertSerializer,
+    PaymentSerializer,
     PerformanceTargetSerializer,
     StaffMemberSerializer,
     StoreSerializer,
     UserSerializer,
     VisitRecordSerializer,
 )
+from .sync import SyncMixin
 
 
 @api_view(["GET"])
+@permission_classes([AllowAny])
 def api_home(request):
     return Response({
         "message": "Django API is working!",
@@ -40,84 +77,368 @@ def api_home(request):
     })
 
 
-class StoreViewSet(viewsets.ModelViewSet):
-    """CRUD for stores."""
+class StoreViewSet(ScopedQuerysetMixin, CachedResponseMixin, ConditionalGetMixin, SyncMixin, viewsets.ModelViewSet):
+    """
+    CRUD for stores. List/retrieve responses are cached (see api.response_cache).
+    Non-admins see only the stores they are staff of; only Admins write.
+    """
     queryset = Store.objects.all()
     serializer_class = StoreSerializer
+    ordering = ("created_at", "id")
+    store_scope = "pk"
+    write_roles = ADMIN_ROLES
 
 
-class UserViewSet(viewsets.ModelViewSet):
-    """CRUD for users (CmsUser). Passwords are hashed; never stored or returned in plain text."""
+class UserViewSet(CachedResponseMixin, ConditionalGetMixin, SyncMixin, viewsets.ModelViewSet):
+    """
+    CRUD for users (CmsUser). Passwords are hashed; never stored or returned in plain text.
+    List/retrieve responses are cached (see api.response_cache). Managers read, Admins write.
+    """
     queryset = CmsUser.objects.all()
     serializer_class = UserSerializer
+    ordering = ("email",)
+    read_roles = MANAGER_ROLES
+    write_roles = ADMIN_ROLES
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
-    """CRUD for the `customers` table only. Profile/detail/preferences are separate."""
+class CustomerViewSet(
+    ScopedQuerysetMixin,
+    ReplicaReadMixin, ConditionalGetMixin, FastListMixin, BulkWriteMixin, ExportMixin, ImportMixin, SyncMixin,
+    viewsets.ModelViewSet,
+):
+    """
+    CRUD for the `customers` table only. Profile/detail/preferences are separate.
+    List filters: see CustomerFilterBackend; `?ordering=` accepts ordering_fields.
+    Batch writes: `/customers/bulk/` (see api.bulk). Lists use the fast path in api.fast_serializers.
+    Streaming export: `/customers/export/?output=csv|ndjson` (see api.exports).
+    CSV import: POST a `file` to `/customers/import/` (see api.imports).
+    Customer 360: `/customers/overview/` (filtered, paginated) and `/customers/{id}/overview/`
+    return profile, detail, preference and the latest `?visits=` visits (a Cast's own only) in two queries.
+    Search: `/customers/search/?q=` by name, contact, company or hobby (see api.search).
+    Reads listed in `replica_actions` may be served by a read replica (see api.db_routers).
+    Non-admins see only the customers of their stores. Managers and Admins write; Staff may post payments.
+    """
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
-
-
-class StaffMemberViewSet(viewsets.ModelViewSet):
-    """CRUD for the `staff_members` table."""
+    filter_backends = [CustomerFilterBackend, filters.OrderingFilter, SparseFieldsetFilter]
+    ordering_fields = ["name", "first_visit", "total_spend", "created_at"]
+    ordering = ("-created_at", "-id")
+    import_kind = "customers"
+    overview_actions = ("overview", "overview_list")
+    replica_actions = ReplicaReadMixin.replica_actions + overview_actions + ("search",)
+    store_scope = "store"
+    write_roles = MANAGER_ROLES
+    action_roles = {"bulk": MANAGER_ROLES, "export": MANAGER_ROLES, "import_csv": MANAGER_ROLES, "payments": STAFF_ROLES}
+
+    def get_overview_visit_limit(self):
+        default = getattr(settings, "CUSTOMER_OVERVIEW_VISITS", 5)
+        maximum = getattr(settings, "CUSTOMER_OVERVIEW_MAX_VISITS", 50)
+        try:
+            limit = int(self.request.query_params.get("visits", default))
+        except ValueError:
+            limit = default
+        return max(0, min(limit, maximum))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in self.overview_actions:
+            # The customers are already store-scoped; Casts must also see only their own visits,
+            # as in VisitRecordViewSet.
+            recent_visits = scope_rows(VisitRecord.objects.all(), self.request.user, cast_scope="cast")
+            recent_visits = recent_visits.order_by("-visit_date", "-entry_time")[: self.get_overview_visit_limit()]
+            queryset = queryset.select_related("profile", "detail", "preference").prefetch_related(
+                Prefetch("visit_records", queryset=recent_visits, to_attr="recent_visits")
+            )
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action in self.overview_actions:
+            return CustomerOverviewSerializer
+        return super().get_serializer_class()
+
+    def after_bulk_write(self, created=(), updated=(), previous=None):
+        search.refresh_search_documents({customer.pk for customer in [*created, *updated]})
+
+    @action(detail=False)
+    def search(self, request):
+        """
+        Customers matching `?q=` (partial, fuzzy, kana-insensitive), best first, with
+        their `rank`; at most `?limit=` results. Honours the list filters.
+        """
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            return Response({"q": ["This query parameter is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        default = getattr(settings, "CUSTOMER_SEARCH_LIMIT", 20)
+        maximum = getattr(settings, "CUSTOMER_SEARCH_MAX_LIMIT", 100)
+        try:
+            limit = int(request.query_params.get("limit", default))
+        except ValueError:
+            limit = default
+        limit = max(1, min(limit, maximum))
+        customers = search.search_customers(self.filter_queryset(self.get_queryset()), text, limit)
+        results = self.get_serializer(customers, many=True).data
+        for row, customer in zip(results, customers):
+            row["rank"] = round(customer.search_rank, 4)
+        return Response({"q": text, "results": results})
+
+    @action(detail=False, url_path="overview", url_name="overview-list")
+    def overview_list(self, request):
+        return self.list(request)
+
+    @action(detail=True)
+    def overview(self, request, pk=None):
+        return self.retrieve(request, pk=pk)
+
+    @action(detail=True, methods=["post"])
+    def payments(self, request, pk=None):
+        """Post a payment against the customer's unpaid visits (see api.receivables.post_payment)."""
+        customer = self.get_object()
+        serializer = PaymentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            applied = receivables.post_payment(
+                customer.pk,
+                serializer.validated_data["amount"],
+                visit_id=serializer.validated_data.get("visit"),
+            )
+        except receivables.PaymentError as exc:
+            return Response({"amount": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        customer.refresh_from_db(fields=["unpaid_balance"])
+        return Response({
+            "customer": str(customer.pk),
+            "amount": str(serializer.validated_data["amount"]),
+            "unpaid_balance": str(customer.unpaid_balance),
+            "allocations": [
+                {"visit": str(visit.pk), "applied": str(paid), "unpaid_amount": str(visit.unpaid_amount)}
+                for visit, paid in applied
+            ],
+        })
+
+
+class StaffMemberViewSet(
+    ScopedQuerysetMixin, ReplicaReadMixin, ConditionalGetMixin, SyncMixin, viewsets.ModelViewSet
+):
+    """
+    CRUD for the `staff_members` table. Managers write. Casts see only their own
+    rows, other non-admins the staff of their stores.
+    """
 
     queryset = StaffMember.objects.all()
     serializer_class = StaffMemberSerializer
+    ordering = ("created_at", "id")
+    store_scope = "store"
+    cast_scope = "pk"
+    write_roles = MANAGER_ROLES
 
 
-class VisitRecordViewSet(viewsets.ModelViewSet):
-    """CRUD for the `visit_records` table."""
+class VisitRecordViewSet(
+    ScopedQuerysetMixin,
+    ReplicaReadMixin, ConditionalGetMixin, FastListMixin, BulkWriteMixin, ExportMixin, ImportMixin, SyncMixin,
+    viewsets.ModelViewSet,
+):
+    """
+    CRUD for the `visit_records` table.
+    List filters: see VisitRecordFilterBackend; `?ordering=` accepts ordering_fields.
+    Batch writes: `/visit-records/bulk/` (see api.bulk). Lists use the fast path in api.fast_serializers.
+    Streaming export: `/visit-records/export/?output=csv|ndjson&store=&date_from=&date_to=`.
+    CSV import of historical visits: POST a `file` to `/visit-records/import/` (see api.imports).
+    Reads listed in `replica_actions` may be served by a read replica (see api.db_routers).
+    Casts see only their own visits, other non-admins the visits of their stores.
+    """
 
     queryset = VisitRecord.objects.all()
     serializer_class = VisitRecordSerializer
-
-
-class CustomerProfileViewSet(viewsets.ModelViewSet):
+    filter_backends = [VisitRecordFilterBackend, filters.OrderingFilter, SparseFieldsetFilter]
+    ordering_fields = ["visit_date", "entry_time", "spending", "unpaid_amount", "created_at"]
+    ordering = ("-created_at", "-id")
+    import_kind = "visits"
+    replica_actions = ReplicaReadMixin.replica_actions + ("receivables",)
+    store_scope = "customer__store"
+    cast_scope = "cast"
+    action_roles = {
+        "bulk": STAFF_ROLES,
+        "export": MANAGER_ROLES,
+        "import_csv": MANAGER_ROLES,
+        "receivables": MANAGER_ROLES,
+    }
+
+    @action(detail=False)
+    def receivables(self, request):
+        """
+        Outstanding balances grouped by `?group=customer|cast` (default customer),
+        optionally for `?store=`, aged as of `?as_of=` (default today).
+        """
+        group = request.query_params.get("group", "customer")
+        if group not in receivables.GROUPS:
+            return Response(
+                {"group": [f"Must be one of: {', '.join(receivables.GROUPS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        as_of = parse_date_param(request, "as_of") or timezone.localdate()
+        store = parse_uuid_param(request, "store")
+        check_store_access(request.user, store)
+        return Response({
+            "group": group,
+            "as_of": as_of.isoformat(),
+            "results": receivables.receivable_balances(group, as_of, store_id=store),
+        })
+
+    def after_bulk_write(self, created=(), updated=(), previous=None, deleted=()):
+        # bulk_create/bulk_update and perform_bulk_destroy skip the signals that
+        # maintain customer stats, daily rollups and sync tombstones, so
+        # refresh them for the touched rows.
+        visits = [*created, *updated, *(previous or {}).values(), *deleted]
+        customer_ids = {visit.customer_id for visit in visits}
+        store_by_customer = dict(Customer.objects.filter(pk__in=customer_ids).values_list("pk", "store_id"))
+        recompute_customer_stats(Customer.objects.filter(pk__in=customer_ids))
+        for visit in visits:
+            rollups.mark_day_dirty(store_by_customer.get(visit.customer_id), visit.visit_date)
+        performance.invalidate_casts({visit.cast_id for visit in visits})
+        if deleted:
+            sync.record_deletions(
+                VisitRecord, [(visit.pk, store_by_customer.get(visit.customer_id), visit.cast_id) for visit in deleted]
+            )
+
+    def perform_bulk_destroy(self, queryset):
+        # Nothing references a visit, so the batch is deleted with one statement
+        # rather than by QuerySet.delete(), whose post_delete handlers
+        # (api.signals) write to the customer and the tombstones once per row.
+        visits = queryset.select_for_update()
+        deleted = list(visits.only("customer_id", "cast_id", "visit_date"))
+        if not deleted:
+            return 0
+        count = VisitRecord.objects.filter(pk__in=[visit.pk for visit in deleted])._raw_delete(visits.db)
+        self.after_bulk_write(deleted=deleted)
+        return count
+
+
+class CustomerProfileViewSet(ScopedQuerysetMixin, ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """CRUD for the `customers_profile` table (one-to-one with Customer). Lookup by customer UUID."""
 
     queryset = CustomerProfile.objects.all()
     serializer_class = CustomerProfileSerializer
     lookup_url_kwarg = "customer_id"
     lookup_field = "customer"
+    ordering = ("customer_id",)
+    store_scope = "customer__store"
 
 
-class CustomerDetailViewSet(viewsets.ModelViewSet):
+class CustomerDetailViewSet(ScopedQuerysetMixin, ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """CRUD for the `customers_detail` table (one-to-one with Customer). Lookup by customer UUID."""
 
     queryset = CustomerDetail.objects.all()
     serializer_class = CustomerDetailSerializer
     lookup_url_kwarg = "customer_id"
     lookup_field = "customer"
+    ordering = ("customer_id",)
+    store_scope = "customer__store"
 
 
-class CustomerPreferenceViewSet(viewsets.ModelViewSet):
+class CustomerPreferenceViewSet(ScopedQuerysetMixin, ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """CRUD for the `customer_preferences` table (one-to-one with Customer). Lookup by customer UUID."""
 
     queryset = CustomerPreference.objects.all()
     serializer_class = CustomerPreferenceSerializer
     lookup_url_kwarg = "customer_id"
     lookup_field = "customer"
+    ordering = ("customer_id",)
+    store_scope = "customer__store"
 
 
-class PerformanceTargetViewSet(viewsets.ModelViewSet):
-    """CRUD for the `performance_targets` table."""
+class PerformanceTargetViewSet(ScopedQuerysetMixin, ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
+    """
+    CRUD for the `performance_targets` table. Casts see their own targets, other
+    non-admins those of their stores; Managers write and see the dashboard.
+    """
 
     queryset = PerformanceTarget.objects.all()
     serializer_class = PerformanceTargetSerializer
-
-
-class DailySummaryViewSet(viewsets.ModelViewSet):
-    """CRUD for the `daily_summaries` table."""
+    ordering = ("-target_date", "id")
+    replica_actions = ReplicaReadMixin.replica_actions + ("dashboard",)
+    store_scope = "staff__store"
+    cast_scope = "staff"
+    write_roles = MANAGER_ROLES
+    action_roles = {"dashboard": MANAGER_ROLES}
+
+    @action(detail=False)
+    def dashboard(self, request):
+        """
+        Per-cast spending vs. target for `?store=` over `?date_from=` / `?date_to=`
+        (default: the current month). See api.performance.
+        """
+        store = parse_uuid_param(request, "store")
+        if store is None:
+            return Response({"store": ["This query parameter is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        check_store_access(request.user, store)
+        default_from, default_to = performance.current_month()
+        date_from = parse_date_param(request, "date_from") or default_from
+        date_to = parse_date_param(request, "date_to") or default_to
+        if date_from > date_to:
+            return Response({"date_to": ["Must not be before date_from."]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "store": str(store),
+            "date_from": date_from.isoformat(),
+            "date_to": date_to.isoformat(),
+            "results": performance.cast_performance(store, date_from, date_to),
+        })
+
+
+class DailySummaryViewSet(
+    ScopedQuerysetMixin, ReplicaReadMixin, ConditionalGetMixin, ExportMixin, SyncMixin, viewsets.ModelViewSet
+):
+    """CRUD for the `daily_summaries` table. Managers only, limited to their stores."""
 
     queryset = DailySummary.objects.all()
     serializer_class = DailySummarySerializer
+    filter_backends = [DailySummaryFilterBackend, SparseFieldsetFilter]
+    ordering = ("-report_date", "id")
+    store_scope = "store"
+    read_roles = MANAGER_ROLES
+    write_roles = MANAGER_ROLES
+
+    @action(detail=False, methods=["post"])
+    def upsert(self, request):
+        """
+        Create or update the summary for (store, report_date) in one statement.
+        Body: { "store", "report_date", and any of "total_expenses", "notes" }.
+        Omitted fields keep their stored values; sales and labor are computed.
+        """
+        serializer = DailySummaryUpsertSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        values = dict(serializer.validated_data)
+        store_id = values.pop("store")
+        report_date = values.pop("report_date")
+        check_store_access(request.user, store_id)
+        try:
+            summary = DailySummary.objects.upsert(store_id, report_date, **values)
+        except IntegrityError:
+            return Response(
+                {"store": ["Store not found"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(DailySummarySerializer(summary).data)
+
+
+class DailyPaymentTotalViewSet(ScopedQuerysetMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only per-store, per-day sales by payment method (maintained by api.rollups).
+    Managers only, limited to their stores.
+    """
+
+    queryset = DailyPaymentTotal.objects.all()
+    serializer_class = DailyPaymentTotalSerializer
+    ordering = ("-report_date", "id")
+    store_scope = "store"
+    read_roles = MANAGER_ROLES
 
 
 @api_view(["POST"])
+@permission_classes([AllowAny])
 def jwt_login(request):
     """
     Authenticate by email + password; return access and refresh JWT.
     Body: { "email": "...", "password": "..." }
+    Repeated failures per client IP or per account are throttled with 429 (see api.login).
     """
     email = request.data.get("email")
     password = request.data.get("password")
@@ -127,19 +448,19 @@ def jwt_login(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
     try:
-        user = CmsUser.objects.get(email=email)
-    except CmsUser.DoesNotExist:
+        user = login.authenticate(email, password, login.client_ip(request))
+    except login.LoginThrottled as exc:
         return Response(
-            {"detail": "Invalid email or password"},
-            status=status.HTTP_401_UNAUTHORIZED,
+            {"detail": "Too many failed login attempts; try again later."},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(exc.retry_after)},
         )
-    if not check_password(password, user.password_hash):
+    if user is None:
         return Response(
             {"detail": "Invalid email or password"},
             status=status.HTTP_401_UNAUTHORIZED,
         )
-    wrapper = CmsUserAuth(user)
-    refresh = RefreshToken.for_user(wrapper)
+    refresh = tokens_for_user(user)
     return Response({
         "access": str(refresh.access_token),
         "refresh": str(refresh),
@@ -147,4 +468,32 @@ def jwt_login(request):
         "username": user.username or "",
         "email": user.email,
         "role": user.role,
-    })
\ No newline at end of file
+    })
+
+
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def jwt_refresh(request):
+    """
+    Exchange a refresh JWT for a new access JWT.
+    Body: { "refresh": "..." }
+    Unlike simplejwt's TokenRefreshView, which copies the refresh token's claims,
+    the new token's claims are read from the stored user, so a changed role or
+    email shows up at the next refresh. 401 if the token is invalid or the user is gone.
+    """
+    token = request.data.get("refresh")
+    if not token:
+        return Response({"detail": "refresh required"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        user_id = RefreshToken(token).get("user_id")
+    except TokenError:
+        user_id = None
+    user = CmsUser.objects.filter(pk=user_id).first() if user_id else None
+    if user is None:
+        return Response(
+            {"detail": "Refresh token is invalid or expired"},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    access = tokens_for_user(user).access_token
+    return Response({"access": str(access), "role": user.role})
\ No newline at end of file
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # Add this at the top
+    'api.db_routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,8 +81,100 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "api.auth.CmsUserJWTAuthentication",
     ],
+    # Role checks from the token's claims; viewsets set read_roles / write_roles (api/permissions.py)
+    "DEFAULT_PERMISSION_CLASSES": [
+        "api.permissions.RolePermission",
+    ],
+    # Keyset pagination on every list endpoint; see api/pagination.py
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.KeysetCursorPagination",
+    "PAGE_SIZE": 50,
+    # ?fields= / ?omit= column pruning on read requests; see api/fieldsets.py
+    "DEFAULT_FILTER_BACKENDS": ["api.fieldsets.SparseFieldsetFilter"],
 }
 
+# Upper bound for the `?page_size=` query parameter on list endpoints
+API_MAX_PAGE_SIZE = 500
+
+# Upper bound for rows per request on `/bulk/` endpoints (api/bulk.py)
+API_MAX_BULK_SIZE = 1000
+
+# Opt in to serving lists of views using FastListMixin from .values() rows (api/fast_serializers.py)
+API_FAST_LIST_SERIALIZATION = False
+
+# Rows fetched per server-side cursor round trip by `/<resource>/export/` (api/exports.py)
+API_EXPORT_CHUNK_SIZE = 2000
+
+# Rows per transaction, and rejected rows listed in the report, for CSV imports (api/imports.py)
+API_IMPORT_BATCH_SIZE = 1000
+API_IMPORT_MAX_REJECTS = 1000
+
+# Caches: Redis when REDIS_URL is set (shared by all workers, so invalidation
+# reaches every process), otherwise a per-process in-memory cache.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "cms-default",
+        },
+    }
+
+# Cached list/retrieve responses for stores and users (api/response_cache.py).
+# Only on with a shared cache: a write must retire the entries of every worker.
+RESPONSE_CACHE_ENABLED = bool(os.environ.get("REDIS_URL"))
+RESPONSE_CACHE = "default"
+RESPONSE_CACHE_TTL = 600  # seconds; entries are also retired on every write
+
+# Delta sync `/<resource>/changes/` (api/sync.py): rows per response, how far
+# the watermark trails the clock, and how long deletions are remembered. The
+# overlap must exceed the longest write transaction on a synced table (CSV
+# import batches and bulk requests included): rows are stamped when written
+# but only become visible when their transaction commits.
+SYNC_MAX_CHANGES = 1000
+SYNC_WATERMARK_OVERLAP = 300  # seconds
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+# Cache alias and TTL (seconds) for `/performance-targets/dashboard/` (api/performance.py);
+# None (no shared cache) computes every request
+PERFORMANCE_DASHBOARD_CACHE = "default" if os.environ.get("REDIS_URL") else None
+PERFORMANCE_DASHBOARD_CACHE_TTL = 300
+
+# Read replicas (api/db_routers.py): how long a client reads from the primary
+# after a write, and the longest a result read from a replica is cached
+DATABASE_REPLICA_PIN_SECONDS = 5
+DATABASE_REPLICA_CACHE_TTL = 10
+
+# Recent visits embedded per customer by `/customers/.../overview/` (`?visits=`)
+CUSTOMER_OVERVIEW_VISITS = 5
+CUSTOMER_OVERVIEW_MAX_VISITS = 50
+
+# Default and maximum `?limit=` of `/customers/search/` (api/search.py)
+CUSTOMER_SEARCH_LIMIT = 20
+CUSTOMER_SEARCH_MAX_LIMIT = 100
+
+# Cache of resolved CmsUsers and their store memberships for JWT authentication (api/auth.py)
+CMS_AUTH_USER_CACHE_TTL = 60  # seconds; 0 disables the per-process cache
+CMS_AUTH_USER_CACHE_SIZE = 1024
+CMS_AUTH_USER_SHARED_CACHE = None  # a CACHES alias to share entries across processes
+
+# Login (api/login.py): hasher for CmsUser passwords (a PASSWORD_HASHERS
+# algorithm, e.g. "argon2" with argon2-cffi installed; "default" = the first
+# entry); existing hashes are upgraded on the next successful login
+CMS_PASSWORD_HASHER = "default"
+# Failed logins allowed per client IP and per account in each window, counted
+# in a cache shared by all workers
+LOGIN_THROTTLE_CACHE = "default"
+LOGIN_THROTTLE_WINDOW = 300  # seconds
+LOGIN_MAX_FAILURES_PER_IP = 50
+LOGIN_MAX_FAILURES_PER_ACCOUNT = 5
+LOGIN_CLIENT_IP_HEADER = None  # e.g. "HTTP_X_REAL_IP" behind a trusted reverse proxy
+
 # Configure CORS
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -97,17 +191,54 @@ CORS_ALLOWED_ORIGINS = [
 #     }
 # }
 
-# Database configuration (PostgreSQL example)
-DATABASES = {
-    'default': {
+# Database configuration (PostgreSQL), overridable from the environment:
+#   DB_ENGINE             'sqlite3' for a local SQLite file named DB_NAME (routing checks)
+#   DB_NAME / DB_USER / DB_PASSWORD / DB_HOST / DB_PORT   connection
+#   DB_CONN_MAX_AGE       seconds to keep a connection open between requests
+#                         (0 = close after each request; ignored with DB_POOL_MAX_SIZE)
+#   DB_POOL_MAX_SIZE      use psycopg 3's connection pool of this size
+#   DB_STATEMENT_TIMEOUT  milliseconds before PostgreSQL cancels a query (0 = no limit)
+#   DB_REPLICA_HOSTS      comma-separated read replicas, routed by api.db_routers
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _database(host):
+    if os.environ.get('DB_ENGINE') == 'sqlite3':
+        return {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / os.environ.get('DB_NAME', 'db.sqlite3')}
+    database = {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'customer_management_db',
-        'USER': 'cms_user',
-        'PASSWORD': 'secure_password_here',
-        'HOST': 'localhost',
-        'PORT': '5432',
+        'NAME': os.environ.get('DB_NAME', 'customer_management_db'),
+        'USER': os.environ.get('DB_USER', 'cms_user'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', 'secure_password_here'),
+        'HOST': host,
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        # Reuse connections across requests, checking they are alive first.
+        'CONN_MAX_AGE': _env_int('DB_CONN_MAX_AGE', 60),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': _env_int('DB_CONNECT_TIMEOUT', 5),
+            'options': f"-c statement_timeout={_env_int('DB_STATEMENT_TIMEOUT', 30000)}",
+        },
     }
+    pool_size = _env_int('DB_POOL_MAX_SIZE', 0)
+    if pool_size:
+        # Pooled connections are returned to the pool instead of persisting.
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {'min_size': min(2, pool_size), 'max_size': pool_size, 'timeout': 10}
+    return database
+
+
+DATABASES = {
+    'default': _database(os.environ.get('DB_HOST', 'localhost')),
 }
+DATABASE_REPLICAS = []
+for _index, _host in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(','))):
+    _alias = 'replica' if _index == 0 else f'replica_{_index + 1}'
+    DATABASES[_alias] = {**_database(_host.strip()), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(_alias)
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -1,5 +1,7 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { BrowserRouter, Routes, Route, Link } from 'react-router-dom';
+import { getSession, logout, setSessionEndListener, type Session } from './api';
+import Login from './pages/Login';
 import Home from './pages/Home';
 import CustomerList from './pages/CustomerList';
 import CustomerRegistration from './pages/CustomerRegistration';
@@ -11,6 +13,17 @@ import UserList from './pages/UserList';
 import StaffMemberList from './pages/StaffMemberList';
 
 function App() {
+  const [session, setSession] = useState<Session | null>(getSession);
+
+  useEffect(() => {
+    setSessionEndListener(() => setSession(null));
+    return () => setSessionEndListener(null);
+  }, []);
+
+  if (!session) {
+    return <Login onLogin={setSession} />;
+  }
+
   return (
     <BrowserRouter>
       <div className="min-h-screen bg-washi">
@@ -70,6 +83,19 @@ function App() {
             >
               スタッフ管理
             </Link>
+            <div className="ml-auto flex items-center gap-3 text-sm">
+              <span className="text-gray-500">{session.username || session.email}</span>
+              <button
+                type="button"
+                className="text-gray-600 hover:text-sakura-500 transition-colors"
+                onClick={() => {
+                  logout();
+                  setSession(null);
+                }}
+              >
+                ログアウト
+              </button>
+            </div>
           </div>
         </nav>
         <Routes>
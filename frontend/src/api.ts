@@ -0,0 +1,139 @@
+import axios, { type AxiosError, type AxiosRequestConfig, type InternalAxiosRequestConfig } from 'axios';
+import type { Paginated } from './types/pagination';
+
+const AUTH_API = '/api/auth';
+const SESSION_KEY = 'cms.session';
+
+/** Tokens and user fields returned by `POST /api/auth/login/`. */
+export interface Session {
+  access: string;
+  refresh: string;
+  user_id: string;
+  username: string;
+  email: string;
+  role: string;
+}
+
+export function getSession(): Session | null {
+  const stored = window.localStorage.getItem(SESSION_KEY);
+  if (!stored) return null;
+  try {
+    return JSON.parse(stored) as Session;
+  } catch {
+    return null;
+  }
+}
+
+function saveSession(session: Session | null) {
+  if (session) {
+    window.localStorage.setItem(SESSION_KEY, JSON.stringify(session));
+  } else {
+    window.localStorage.removeItem(SESSION_KEY);
+  }
+}
+
+export async function login(email: string, password: string): Promise<Session> {
+  const res = await axios.post<Session>(`${AUTH_API}/login/`, { email, password });
+  saveSession(res.data);
+  return res.data;
+}
+
+export function logout() {
+  saveSession(null);
+}
+
+// One refresh at a time: concurrent 401s wait for the same new access token.
+let refreshing: Promise<string> | null = null;
+
+function refreshAccess(): Promise<string> {
+  if (!refreshing) {
+    const session = getSession();
+    refreshing = (session
+      ? axios.post<{ access: string; role: string }>(`${AUTH_API}/refresh/`, { refresh: session.refresh }).then((res) => {
+          saveSession({ ...session, access: res.data.access, role: res.data.role });
+          return res.data.access;
+        })
+      : Promise.reject(new Error('Not logged in'))
+    ).finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+}
+
+const isAuthUrl = (url?: string) => Boolean(url && url.startsWith(AUTH_API));
+
+let onSessionEnd: (() => void) | null = null;
+
+/** Called when the session is dropped after a failed refresh (e.g. to show the login page). */
+export function setSessionEndListener(listener: (() => void) | null) {
+  onSessionEnd = listener;
+}
+
+// Every API request carries the stored access token. Installed when this module
+// loads, so it is in place before any page's first request.
+axios.interceptors.request.use((config: InternalAxiosRequestConfig) => {
+  const session = getSession();
+  if (session && !isAuthUrl(config.url)) {
+    config.headers.set('Authorization', `Bearer ${session.access}`);
+  }
+  return config;
+});
+
+// A 401 refreshes the access token once and retries; if the refresh token is
+// rejected too, the session is dropped and the listener is told.
+axios.interceptors.response.use(undefined, async (error: AxiosError) => {
+  const config = error.config as (InternalAxiosRequestConfig & { _retried?: boolean }) | undefined;
+  if (error.response?.status !== 401 || !config || isAuthUrl(config.url)) {
+    throw error;
+  }
+  if (!config._retried) {
+    config._retried = true;
+    let refreshed = false;
+    try {
+      await refreshAccess();
+      refreshed = true;
+    } catch (refreshError) {
+      // Keep the session through network or server errors; only a rejected token ends it.
+      if (axios.isAxiosError(refreshError) && refreshError.response?.status !== 401) {
+        throw refreshError;
+      }
+    }
+    if (refreshed) {
+      // A second 401 comes back through here with `_retried` set and ends the session.
+      return axios.request(config);
+    }
+  }
+  logout();
+  onSessionEnd?.();
+  throw error;
+});
+
+/** Rows per page of a list shown to the user; more are loaded on request. */
+export const PAGE_SIZE = 50;
+
+/** Rows fetched for select options and id-to-name lookups (the API's maximum page). */
+const LOOKUP_PAGE_SIZE = 500;
+
+/**
+ * One page of a list endpoint. Lists are cursor-paginated: pass the page's
+ * `next` to `fetchNextPage` for the following one.
+ */
+export async function fetchPage<T>(url: string, config: AxiosRequestConfig = {}): Promise<Paginated<T>> {
+  const res = await axios.get<Paginated<T>>(url, { ...config, params: { page_size: PAGE_SIZE, ...config.params } });
+  return res.data;
+}
+
+/** The page at a previous page's `next` (or `previous`) link. */
+export async function fetchNextPage<T>(link: string, config: AxiosRequestConfig = {}): Promise<Paginated<T>> {
+  // Links are absolute; keep requests on this origin (and the dev proxy).
+  const url = new URL(link, window.location.origin);
+  const res = await axios.get<Paginated<T>>(url.pathname + url.search, { ...config, params: undefined });
+  return res.data;
+}
+
+/** Rows for select options and name lookups: a single page of at most LOOKUP_PAGE_SIZE rows. */
+export async function fetchLookup<T>(url: string, config: AxiosRequestConfig = {}): Promise<T[]> {
+  const page = await fetchPage<T>(url, { ...config, params: { page_size: LOOKUP_PAGE_SIZE, ...config.params } });
+  return page.results;
+}
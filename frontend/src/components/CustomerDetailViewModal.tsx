@@ -76,14 +76,10 @@ export default function CustomerDetailViewModal({
       setLoading(true);
       setError(null);
       try {
-        const [profileRes, detailRes, prefRes] = await Promise.allSettled([
-          axios.get(baseUrl('customer-profiles')),
-          axios.get(baseUrl('customer-details')),
-          axios.get(baseUrl('customer-preferences')),
-        ]);
-        const p = profileRes.status === 'fulfilled' ? profileRes.value.data : null;
-        const d = detailRes.status === 'fulfilled' ? detailRes.value.data : null;
-        const pr = prefRes.status === 'fulfilled' ? prefRes.value.data : null;
+        const res = await axios.get(`${API}/customers/${customerId}/overview/`);
+        const p = res.data.profile ?? null;
+        const d = res.data.detail ?? null;
+        const pr = res.data.preference ?? null;
         setProfile(p);
         setDetail(d);
         setPreference(pr);
@@ -0,0 +1,24 @@
+import React from 'react';
+
+interface LoadMoreButtonProps {
+  hasMore: boolean;
+  loading: boolean;
+  onClick: () => void;
+}
+
+/** "Load more" control under a paginated list; hidden on the last page. */
+export default function LoadMoreButton({ hasMore, loading, onClick }: LoadMoreButtonProps) {
+  if (!hasMore) return null;
+  return (
+    <div className="mt-3 flex justify-center">
+      <button
+        type="button"
+        onClick={onClick}
+        disabled={loading}
+        className="px-4 py-2 rounded-xl border border-gray-200 bg-white text-sm text-gray-700 hover:bg-gray-50 disabled:opacity-60"
+      >
+        {loading ? '読み込み中…' : 'さらに読み込む'}
+      </button>
+    </div>
+  );
+}
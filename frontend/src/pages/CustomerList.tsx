@@ -3,6 +3,9 @@ import { Link } from 'react-router-dom';
 import axios from 'axios';
 import CustomerDetailViewModal from '../components/CustomerDetailViewModal';
 import type { Customer, Store, CustomerFormData } from '../types/customer';
+import { fetchLookup } from '../api';
+import { usePagedList } from '../usePagedList';
+import LoadMoreButton from '../components/LoadMoreButton';
 
 const API = '/api';
 
@@ -65,7 +68,6 @@ const IconAdd = () => (
 );
 
 export default function CustomerList() {
-  const [customers, setCustomers] = useState<Customer[]>([]);
   const [stores, setStores] = useState<Store[]>([]);
   const [loading, setLoading] = useState(true);
   const [filterName, setFilterName] = useState('');
@@ -78,27 +80,26 @@ export default function CustomerList() {
   const [saving, setSaving] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  const fetchCustomers = () => {
-    axios.get<Customer[]>(`${API}/customers/`).then((res) => setCustomers(res.data)).catch(() => setCustomers([]));
-  };
+  // Name/store filtering runs server-side; the first page is refetched whenever a filter changes.
+  const params: Record<string, string> = {};
+  if (filterName.trim()) params.name = filterName.trim();
+  if (filterStore) params.store = filterStore;
+  const {
+    rows: customers,
+    hasMore,
+    loading: customersLoading,
+    loadMore,
+    reload: fetchCustomers,
+  } = usePagedList<Customer>(`${API}/customers/`, params);
 
   useEffect(() => {
     setLoading(true);
-    axios.get<Store[]>(`${API}/stores/`).then((res) => setStores(res.data)).catch(() => setStores([]));
-    fetchCustomers();
+    fetchLookup<Store>(`${API}/stores/`).then(setStores).catch(() => setStores([]));
     setLoading(false);
   }, []);
 
   const storeName = (id: string) => stores.find((s) => s.id === id)?.name ?? id.slice(0, 8);
 
-  const filteredCustomers = React.useMemo(() => {
-    return customers.filter((c) => {
-      const matchName = !filterName.trim() || c.name.toLowerCase().includes(filterName.trim().toLowerCase());
-      const matchStore = !filterStore || c.store === filterStore;
-      return matchName && matchStore;
-    });
-  }, [customers, filterName, filterStore]);
-
   const clearFilters = () => {
     setFilterName('');
     setFilterStore('');
@@ -213,7 +214,7 @@ export default function CustomerList() {
                 </button>
               )}
               <span className="text-sm text-gray-500">
-                {filteredCustomers.length}件{customers.length !== filteredCustomers.length && ` / 全${customers.length}件`}
+                {customers.length}件{hasMore ? '以上' : ''}
               </span>
             </div>
             <div className="mt-3 overflow-x-auto rounded-xl border border-gray-100 bg-white/90 shadow-soft">
@@ -228,10 +229,10 @@ export default function CustomerList() {
                 </tr>
               </thead>
               <tbody>
-                {filteredCustomers.length === 0 ? (
+                {customers.length === 0 ? (
                   <tr><td colSpan={5} className="px-4 py-8 text-center text-gray-500">{hasActiveFilters ? '条件に一致する登録がありません' : '登録がありません'}</td></tr>
                 ) : (
-                  filteredCustomers.map((c) => (
+                  customers.map((c) => (
                     <tr key={c.id} className="border-b border-gray-50 hover:bg-sky-50/50">
                       <td className="px-4 py-3 font-medium text-gray-900">{c.name}</td>
                       <td className="px-4 py-3 text-gray-600">{storeName(c.store)}</td>
@@ -258,6 +259,7 @@ export default function CustomerList() {
               </tbody>
             </table>
           </div>
+          <LoadMoreButton hasMore={hasMore} loading={customersLoading} onClick={loadMore} />
           </>
         )}
 
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import CustomerDetailModal from '../components/CustomerDetailModal';
 import type { Store, CustomerFormData } from '../types/customer';
+import { fetchLookup } from '../api';
 
 const API = '/api';
 
@@ -28,9 +29,8 @@ export default function CustomerRegistration() {
   const [success, setSuccess] = useState(false);
 
   useEffect(() => {
-    axios
-      .get<Store[]>(`${API}/stores/`)
-      .then((res) => setStores(res.data))
+    fetchLookup<Store>(`${API}/stores/`)
+      .then(setStores)
       .catch(() => setStores([]));
   }, []);
 
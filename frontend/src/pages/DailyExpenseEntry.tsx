@@ -2,8 +2,12 @@ import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import type { DailySummary } from '../types/dailySummary';
 import type { Store } from '../types/customer';
+import { fetchLookup } from '../api';
+import { usePagedList } from '../usePagedList';
+import LoadMoreButton from '../components/LoadMoreButton';
 
 const API = '/api';
+const SUMMARY_PARAMS = { page_size: '20' };
 
 const inputClass =
   'mt-1 block w-full rounded-lg border border-gray-200 bg-white px-3 py-2 text-gray-800 shadow-sm focus:border-sky-300 focus:ring-1 focus:ring-sky-300 text-sm';
@@ -34,11 +38,9 @@ function todayISO() {
 
 export default function DailyExpenseEntry() {
   const [stores, setStores] = useState<Store[]>([]);
-  const [summaries, setSummaries] = useState<DailySummary[]>([]);
   const [storeId, setStoreId] = useState('');
   const [reportDate, setReportDate] = useState(todayISO());
   const [totalExpenses, setTotalExpenses] = useState('');
-  const [laborCosts, setLaborCosts] = useState('');
   const [notes, setNotes] = useState('');
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
@@ -46,20 +48,23 @@ export default function DailyExpenseEntry() {
   const [success, setSuccess] = useState(false);
   const [modalOpen, setModalOpen] = useState(false);
 
-  const fetchSummaries = () => {
-    axios.get<DailySummary[]>(`${API}/daily-summaries/`).then((r) => setSummaries(r.data)).catch(() => setSummaries([]));
-  };
+  // Newest report dates first (the API's default ordering).
+  const {
+    rows: summaries,
+    hasMore,
+    loading: summariesLoading,
+    loadMore,
+    reload: fetchSummaries,
+  } = usePagedList<DailySummary>(`${API}/daily-summaries/`, SUMMARY_PARAMS);
 
   useEffect(() => {
     setLoading(true);
-    Promise.all([
-      axios.get<Store[]>(`${API}/stores/`).then((r) => r.data).catch(() => []),
-      axios.get<DailySummary[]>(`${API}/daily-summaries/`).then((r) => r.data).catch(() => []),
-    ]).then(([s, sum]) => {
-      setStores(s);
-      setSummaries(sum);
-      if (s.length > 0 && !storeId) setStoreId(s[0].id);
-    });
+    fetchLookup<Store>(`${API}/stores/`)
+      .catch(() => [])
+      .then((s) => {
+        setStores(s);
+        if (s.length > 0 && !storeId) setStoreId(s[0].id);
+      });
     setLoading(false);
   }, []);
 
@@ -69,7 +74,6 @@ export default function DailyExpenseEntry() {
     setError(null);
     setReportDate(todayISO());
     setTotalExpenses('');
-    setLaborCosts('');
     setNotes('');
     setModalOpen(true);
   };
@@ -81,28 +85,13 @@ export default function DailyExpenseEntry() {
     setError(null);
     setSuccess(false);
     const expenses = totalExpenses.trim() === '' ? '0' : totalExpenses;
-    const labor = laborCosts.trim() === '' ? '0' : laborCosts;
     try {
-      const existing = summaries.find((s) => s.store === storeId && s.report_date === reportDate);
-      if (existing) {
-        await axios.patch(`${API}/daily-summaries/${existing.id}/`, {
-          store: existing.store,
-          report_date: existing.report_date,
-          total_sales: existing.total_sales,
-          total_expenses: expenses,
-          labor_costs: labor,
-          notes: notes.trim(),
-        });
-      } else {
-        await axios.post(`${API}/daily-summaries/`, {
-          store: storeId,
-          report_date: reportDate,
-          total_sales: '0',
-          total_expenses: expenses,
-          labor_costs: labor,
-          notes: notes.trim(),
-        });
-      }
+      await axios.post(`${API}/daily-summaries/upsert/`, {
+        store: storeId,
+        report_date: reportDate,
+        total_expenses: expenses,
+        notes: notes.trim(),
+      });
       fetchSummaries();
       setSuccess(true);
       setModalOpen(false);
@@ -112,15 +101,13 @@ export default function DailyExpenseEntry() {
     setSaving(false);
   };
 
-  const recentSummaries = [...summaries].sort((a, b) => b.report_date.localeCompare(a.report_date)).slice(0, 20);
-
   return (
     <div className="min-h-screen bg-sky-50/80">
       <div className="max-w-2xl mx-auto px-4 sm:px-6 py-8">
         <div className="flex flex-wrap items-center justify-between gap-4">
           <div>
             <h1 className="text-xl sm:text-2xl font-medium text-gray-800 tracking-tight">日次経費入力</h1>
-            <p className="mt-1 text-sm text-gray-500">日別の経費・人件費を入力・送信します。</p>
+            <p className="mt-1 text-sm text-gray-500">日別の経費を入力・送信します。人件費は勤怠（出勤・退勤）から自動で集計されます。</p>
           </div>
           <button
             type="button"
@@ -157,15 +144,15 @@ export default function DailyExpenseEntry() {
                     <th className="px-4 py-3 font-medium text-gray-700">店舗</th>
                     <th className="px-4 py-3 font-medium text-gray-700">対象日</th>
                     <th className="px-4 py-3 font-medium text-gray-700">経費（円）</th>
-                    <th className="px-4 py-3 font-medium text-gray-700">人件費（円）</th>
+                    <th className="px-4 py-3 font-medium text-gray-700">人件費（円・自動集計）</th>
                     <th className="px-4 py-3 font-medium text-gray-700">備考</th>
                   </tr>
                 </thead>
                 <tbody>
-                  {recentSummaries.length === 0 ? (
+                  {summaries.length === 0 ? (
                     <tr><td colSpan={5} className="px-4 py-6 text-center text-gray-500">データがありません</td></tr>
                   ) : (
-                    recentSummaries.map((s) => (
+                    summaries.map((s) => (
                       <tr key={s.id} className="border-b border-gray-50 hover:bg-sky-50/30">
                         <td className="px-4 py-3 text-gray-900">{storeName(s.store)}</td>
                         <td className="px-4 py-3 text-gray-600">{s.report_date}</td>
@@ -178,6 +165,7 @@ export default function DailyExpenseEntry() {
                 </tbody>
               </table>
             </div>
+            <LoadMoreButton hasMore={hasMore} loading={summariesLoading} onClick={loadMore} />
           </section>
         )}
 
@@ -202,10 +190,6 @@ export default function DailyExpenseEntry() {
                   <label className={labelClass}>経費合計（円） *</label>
                   <input type="number" step="0.01" min="0" value={totalExpenses} onChange={(e) => setTotalExpenses(e.target.value)} className={inputClass} placeholder="0" required />
                 </div>
-                <div>
-                  <label className={labelClass}>人件費（円） *</label>
-                  <input type="number" step="0.01" min="0" value={laborCosts} onChange={(e) => setLaborCosts(e.target.value)} className={inputClass} placeholder="0" required />
-                </div>
                 <div>
                   <label className={labelClass}>備考</label>
                   <textarea value={notes} onChange={(e) => setNotes(e.target.value)} className={inputClass} rows={3} placeholder="メモ（任意）" />
@@ -22,8 +22,8 @@ export default function Home() {
     // Placeholders for future routes
     { to: '/customers', label: 'お客様一覧', description: '登録済みお客様の検索・一覧', icon: '📋' },
     { to: '/visit-records', label: '来店記録', description: '来店・売上記録の入力・照会', icon: '📅' },
-    { to: '/daily-sales', label: '日次売上', description: '日別売上の入力・送信', icon: '💰' },
-    { to: '/daily-expenses', label: '日次経費', description: '日別経費・人件費の入力・送信', icon: '📊' },
+    { to: '/daily-sales', label: '日次売上', description: '来店記録から集計した日別売上', icon: '💰' },
+    { to: '/daily-expenses', label: '日次経費', description: '日別経費の入力・送信', icon: '📊' },
     { to: '/stores', label: '店舗管理', description: '店舗の登録・一覧・編集', icon: '🏪' },
     { to: '/users', label: 'ユーザー管理', description: 'ユーザー登録・権限・無効化', icon: '👥' },
     { to: '/staff-members', label: 'スタッフ管理', description: 'スタッフ・担当者の登録・一覧・編集', icon: '🧑‍💼' },
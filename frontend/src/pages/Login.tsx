@@ -0,0 +1,79 @@
+import React, { useState } from 'react';
+import axios from 'axios';
+import { login, type Session } from '../api';
+
+const inputClass =
+  'mt-1 block w-full rounded-lg border border-gray-200 bg-white px-3 py-2 text-gray-800 shadow-sm focus:border-sky-300 focus:ring-1 focus:ring-sky-300 text-sm';
+const labelClass = 'block text-sm font-medium text-gray-700';
+
+export default function Login({ onLogin }: { onLogin: (session: Session) => void }) {
+  const [email, setEmail] = useState('');
+  const [password, setPassword] = useState('');
+  const [saving, setSaving] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+
+  const handleSubmit = async (e: React.FormEvent) => {
+    e.preventDefault();
+    setSaving(true);
+    setError(null);
+    try {
+      onLogin(await login(email, password));
+    } catch (err) {
+      if (axios.isAxiosError(err) && err.response?.status === 429) {
+        setError('ログインの試行回数が多すぎます。しばらくしてからお試しください。');
+      } else if (axios.isAxiosError(err) && err.response?.status === 401) {
+        setError('メールアドレスまたはパスワードが正しくありません。');
+      } else {
+        setError('ログインに失敗しました。');
+      }
+    } finally {
+      setSaving(false);
+    }
+  };
+
+  return (
+    <div className="min-h-screen bg-sky-50/80 flex items-center justify-center px-4">
+      <form
+        onSubmit={handleSubmit}
+        className="w-full max-w-sm rounded-2xl bg-white shadow-lg border border-gray-100 p-6 space-y-4"
+      >
+        <div>
+          <h1 className="text-xl font-medium text-gray-800 tracking-tight">ログイン</h1>
+          <p className="mt-1 text-sm text-gray-500">顧客管理・売上システム</p>
+        </div>
+        {error && (
+          <div className="rounded-lg bg-red-50 border border-red-100 px-3 py-2 text-sm text-red-700">{error}</div>
+        )}
+        <label className={labelClass}>
+          メールアドレス
+          <input
+            type="email"
+            className={inputClass}
+            value={email}
+            onChange={(e) => setEmail(e.target.value)}
+            autoComplete="username"
+            required
+          />
+        </label>
+        <label className={labelClass}>
+          パスワード
+          <input
+            type="password"
+            className={inputClass}
+            value={password}
+            onChange={(e) => setPassword(e.target.value)}
+            autoComplete="current-password"
+            required
+          />
+        </label>
+        <button
+          type="submit"
+          disabled={saving}
+          className="w-full px-4 py-2 rounded-lg bg-sky-500 text-white text-sm font-medium hover:bg-sky-600 disabled:opacity-50"
+        >
+          {saving ? 'ログイン中…' : 'ログイン'}
+        </button>
+      </form>
+    </div>
+  );
+}
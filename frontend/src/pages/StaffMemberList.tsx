@@ -3,6 +3,9 @@ import axios from 'axios';
 import type { StaffMember, StaffMemberFormData } from '../types/staffMember';
 import type { Store } from '../types/customer';
 import type { User } from '../types/user';
+import { fetchLookup } from '../api';
+import { usePagedList } from '../usePagedList';
+import LoadMoreButton from '../components/LoadMoreButton';
 
 const API = '/api';
 
@@ -84,7 +87,13 @@ const emptyForm = (): StaffMemberFormData => ({
 });
 
 export default function StaffMemberList() {
-  const [members, setMembers] = useState<StaffMember[]>([]);
+  const {
+    rows: members,
+    hasMore,
+    loading: membersLoading,
+    loadMore,
+    reload: fetchMembers,
+  } = usePagedList<StaffMember>(`${API}/staff-members/`);
   const [users, setUsers] = useState<User[]>([]);
   const [stores, setStores] = useState<Store[]>([]);
   const [loading, setLoading] = useState(true);
@@ -97,18 +106,12 @@ export default function StaffMemberList() {
   const [saving, setSaving] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  const fetchMembers = () => {
-    axios.get<StaffMember[]>(`${API}/staff-members/`).then((r) => setMembers(r.data)).catch(() => setMembers([]));
-  };
-
   useEffect(() => {
     setLoading(true);
     Promise.all([
-      axios.get<StaffMember[]>(`${API}/staff-members/`).then((r) => r.data).catch(() => []),
-      axios.get<User[]>(`${API}/users/`).then((r) => r.data).catch(() => []),
-      axios.get<Store[]>(`${API}/stores/`).then((r) => r.data).catch(() => []),
-    ]).then(([m, u, s]) => {
-      setMembers(m);
+      fetchLookup<User>(`${API}/users/`).catch(() => []),
+      fetchLookup<Store>(`${API}/stores/`).catch(() => []),
+    ]).then(([u, s]) => {
       setUsers(u);
       setStores(s);
     });
@@ -253,6 +256,7 @@ export default function StaffMemberList() {
             </table>
           </div>
         )}
+        <LoadMoreButton hasMore={hasMore} loading={membersLoading} onClick={loadMore} />
 
         {/* View modal */}
         {viewId && (() => {
@@ -1,7 +1,9 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import axios from 'axios';
 import type { Store, StoreFormData } from '../types/customer';
 import { STORE_TYPES } from '../types/customer';
+import { usePagedList } from '../usePagedList';
+import LoadMoreButton from '../components/LoadMoreButton';
 
 const API = '/api';
 
@@ -49,8 +51,7 @@ const IconAdd = () => (
 );
 
 export default function StoreList() {
-  const [stores, setStores] = useState<Store[]>([]);
-  const [loading, setLoading] = useState(true);
+  const { rows: stores, hasMore, loading, loadMore, reload: fetchStores } = usePagedList<Store>(`${API}/stores/`);
   const [viewId, setViewId] = useState<string | null>(null);
   const [editId, setEditId] = useState<string | null>(null);
   const [editForm, setEditForm] = useState<StoreFormData | null>(null);
@@ -60,16 +61,6 @@ export default function StoreList() {
   const [saving, setSaving] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  const fetchStores = () => {
-    axios.get<Store[]>(`${API}/stores/`).then((res) => setStores(res.data)).catch(() => setStores([]));
-  };
-
-  useEffect(() => {
-    setLoading(true);
-    fetchStores();
-    setLoading(false);
-  }, []);
-
   const openEdit = (s: Store) => {
     setEditId(s.id);
     setEditForm({
@@ -155,7 +146,7 @@ export default function StoreList() {
           </div>
         )}
 
-        {loading ? (
+        {loading && stores.length === 0 ? (
           <p className="mt-8 text-gray-500">読み込み中…</p>
         ) : (
           <div className="mt-6 overflow-x-auto rounded-xl border border-gray-100 bg-white/90 shadow-sm">
@@ -200,6 +191,7 @@ export default function StoreList() {
             </table>
           </div>
         )}
+        <LoadMoreButton hasMore={hasMore} loading={loading} onClick={loadMore} />
 
         {/* View modal */}
         {viewId && (() => {
@@ -1,7 +1,9 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState } from 'react';
 import axios from 'axios';
 import type { User, UserCreateFormData, UserEditFormData } from '../types/user';
 import { USER_ROLES, USER_ROLE_LABELS } from '../types/user';
+import { usePagedList } from '../usePagedList';
+import LoadMoreButton from '../components/LoadMoreButton';
 
 const API = '/api';
 
@@ -55,8 +57,7 @@ function formatDate(iso: string) {
 }
 
 export default function UserList() {
-  const [users, setUsers] = useState<User[]>([]);
-  const [loading, setLoading] = useState(true);
+  const { rows: users, hasMore, loading, loadMore, reload: fetchUsers } = usePagedList<User>(`${API}/users/`);
   const [viewId, setViewId] = useState<string | null>(null);
   const [editId, setEditId] = useState<string | null>(null);
   const [editForm, setEditForm] = useState<UserEditFormData | null>(null);
@@ -66,16 +67,6 @@ export default function UserList() {
   const [saving, setSaving] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  const fetchUsers = () => {
-    axios.get<User[]>(`${API}/users/`).then((res) => setUsers(res.data)).catch(() => setUsers([]));
-  };
-
-  useEffect(() => {
-    setLoading(true);
-    fetchUsers();
-    setLoading(false);
-  }, []);
-
   const openEdit = (u: User) => {
     setEditId(u.id);
     setEditForm({
@@ -174,7 +165,7 @@ export default function UserList() {
           </div>
         )}
 
-        {loading ? (
+        {loading && users.length === 0 ? (
           <p className="mt-8 text-gray-500">読み込み中…</p>
         ) : (
           <div className="mt-6 overflow-x-auto rounded-xl border border-gray-100 bg-white/90 shadow-sm">
@@ -219,6 +210,7 @@ export default function UserList() {
             </table>
           </div>
         )}
+        <LoadMoreButton hasMore={hasMore} loading={loading} onClick={loadMore} />
 
         {/* View modal */}
         {viewId && (() => {
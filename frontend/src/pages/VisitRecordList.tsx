@@ -8,6 +8,9 @@ import type {
 } from '../types/visitRecord';
 import type { Customer } from '../types/customer';
 import { PAYMENT_METHODS } from '../types/visitRecord';
+import { fetchLookup } from '../api';
+import { usePagedList } from '../usePagedList';
+import LoadMoreButton from '../components/LoadMoreButton';
 
 const API = '/api';
 
@@ -108,7 +111,13 @@ function formatDate(s: string) {
 }
 
 export default function VisitRecordList() {
-  const [records, setRecords] = useState<VisitRecord[]>([]);
+  const {
+    rows: records,
+    hasMore,
+    loading: recordsLoading,
+    loadMore,
+    reload: fetchRecords,
+  } = usePagedList<VisitRecord>(`${API}/visit-records/`);
   const [customers, setCustomers] = useState<Customer[]>([]);
   const [staff, setStaff] = useState<StaffMember[]>([]);
   const [loading, setLoading] = useState(true);
@@ -121,18 +130,12 @@ export default function VisitRecordList() {
   const [saving, setSaving] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
-  const fetchRecords = () => {
-    axios.get<VisitRecord[]>(`${API}/visit-records/`).then((res) => setRecords(res.data)).catch(() => setRecords([]));
-  };
-
   useEffect(() => {
     setLoading(true);
     Promise.all([
-      axios.get<VisitRecord[]>(`${API}/visit-records/`).then((r) => r.data).catch(() => []),
-      axios.get<Customer[]>(`${API}/customers/`).then((r) => r.data).catch(() => []),
-      axios.get<StaffMember[]>(`${API}/staff-members/`).then((r) => r.data).catch(() => []),
-    ]).then(([recs, custs, st]) => {
-      setRecords(recs);
+      fetchLookup<Customer>(`${API}/customers/`).catch(() => []),
+      fetchLookup<StaffMember>(`${API}/staff-members/`).catch(() => []),
+    ]).then(([custs, st]) => {
       setCustomers(custs);
       setStaff(st);
     });
@@ -278,6 +281,7 @@ export default function VisitRecordList() {
             </table>
           </div>
         )}
+        <LoadMoreButton hasMore={hasMore} loading={recordsLoading} onClick={loadMore} />
 
         {/* View modal */}
         {viewId && (() => {
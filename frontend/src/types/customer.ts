@@ -4,6 +4,7 @@ export interface Store {
   store_type: string;
   address: string;
   is_active: boolean;
+  updated_at: string;
 }
 
 export interface StoreFormData {
@@ -23,6 +24,10 @@ export interface Customer {
   contact_info: Record<string, unknown>;
   preferences: Record<string, unknown>;
   total_spend: string;
+  visit_count: number;
+  last_visit_date: string | null;
+  unpaid_balance: string;
+  updated_at: string;
 }
 
 export interface CustomerFormData {
@@ -6,13 +6,13 @@ export interface DailySummary {
   total_expenses: string;
   labor_costs: string;
   notes: string;
+  updated_at: string;
 }
 
+/** Writable fields; total_sales and labor_costs are computed by the server. */
 export interface DailySummaryFormData {
   store: string;
   report_date: string;
-  total_sales: string;
   total_expenses: string;
-  labor_costs: string;
   notes: string;
 }
@@ -0,0 +1,6 @@
+/** Envelope returned by every list endpoint (keyset cursor pagination). */
+export interface Paginated<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
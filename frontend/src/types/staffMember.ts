@@ -7,6 +7,7 @@ export interface StaffMember {
   is_on_duty: boolean;
   check_in: string;
   check_out: string;
+  updated_at: string;
 }
 
 export interface StaffMemberFormData {
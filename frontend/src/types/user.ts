@@ -4,6 +4,7 @@ export interface User {
   email: string;
   role: string;
   created_at: string;
+  updated_at: string;
 }
 
 export interface UserCreateFormData {
@@ -16,6 +16,7 @@ export interface VisitRecord {
   received_amount: number;
   unpaid_date: string;
   receipt: boolean;
+  updated_at: string;
 }
 
 export interface VisitRecordFormData {
@@ -44,6 +45,7 @@ export interface StaffMember {
   is_on_duty: boolean;
   check_in: string;
   check_out: string;
+  updated_at: string;
 }
 
 export const PAYMENT_METHODS: PaymentMethod[] = ['Cash', 'Credit Card', 'PayPay'];
@@ -0,0 +1,57 @@
+import { useCallback, useEffect, useRef, useState } from 'react';
+import { fetchNextPage, fetchPage } from './api';
+
+/**
+ * The first page of a list endpoint, refetched when `url` or `params` change,
+ * plus `loadMore` to append the page at `next`. `reload` starts again from the
+ * first page (e.g. after a write).
+ */
+export function usePagedList<T>(url: string, params: Record<string, string> = {}) {
+  const [rows, setRows] = useState<T[]>([]);
+  const [next, setNext] = useState<string | null>(null);
+  const [loading, setLoading] = useState(true);
+  // Responses to superseded requests (an older filter, a reload) are dropped.
+  const request = useRef(0);
+  const paramsKey = JSON.stringify(params);
+
+  const reload = useCallback(() => {
+    const current = ++request.current;
+    setLoading(true);
+    fetchPage<T>(url, { params: JSON.parse(paramsKey) })
+      .then((page) => {
+        if (current !== request.current) return;
+        setRows(page.results);
+        setNext(page.next);
+      })
+      .catch(() => {
+        if (current !== request.current) return;
+        setRows([]);
+        setNext(null);
+      })
+      .finally(() => {
+        if (current === request.current) setLoading(false);
+      });
+  }, [url, paramsKey]);
+
+  useEffect(() => {
+    reload();
+  }, [reload]);
+
+  const loadMore = useCallback(() => {
+    if (!next) return;
+    const current = ++request.current;
+    setLoading(true);
+    fetchNextPage<T>(next)
+      .then((page) => {
+        if (current !== request.current) return;
+        setRows((previous) => [...previous, ...page.results]);
+        setNext(page.next);
+      })
+      .catch(() => undefined)
+      .finally(() => {
+        if (current === request.current) setLoading(false);
+      });
+  }, [next]);
+
+  return { rows, hasMore: next !== null, loading, loadMore, reload };
+}